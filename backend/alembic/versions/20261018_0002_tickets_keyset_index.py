@@ -0,0 +1,28 @@
+"""tickets keyset pagination indexes
+
+Revision ID: 20261018_0002
+Revises: 20250910_0001
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_0002"
+down_revision = "20250910_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # GET /tickets ordena por (created_at DESC, id DESC) y pagina con cursor sobre esa tupla
+    op.create_index("ix_tickets_company_created_id", "tickets", ["company_id", "created_at", "id"], unique=False)
+    op.create_index("ix_tickets_created_id", "tickets", ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tickets_created_id", table_name="tickets")
+    op.drop_index("ix_tickets_company_created_id", table_name="tickets")
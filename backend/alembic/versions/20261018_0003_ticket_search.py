@@ -0,0 +1,76 @@
+"""ticket full-text search index
+
+Revision ID: 20261018_0003
+Revises: 20261018_0002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_0003"
+down_revision = "20261018_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(
+            """
+            CREATE TABLE ticket_search (
+                ticket_id INTEGER PRIMARY KEY REFERENCES tickets(id) ON DELETE CASCADE,
+                document TSVECTOR NOT NULL
+            )
+            """
+        )
+        op.execute("CREATE INDEX ix_ticket_search_document ON ticket_search USING GIN (document)")
+        # Backfill: título (A), descripción (B), comentarios públicos (C), con la misma configuración
+        # de texto (SEARCH_LANGUAGE) que usan las consultas para que el índice GIN coincida
+        op.get_bind().execute(
+            sa.text(
+                """
+                INSERT INTO ticket_search (ticket_id, document)
+                SELECT t.id,
+                       setweight(to_tsvector(CAST(:cfg AS regconfig), coalesce(t.title, '')), 'A')
+                       || setweight(to_tsvector(CAST(:cfg AS regconfig), coalesce(t.description, '')), 'B')
+                       || setweight(to_tsvector(CAST(:cfg AS regconfig), coalesce(
+                              (SELECT string_agg(c.body, ' ') FROM comments c WHERE c.ticket_id = t.id AND c.is_public),
+                              '')), 'C')
+                FROM tickets t
+                """
+            ),
+            {"cfg": settings.SEARCH_LANGUAGE},
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE ticket_search
+            USING fts5(title, description, comments, tokenize = 'unicode61 remove_diacritics 2')
+            """
+        )
+        op.execute(
+            """
+            INSERT INTO ticket_search (rowid, title, description, comments)
+            SELECT t.id,
+                   t.title,
+                   coalesce(t.description, ''),
+                   coalesce((SELECT group_concat(c.body, ' ') FROM comments c WHERE c.ticket_id = t.id AND c.is_public), '')
+            FROM tickets t
+            """
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_ticket_search_document")
+    if dialect in {"postgresql", "sqlite"}:
+        op.execute("DROP TABLE IF EXISTS ticket_search")
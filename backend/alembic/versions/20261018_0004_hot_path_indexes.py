@@ -0,0 +1,72 @@
+"""composite and partial indexes for hot queries
+
+Revision ID: 20261018_0004
+Revises: 20261018_0003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_0004"
+down_revision = "20261018_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    is_sqlite = op.get_bind().dialect.name == "sqlite"
+
+    # tickets: filtros de GET /tickets (status/priority/assignee) + orden por created_at,
+    # periodo de stats y agregados del dashboard por empresa
+    op.create_index("ix_tickets_company_status_created", "tickets", ["company_id", "status", "created_at"])
+    op.create_index("ix_tickets_company_priority_created", "tickets", ["company_id", "priority", "created_at"])
+    op.create_index("ix_tickets_company_assignee_created", "tickets", ["company_id", "assignee_id", "created_at"])
+    unassigned_open = sa.text("assignee_id IS NULL AND status <> 'closed'")
+    op.create_index(
+        "ix_tickets_unassigned_open",
+        "tickets",
+        ["company_id", "priority"],
+        postgresql_where=unassigned_open,
+        sqlite_where=unassigned_open,
+    )
+
+    # comments: listado por ticket ordenado por fecha
+    op.create_index("ix_comments_ticket_created", "comments", ["ticket_id", "created_at"])
+
+    # worklogs: worklog activo del usuario (start_work / stop_work)
+    active = sa.text("ended_at IS NULL")
+    op.create_index(
+        "ix_worklogs_active_user_ticket",
+        "worklogs",
+        ["user_id", "ticket_id"],
+        postgresql_where=active,
+        sqlite_where=active,
+    )
+
+    # users: técnicos por empresa y aprobaciones pendientes
+    op.create_index("ix_users_company_role", "users", ["company_id", "role"])
+    # Igual que el filtro User.is_active.is_(False) para que el planner use el índice parcial
+    inactive = sa.text("is_active IS 0" if is_sqlite else "is_active IS false")
+    op.create_index(
+        "ix_users_company_inactive",
+        "users",
+        ["company_id"],
+        postgresql_where=inactive,
+        sqlite_where=inactive,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_company_inactive", table_name="users")
+    op.drop_index("ix_users_company_role", table_name="users")
+    op.drop_index("ix_worklogs_active_user_ticket", table_name="worklogs")
+    op.drop_index("ix_comments_ticket_created", table_name="comments")
+    op.drop_index("ix_tickets_unassigned_open", table_name="tickets")
+    op.drop_index("ix_tickets_company_assignee_created", table_name="tickets")
+    op.drop_index("ix_tickets_company_priority_created", table_name="tickets")
+    op.drop_index("ix_tickets_company_status_created", table_name="tickets")
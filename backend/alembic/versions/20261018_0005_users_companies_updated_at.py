@@ -0,0 +1,36 @@
+"""updated_at on users and companies (ETag fingerprints)
+
+Revision ID: 20261018_0005
+Revises: 20261018_0004
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_0005"
+down_revision = "20261018_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+    )
+    op.add_column(
+        "companies",
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("companies") as batch:
+        batch.drop_column("updated_at")
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("updated_at")
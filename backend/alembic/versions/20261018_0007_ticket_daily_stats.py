@@ -0,0 +1,45 @@
+"""ticket_daily_stats rollup
+
+Revision ID: 20261018_0007
+Revises: 20261018_0006
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_0007"
+down_revision = "20261018_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ticket_daily_stats",
+        sa.Column("company_id", sa.Integer(), sa.ForeignKey("companies.id"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("status", sa.String(length=32), primary_key=True),
+        sa.Column("priority", sa.String(length=32), primary_key=True),
+        sa.Column("assignee_id", sa.Integer(), primary_key=True),
+        sa.Column("created", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("resolved", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("resolution_minutes", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("time_spent_minutes", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_ticket_daily_stats_day", "ticket_daily_stats", ["day"])
+
+    # Backfill con la misma lógica que `python -m app.services.rollup rebuild`
+    from app.services.rollup import rebuild
+
+    rebuild(Session(bind=op.get_bind()))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ticket_daily_stats_day", table_name="ticket_daily_stats")
+    op.drop_table("ticket_daily_stats")
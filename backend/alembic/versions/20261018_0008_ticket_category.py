@@ -0,0 +1,34 @@
+"""ticket category column
+
+Revision ID: 20261018_0008
+Revises: 20261018_0007
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_0008"
+down_revision = "20261018_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("tickets", sa.Column("category", sa.String(length=32), nullable=True))
+    op.create_index("ix_tickets_company_category_status", "tickets", ["company_id", "category", "status"])
+
+    # Backfill con el clasificador configurado (igual que `python -m app.services.classifier backfill`)
+    from app.services.classifier import backfill
+
+    backfill(Session(bind=op.get_bind()))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tickets_company_category_status", table_name="tickets")
+    op.drop_column("tickets", "category")
@@ -0,0 +1,75 @@
+"""sla policies and ticket due-at columns
+
+Revision ID: 20261018_0009
+Revises: 20261018_0008
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_0009"
+down_revision = "20261018_0008"
+branch_labels = None
+depends_on = None
+
+_OPEN = "status <> 'closed'"
+_AWAITING_RESPONSE = "status <> 'closed' AND first_responded_at IS NULL"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sla_policies",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("company_id", sa.Integer(), sa.ForeignKey("companies.id"), nullable=False),
+        sa.Column("priority", sa.String(length=32), nullable=False),
+        sa.Column("first_response_minutes", sa.Integer(), nullable=False),
+        sa.Column("resolve_minutes", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("company_id", "priority", name="uq_sla_policies_company_priority"),
+    )
+
+    op.add_column("tickets", sa.Column("first_response_due_at", sa.DateTime(), nullable=True))
+    op.add_column("tickets", sa.Column("resolve_due_at", sa.DateTime(), nullable=True))
+    op.add_column("tickets", sa.Column("first_responded_at", sa.DateTime(), nullable=True))
+    op.add_column("tickets", sa.Column("sla_state", sa.String(length=16), nullable=False, server_default="ok"))
+
+    op.create_index(
+        "ix_tickets_sla_resolve_due_open",
+        "tickets",
+        ["resolve_due_at"],
+        postgresql_where=sa.text(_OPEN),
+        sqlite_where=sa.text(_OPEN),
+    )
+    op.create_index(
+        "ix_tickets_sla_response_due_open",
+        "tickets",
+        ["first_response_due_at"],
+        postgresql_where=sa.text(_AWAITING_RESPONSE),
+        sqlite_where=sa.text(_AWAITING_RESPONSE),
+    )
+    op.create_index("ix_tickets_company_resolved_due", "tickets", ["company_id", "resolved_at", "resolve_due_at"])
+    op.create_index("ix_tickets_resolved_due", "tickets", ["resolved_at", "resolve_due_at"])
+
+    # Vencimientos de los tickets existentes con las políticas por defecto
+    from app.services.sla import backfill
+
+    backfill(Session(bind=op.get_bind()))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tickets_resolved_due", table_name="tickets")
+    op.drop_index("ix_tickets_company_resolved_due", table_name="tickets")
+    op.drop_index("ix_tickets_sla_response_due_open", table_name="tickets")
+    op.drop_index("ix_tickets_sla_resolve_due_open", table_name="tickets")
+    with op.batch_alter_table("tickets") as batch:
+        batch.drop_column("sla_state")
+        batch.drop_column("first_responded_at")
+        batch.drop_column("resolve_due_at")
+        batch.drop_column("first_response_due_at")
+    op.drop_table("sla_policies")
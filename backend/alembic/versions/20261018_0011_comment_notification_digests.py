@@ -0,0 +1,44 @@
+"""pending comment notifications and per-user digest preference
+
+Revision ID: 20261018_0011
+Revises: 20261018_0010
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_0011"
+down_revision = "20261018_0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pending_notifications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("to_email", sa.String(length=320), nullable=False),
+        sa.Column("group_key", sa.String(length=400), nullable=False),
+        sa.Column("ticket_id", sa.Integer(), nullable=False),
+        sa.Column("ticket_title", sa.String(length=255), nullable=False),
+        sa.Column("author", sa.String(length=255), nullable=True),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("deliver_after", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_pending_notifications_due", "pending_notifications", ["deliver_after"])
+    op.create_index("ix_pending_notifications_group", "pending_notifications", ["group_key", "created_at"])
+
+    op.add_column("users", sa.Column("email_digest", sa.String(length=16), nullable=False, server_default="immediate"))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "email_digest")
+    op.drop_index("ix_pending_notifications_group", table_name="pending_notifications")
+    op.drop_index("ix_pending_notifications_due", table_name="pending_notifications")
+    op.drop_table("pending_notifications")
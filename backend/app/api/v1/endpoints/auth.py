@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_current_user, get_db
-from app.core.security import create_access_token, verify_password
+from app.core.security import create_access_token, verify_and_update_password
 from app.core.config import settings
+from app.core.rate_limit import login_throttle
 from app.models.user import User
 from app.schemas.auth import Token, UserOut
 
@@ -45,9 +47,30 @@ async def login(
     if not email or not password:
         raise HTTPException(status_code=422, detail=[{"msg": "email y password son requeridos"}])
 
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+    # Throttling por IP y por cuenta antes de cualquier consulta o hash
+    ip = request.client.host if request.client else None
+    if login_throttle.backend.blocking:
+        wait = await run_in_threadpool(login_throttle.check, ip, email)
+    else:
+        wait = login_throttle.check(ip, email)
+    if wait:
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiados intentos de inicio de sesión",
+            headers={"Retry-After": str(max(1, int(wait + 0.999)))},
+        )
+
+    # Consulta síncrona en el threadpool y bcrypt en su executor: el event loop nunca se bloquea
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.email == email).first())
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    ok, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Hash obsoleto (esquema/coste): se re-guarda con la configuración actual
+        user.hashed_password = new_hash
+        await run_in_threadpool(db.commit)
 
     token = create_access_token(
         {"sub": str(user.id), "role": user.role, "company_id": user.company_id},
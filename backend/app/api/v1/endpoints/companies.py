@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_current_user, get_db
+from app.core.etag import make_etag, not_modified
+from app.core.principal_cache import invalidate_principal
 from app.models.company import Company
+from app.models.sla import SlaPolicy
+from app.models.stats import TicketDailyStats
 from app.models.user import User
 from app.schemas.company import CompanyCreate, CompanyOut, CompanyUpdate
 
@@ -10,13 +15,24 @@ router = APIRouter(prefix="/companies", tags=["companies"])
 
 
 @router.get("/", response_model=list[CompanyOut])
-def list_companies(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def list_companies(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
     role = (user._token_payload or {}).get("role")
+    qs = db.query(Company)
     if role not in {"superadmin", "admin", "tech"}:
         # usuarios solo pueden ver su propia empresa
-        return db.query(Company).filter(Company.id == user.company_id).all()
+        qs = qs.filter(Company.id == user.company_id)
     # admin/tech/superadmin ven todas (si quieres limitar admin/tech, podemos filtrar)
-    return db.query(Company).order_by(Company.name.asc()).all()
+
+    count, last_update = qs.with_entities(func.count(Company.id), func.max(Company.updated_at)).one()
+    cached = not_modified(request, response, make_etag("companies", user.company_id, role, count, last_update))
+    if cached:
+        return cached
+    return qs.order_by(Company.name.asc()).all()
 
 
 @router.post("/", response_model=CompanyOut)
@@ -57,6 +73,10 @@ def delete_company(company_id: int, db: Session = Depends(get_db), user: User =
     comp = db.get(Company, company_id)
     if not comp:
         raise HTTPException(status_code=404, detail="Company not found")
+    # Borra en cascada sus usuarios: invalidar todas las identidades cacheadas
+    invalidate_principal(db)
+    db.query(SlaPolicy).filter(SlaPolicy.company_id == company_id).delete(synchronize_session=False)
+    db.query(TicketDailyStats).filter(TicketDailyStats.company_id == company_id).delete(synchronize_session=False)
     db.delete(comp)
     db.commit()
     return {"ok": True}
\ No newline at end of file
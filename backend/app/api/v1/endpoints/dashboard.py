@@ -1,15 +1,19 @@
-from collections import Counter
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_current_user, get_db, resolve_company_scope
-from app.models.ticket import Ticket
+from app.models.stats import TicketDailyStats
 from app.models.user import User
+from app.services import sla
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
+TREND_WEEKS = 4
+SLA_WINDOW_DAYS = 30
+
 
 @router.get("/overview")
 def overview(
@@ -19,51 +23,79 @@ def overview(
 ):
     role = (user._token_payload or {}).get("role")
 
-    qs = db.query(Ticket)
+    scope_company: int | None = company_id
     if role == "superadmin":
-        pass  # todos
-    elif role == "admin":
-        qs = qs.filter(Ticket.company_id == company_id)
-    elif role == "tech":
-        if getattr(user, "can_view_all_companies", False):
-            pass
-        else:
-            qs = qs.filter(Ticket.company_id == company_id)
-    else:
-        qs = qs.filter(Ticket.company_id == company_id)
-
-    tickets = qs.all()
-
-    total = len(tickets)
-    by_status = Counter(t.status for t in tickets)
-    by_priority = Counter(t.priority for t in tickets)
+        scope_company = None  # todos
+    elif role == "tech" and getattr(user, "can_view_all_companies", False):
+        scope_company = None
+    scope = [TicketDailyStats.company_id == scope_company] if scope_company is not None else []
 
+    # Agregados sobre el rollup diario (ticket_daily_stats): el coste depende de días x combinaciones,
+    # no del número de tickets
+    S = TicketDailyStats
+    by_status = {
+        k: int(v)
+        for k, v in db.query(S.status, func.sum(S.created)).filter(*scope).group_by(S.status).all()
+        if v
+    }
+    by_priority = {
+        k: int(v)
+        for k, v in db.query(S.priority, func.sum(S.created)).filter(*scope).group_by(S.priority).all()
+        if v
+    }
+
+    total = sum(by_status.values())
     open_count = by_status.get("open", 0)
     in_progress = by_status.get("in_progress", 0)
     closed = by_status.get("closed", 0)
 
+    # Cumplimiento de SLA en la ventana (índices sobre resolved_at/resolve_due_at y tickets abiertos vencidos)
+    now = datetime.utcnow()
+    sla_attainment = sla.attainment(db, scope_company, now - timedelta(days=SLA_WINDOW_DAYS), now)
+
     # KPIs simples
     kpis = {
         "total": total,
         "open": open_count,
         "in_progress": in_progress,
         "closed": closed,
-        "sla": 0.87,  # placeholder
+        "sla": sla_attainment,  # fracción 0..1 (None sin datos)
     }
 
-    # Promedio de resolución (mock si no hay datos de cierre reales)
-    now = datetime.utcnow()
+    # Promedio de resolución (resolved_at - created_at) por semana, últimas TREND_WEEKS semanas
+    bounds = [(now - timedelta(weeks=i + 1)).date() for i in range(TREND_WEEKS)]
+    bucket = case(*[(S.day >= b, i) for i, b in enumerate(bounds)])
+    rows = (
+        db.query(bucket, func.sum(S.resolution_minutes), func.sum(S.resolved))
+        .filter(*scope, S.day >= bounds[-1])
+        .group_by(bucket)
+        .all()
+    )
+    sums_by_bucket = {i: (minutes or 0.0, count or 0) for i, minutes, count in rows}
+
+    def _avg_hours(i: int) -> float:
+        minutes, count = sums_by_bucket.get(i, (0, 0))
+        return round(float(minutes) / count / 60.0, 2) if count else 0.0
+
     trend = [
-        {"label": (now - timedelta(weeks=i)).strftime("%d/%m"), "avg_hours": max(1.0, 4.0 - i * 0.6)}
-        for i in reversed(range(4))
+        {"label": (now - timedelta(weeks=i)).strftime("%d/%m"), "avg_hours": _avg_hours(i)}
+        for i in reversed(range(TREND_WEEKS))
     ]
 
-    # Rendimiento técnico (placeholder por número de tickets cerrados)
+    # Rendimiento técnico (número de tickets cerrados por asignado)
+    closed_by_assignee = (
+        db.query(User.id, User.full_name, func.sum(S.created))
+        .join(S, S.assignee_id == User.id)
+        .filter(*scope, S.status == "closed")
+        .group_by(User.id, User.full_name)
+        .all()
+    )
     tech_performance: dict[str, int] = {}
-    for t in tickets:
-        if t.assignee and t.status == "closed":
-            name = t.assignee.full_name or f"User {t.assignee_id}"
-            tech_performance[name] = tech_performance.get(name, 0) + 1
+    for assignee_id, full_name, count in closed_by_assignee:
+        if not count:
+            continue
+        name = full_name or f"User {assignee_id}"
+        tech_performance[name] = tech_performance.get(name, 0) + int(count)
 
     return {
         "kpis": kpis,
@@ -71,4 +103,4 @@ def overview(
         "by_priority": by_priority,
         "resolution_trend": trend,
         "tech_performance": tech_performance,
-    }
\ No newline at end of file
+    }
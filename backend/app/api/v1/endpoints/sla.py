@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_current_user, get_db, resolve_company_scope
+from app.models.sla import SlaPolicy
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.schemas.sla import SlaPolicyIn, SlaPolicyOut
+from app.services import sla
+
+router = APIRouter(prefix="/sla", tags=["sla"])
+
+
+@router.get("/policies", response_model=list[SlaPolicyOut])
+def list_policies(
+    db: Session = Depends(get_db),
+    company_id: int = Depends(resolve_company_scope),
+    user: User = Depends(get_current_user),
+):
+    """Políticas efectivas de la empresa por prioridad (propias o por defecto)."""
+    role = (user._token_payload or {}).get("role")
+    if role not in {"superadmin", "admin", "tech"}:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    policies = sla.policies_for(db, [company_id])
+    priorities = list(dict.fromkeys([*sla.DEFAULT_POLICIES, *(p for _, p in policies)]))
+    out = []
+    for priority in priorities:
+        first_response, resolve = sla.policy_minutes(policies, company_id, priority)
+        out.append(
+            SlaPolicyOut(
+                company_id=company_id,
+                priority=priority,
+                first_response_minutes=first_response,
+                resolve_minutes=resolve,
+                is_default=(company_id, priority) not in policies,
+            )
+        )
+    return out
+
+
+@router.put("/policies/{priority}", response_model=SlaPolicyOut)
+def set_policy(
+    priority: str,
+    payload: SlaPolicyIn,
+    db: Session = Depends(get_db),
+    company_id: int = Depends(resolve_company_scope),
+    user: User = Depends(get_current_user),
+):
+    """Crea o actualiza la política y recalcula vencimientos y estado de los tickets abiertos afectados."""
+    role = (user._token_payload or {}).get("role")
+    if role not in {"superadmin", "admin"}:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    if priority not in sla.DEFAULT_POLICIES:
+        raise HTTPException(
+            status_code=422, detail=f"Prioridad desconocida; usa una de: {', '.join(sla.DEFAULT_POLICIES)}"
+        )
+
+    row = db.query(SlaPolicy).filter(SlaPolicy.company_id == company_id, SlaPolicy.priority == priority).first()
+    if row is None:
+        row = SlaPolicy(company_id=company_id, priority=priority)
+        db.add(row)
+    row.first_response_minutes = payload.first_response_minutes
+    row.resolve_minutes = payload.resolve_minutes
+    row.updated_at = datetime.utcnow()
+    db.flush()
+
+    open_tickets = (
+        db.query(Ticket.id, Ticket.company_id, Ticket.priority, Ticket.created_at)
+        .filter(Ticket.company_id == company_id, Ticket.priority == priority, Ticket.status != "closed")
+        .all()
+    )
+    sla.restamp(db, open_tickets)
+    db.commit()
+    return SlaPolicyOut(
+        company_id=company_id,
+        priority=priority,
+        first_response_minutes=row.first_response_minutes,
+        resolve_minutes=row.resolve_minutes,
+    )
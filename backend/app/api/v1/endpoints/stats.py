@@ -1,12 +1,17 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_current_user, get_db, resolve_company_scope
+from app.core.stats_cache import ticket_stats_cache
+from app.models.company import Company
+from app.models.stats import TicketDailyStats
 from app.models.ticket import Ticket
 from app.models.user import User
+from app.services.analytics import resolution_distribution
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
@@ -33,6 +38,12 @@ def ticket_stats(
     if role not in {"superadmin", "admin", "tech"}:
         raise HTTPException(status_code=403, detail="Forbidden")
 
+    # Mismo resultado para todos los usuarios del mismo scope: cacheado y con coalescencia
+    scope = None if role == "superadmin" else company_id
+    return ticket_stats_cache.get_or_compute((scope, period), lambda: _compute_ticket_stats(db, role, company_id, period))
+
+
+def _compute_ticket_stats(db: Session, role: str, company_id: int, period: str) -> dict:
     start = _period_start(period)
 
     # Base query with company scope (admins/tech restricted; superadmin can see all)
@@ -42,18 +53,37 @@ def ticket_stats(
     else:
         qs = qs.filter(Ticket.company_id == company_id)
 
-    # Slice by period
-    tickets = qs.filter(Ticket.created_at >= start).all()
+    # Technician performance: tickets asignados creados desde start (total) y, de ésos, los cerrados
+    # (resolved). Días completos desde el rollup diario (filas por día de creación y estado actual);
+    # el resto del día de start, que sólo cuenta en parte, directamente de tickets
+    rollup_scope = [] if role == "superadmin" else [TicketDailyStats.company_id == company_id]
+    first_full_day = start.date() + timedelta(days=1)
+    per_assignee = (
+        db.query(
+            TicketDailyStats.assignee_id,
+            func.sum(TicketDailyStats.created),
+            func.sum(TicketDailyStats.created).filter(TicketDailyStats.status == "closed"),
+        )
+        .filter(*rollup_scope, TicketDailyStats.day >= first_full_day, TicketDailyStats.assignee_id != 0)
+        .group_by(TicketDailyStats.assignee_id)
+        .all()
+    )
+    per_assignee += (
+        qs.filter(
+            Ticket.created_at >= start,
+            Ticket.created_at < datetime.combine(first_full_day, datetime.min.time()),
+            Ticket.assignee_id.is_not(None),
+        )
+        .with_entities(Ticket.assignee_id, func.count(Ticket.id), func.count(Ticket.id).filter(Ticket.status == "closed"))
+        .group_by(Ticket.assignee_id)
+        .all()
+    )
 
-    # Technician performance
     totals: Dict[int, int] = {}
     resolved: Dict[int, int] = {}
-
-    for t in tickets:
-        if t.assignee_id:
-            totals[t.assignee_id] = totals.get(t.assignee_id, 0) + 1
-        if t.assignee_id and t.status == "closed" and t.resolved_at and t.resolved_at >= start:
-            resolved[t.assignee_id] = resolved.get(t.assignee_id, 0) + 1
+    for a, tot, res in per_assignee:
+        totals[a] = totals.get(a, 0) + int(tot or 0)
+        resolved[a] = resolved.get(a, 0) + int(res or 0)
 
     # user directory for names
     tech_qs = db.query(User)
@@ -78,7 +108,16 @@ def ticket_stats(
         )
 
     # Urgent unassigned (opened in any time window; alerting prioritizes current backlog)
-    urgent_unassigned = qs.filter(Ticket.priority == "urgent", Ticket.assignee_id.is_(None), Ticket.status != "closed").count()
+    urgent_unassigned = (
+        db.query(func.coalesce(func.sum(TicketDailyStats.created), 0))
+        .filter(
+            *rollup_scope,
+            TicketDailyStats.priority == "urgent",
+            TicketDailyStats.assignee_id == 0,
+            TicketDailyStats.status != "closed",
+        )
+        .scalar()
+    )
 
     # Pending user approvals (inactive)
     pending_approvals = db.query(User)
@@ -86,14 +125,11 @@ def ticket_stats(
         pending_approvals = pending_approvals.filter(User.company_id == company_id)
     pending_approvals = pending_approvals.filter(User.is_active.is_(False)).count()
 
-    # Hardware tickets (heurística hasta que tengamos campo dedicado)
-    # Consideramos título o descripción que contenga 'hardware' (case-insensitive)
-    hardware_q = qs.filter(
-        (Ticket.title.ilike("%hardware%")) | (Ticket.description.ilike("%hardware%"))
-    )
-    hardware_total = hardware_q.count()
-    hardware_open = hardware_q.filter(Ticket.status != "closed").count()
-    hardware_closed = hardware_q.filter(Ticket.status == "closed").count()
+    # Hardware tickets: categoría asignada al escribir (ix_tickets_company_category_status)
+    hardware_total, hardware_closed = qs.filter(Ticket.category == "hardware").with_entities(
+        func.count(Ticket.id), func.count(Ticket.id).filter(Ticket.status == "closed")
+    ).one()
+    hardware_open = hardware_total - hardware_closed
 
     return {
         "period": period,
@@ -107,4 +143,54 @@ def ticket_stats(
             "closed": hardware_closed,
         },
         "now": datetime.utcnow().isoformat(),
-    }
\ No newline at end of file
+    }
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Las columnas guardan UTC sin zona: una fecha con zona (p. ej. ...Z) se pasa a UTC naive."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@router.get("/resolution")
+def resolution_analytics(
+    start: Optional[datetime] = Query(None, description="Inicio (resolved_at >= start); por defecto end - 30 días"),
+    end: Optional[datetime] = Query(None, description="Fin exclusivo; por defecto ahora"),
+    bucket: str = Query("week", pattern="^(day|week|month)$"),
+    group_by: str = Query("priority", pattern="^(company|tech|priority)$"),
+    bins: int = Query(20, ge=1, le=100, description="Cubetas del histograma de horas de resolución"),
+    db: Session = Depends(get_db),
+    company_id: int = Depends(resolve_company_scope),
+    user: User = Depends(get_current_user),
+):
+    """Percentiles p50/p90/p99 de resolución y time_spent_minutes por cubeta temporal y grupo."""
+    role = (user._token_payload or {}).get("role")
+    if role not in {"superadmin", "admin", "tech"}:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    end = _naive_utc(end) or datetime.utcnow()
+    start = _naive_utc(start) or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(status_code=422, detail="start debe ser anterior a end")
+
+    scope = None if role == "superadmin" else company_id
+    result = resolution_distribution(db, start, end, scope, group_by=group_by, bucket=bucket, bins=bins)
+
+    # Nombres legibles para los grupos por id (una consulta)
+    ids = {s["group"] for s in result["series"] if s["group"] is not None}
+    names: Dict[int, str] = {}
+    if ids and group_by == "tech":
+        names = {u.id: u.full_name or u.email for u in db.query(User.id, User.full_name, User.email).filter(User.id.in_(ids))}
+    elif ids and group_by == "company":
+        names = dict(db.query(Company.id, Company.name).filter(Company.id.in_(ids)).all())
+    for s in result["series"]:
+        s["label"] = names.get(s["group"], s["group"]) if group_by != "priority" else s["group"]
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "bucket": bucket,
+        "group_by": group_by,
+        **result,
+    }
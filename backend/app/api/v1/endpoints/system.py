@@ -1,30 +1,39 @@
+from datetime import datetime
 from typing import Dict
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
+from app.core.config_cache import app_config_cache, invalidate_app_config
 from app.core.deps import get_current_user, get_db
 from app.models.config import AppConfig
 from app.schemas.system import EmailConfigIn, EmailConfigOut
 from app.core.config import settings
+from app.core.rate_limit import login_throttle
 from app.services.email import send_email
 
 router = APIRouter(prefix="/system", tags=["system"])
 
 
 def _get_all(db: Session) -> Dict[str, str]:
-    return {r.key: r.value for r in db.query(AppConfig).all()}
+    return app_config_cache.get(db)
 
 
 def _set_many(db: Session, data: Dict[str, str], secrets: set[str] | None = None):
+    """Upsert de todas las claves en una sentencia e invalidación de la caché en todos los workers."""
+    if not data:
+        return
     secrets = secrets or set()
-    for k, v in data.items():
-        row = db.query(AppConfig).filter(AppConfig.key == k).first()
-        if row:
-            row.value = v
-        else:
-            row = AppConfig(key=k, value=v, is_secret=(k in secrets))
-            db.add(row)
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    now = datetime.utcnow()
+    stmt = insert(AppConfig.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key"], set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at}
+    )
+    db.execute(stmt, [{"key": k, "value": v, "is_secret": k in secrets, "updated_at": now} for k, v in data.items()])
+    invalidate_app_config(db)
     db.commit()
 
 
@@ -118,4 +127,13 @@ def email_test(
     body = payload.get("body") or "Este es un correo de prueba de ServiceFlow."
 
     ok = send_email(to, subject, body, db)
-    return {"ok": bool(ok)}
\ No newline at end of file
+    return {"ok": bool(ok)}
+
+
+@router.get("/login-throttle")
+def login_throttle_metrics(current=Depends(get_current_user)):
+    role = (current._token_payload or {}).get("role")
+    if role not in {"superadmin", "admin"}:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    # Contadores de este worker
+    return login_throttle.metrics()
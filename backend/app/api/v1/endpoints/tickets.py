@@ -1,24 +1,44 @@
-from typing import Optional
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Header, Query, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, HTTPException, UploadFile, File, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Query as OrmQuery, Session, selectinload, undefer_group
 from datetime import datetime
 
 from app.core.deps import get_current_user, get_db, resolve_company_scope
+from app.core.etag import make_etag, not_modified
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.stats_cache import invalidate_ticket_stats
 from app.models.ticket import Ticket, Attachment, Comment, Worklog
 from app.models.user import User
+from app.schemas.user import UserSummary
 from app.schemas.ticket import (
     TicketCreate,
     TicketOut,
+    TicketListOut,
+    TicketExpandedOut,
+    TICKET_LIST_DEFAULT_FIELDS,
     AttachmentOut,
     TicketUpdate,
     TicketResolve,
+    TicketBulkUpdate,
+    TicketBulkItem,
+    TicketBulkResult,
+    TicketImportResult,
+    TicketDetailOut,
     CommentIn,
     CommentOut,
     WorklogOut,
 )
 from app.services.storage import StorageService
-from app.services.email import send_email
+from app.services.classifier import classify
+from app.services.export import stream_csv, stream_ndjson
+from app.services.notifications import queue_comment
+from app.services.rollup import SNAPSHOT_COLUMNS, apply_changes, snapshot
+from app.services.search import apply_search, index_tickets, remove_tickets
+from app.services import sla
+from app.services.ticket_import import import_tickets, rows_from_csv, rows_from_json, rows_from_ndjson
 
 router = APIRouter()
 
@@ -45,19 +65,98 @@ def _assert_ticket_scope(t: Ticket | None, user: User, company_id: int):
         raise HTTPException(status_code=404, detail="Ticket not found")
 
 
-@router.get("/", response_model=list[TicketOut])
-def list_tickets(
-    db: Session = Depends(get_db),
-    company_id: int = Depends(resolve_company_scope),
-    user: User = Depends(get_current_user),
-    x_company_id: Optional[int] = Header(None, alias="X-Company-Id"),
-    status: Optional[str] = Query(None),
-    priority: Optional[str] = Query(None),
-    assignee_id: Optional[int] = Query(None),
-    q: Optional[str] = Query(None),
-    limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
-):
+def _ticket_scope_clause(user: User, company_id: int):
+    """
+    Equivalente SQL de _assert_ticket_scope: None si el usuario puede operar en cualquier empresa.
+    """
+    role = (user._token_payload or {}).get("role")
+    if role == "superadmin":
+        return None
+    if role == "tech" and getattr(user, "can_view_all_companies", False):
+        return None
+    return Ticket.company_id == company_id
+
+
+def _hhmm_to_minutes(hhmm: str) -> int:
+    hh, mm = hhmm.split(":")
+    return int(hh) * 60 + int(mm)
+
+
+def _parse_fields(fields: Optional[str]) -> list[str]:
+    if not fields:
+        return TICKET_LIST_DEFAULT_FIELDS
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(TicketOut.model_fields)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Campos desconocidos: {', '.join(sorted(unknown))}")
+    # id siempre presente; se respeta el orden del schema
+    return [f for f in TicketOut.model_fields if f in requested or f == "id"]
+
+
+_EXPANDABLE = {"requester", "assignee"}
+
+# /bulk: máximo de tickets por petición (mismo tope que ids en TicketBulkUpdate) y filas por lote
+BULK_MAX = 5000
+BULK_CHUNK = 500
+
+
+def _parse_expand(expand: Optional[str]) -> set[str]:
+    if not expand:
+        return set()
+    requested = {e.strip() for e in expand.split(",") if e.strip()}
+    unknown = requested - _EXPANDABLE
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"expand desconocido: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def _user_summaries(db: Session, user_ids: set[int | None]) -> dict[int, UserSummary]:
+    """Carga en una sola consulta (IN) los usuarios referenciados."""
+    ids = {i for i in user_ids if i is not None}
+    if not ids:
+        return {}
+    rows = db.query(User.id, User.email, User.full_name).filter(User.id.in_(ids)).all()
+    return {r.id: UserSummary(id=r.id, email=r.email, full_name=r.full_name) for r in rows}
+
+
+def _user_versions(db: Session, user_ids: set[int | None]) -> list[str]:
+    """id@updated_at de los usuarios expandidos: renombrar a uno cambia el ETag de lo que lo incluye."""
+    ids = {i for i in user_ids if i is not None}
+    if not ids:
+        return []
+    rows = db.query(User.id, User.updated_at).filter(User.id.in_(ids)).order_by(User.id).all()
+    return [f"{r.id}@{r.updated_at}" for r in rows]
+
+
+# Columnas que forman la versión de un ticket en los ETag: updated_at más las que los procesos
+# de fondo (escáner/restamp de SLA, backfill de categorías) reescriben sin tocar updated_at
+_VERSION_COLUMNS = (
+    Ticket.updated_at,
+    Ticket.sla_state,
+    Ticket.first_response_due_at,
+    Ticket.resolve_due_at,
+    Ticket.category,
+)
+
+
+def _version(row) -> str:
+    return "@".join(str(row[i]) for i in range(len(_VERSION_COLUMNS)))
+
+
+def _filtered_tickets(
+    db: Session,
+    user: User,
+    company_id: int,
+    x_company_id: Optional[int],
+    status: Optional[str],
+    priority: Optional[str],
+    assignee_id: Optional[int],
+    q: Optional[str],
+) -> OrmQuery:
+    """
+    Tickets visibles para el usuario con los filtros de listado aplicados (sin orden ni paginación,
+    salvo el orden por relevancia cuando hay q).
+    """
     role = (user._token_payload or {}).get("role")
     qs = db.query(Ticket)
 
@@ -87,23 +186,195 @@ def list_tickets(
     if assignee_id:
         qs = qs.filter(Ticket.assignee_id == assignee_id)
     if q:
-        like = f"%{q}%"
-        qs = qs.filter(Ticket.title.ilike(like))
+        # Full-text sobre título, descripción y comentarios públicos, ordenado por relevancia
+        qs = apply_search(qs, db, q)
+    return qs
 
-    qs = qs.order_by(Ticket.created_at.desc()).limit(limit).offset(offset)
-    return qs.all()
+
+@router.get("/", response_model=list[TicketListOut], response_model_exclude_unset=True)
+def list_tickets(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    company_id: int = Depends(resolve_company_scope),
+    user: User = Depends(get_current_user),
+    x_company_id: Optional[int] = Header(None, alias="X-Company-Id"),
+    status: Optional[str] = Query(None),
+    priority: Optional[str] = Query(None),
+    assignee_id: Optional[int] = Query(None),
+    q: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(
+        None, description="Cursor opaco devuelto en la cabecera X-Next-Cursor (no compatible con q)"
+    ),
+    fields: Optional[str] = Query(None, description="Campos separados por comas (por defecto sin TEXT pesados)"),
+    expand: Optional[str] = Query(None, description="requester,assignee"),
+):
+    # El siguiente cursor viaja en la cabecera X-Next-Cursor (el cuerpo sigue siendo una lista, como
+    # antes). Con q el orden es por relevancia: sólo hay paginación por offset y no se emite cursor
+    if cursor and q:
+        raise HTTPException(status_code=422, detail="cursor no es compatible con q; pagina con offset")
+    out_fields = _parse_fields(fields)
+    expanded = _parse_expand(expand)
+    qs = _filtered_tickets(db, user, company_id, x_company_id, status, priority, assignee_id, q)
+
+    qs = qs.order_by(Ticket.created_at.desc(), Ticket.id.desc())
+    if cursor:
+        # Keyset: salta directamente a la posición usando (company_id, created_at, id)
+        created_at, last_id = decode_cursor(cursor)
+        qs = qs.filter(tuple_(Ticket.created_at, Ticket.id) < tuple_(created_at, last_id))
+    else:
+        # Modo legacy por offset
+        qs = qs.offset(offset)
+    qs = qs.limit(limit)
+
+    # Huella de la página (id + versión de sus filas) por el mismo índice y límite que el listado:
+    # si no cambió, 304 sin cargar ni serializar el resto de columnas
+    versions = qs.with_entities(
+        *_VERSION_COLUMNS, Ticket.id, *(getattr(Ticket, f"{e}_id") for e in expanded)
+    ).all()
+    etag = make_etag(
+        "tickets",
+        user.id,
+        company_id,
+        x_company_id,
+        request.url.query,
+        *(f"{v.id}@{_version(v)}" for v in versions),
+        *_user_versions(db, {getattr(v, f"{e}_id") for v in versions for e in expanded}),
+    )
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
+    # Proyección a nivel SQL: sólo las columnas pedidas (+ las del cursor)
+    select_fields = list(dict.fromkeys([*out_fields, "id", "created_at", *(f"{e}_id" for e in expanded)]))
+    rows = qs.with_entities(*(getattr(Ticket, f) for f in select_fields)).all()
+    if len(rows) == limit and not q:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+
+    users = _user_summaries(db, {getattr(r, f"{e}_id") for r in rows for e in expanded})
+    out = []
+    for r in rows:
+        item = {f: getattr(r, f) for f in out_fields}
+        for e in expanded:
+            item[e] = users.get(getattr(r, f"{e}_id"))
+        out.append(TicketListOut(**item))
+    return out
 
 
-@router.get("/{ticket_id}", response_model=TicketOut)
+@router.get("/export")
+def export_tickets(
+    db: Session = Depends(get_db),
+    company_id: int = Depends(resolve_company_scope),
+    user: User = Depends(get_current_user),
+    x_company_id: Optional[int] = Header(None, alias="X-Company-Id"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status: Optional[str] = Query(None),
+    priority: Optional[str] = Query(None),
+    assignee_id: Optional[int] = Query(None),
+    q: Optional[str] = Query(None),
+):
+    qs = _filtered_tickets(db, user, company_id, x_company_id, status, priority, assignee_id, q)
+    qs = qs.order_by(Ticket.created_at.desc(), Ticket.id.desc())
+
+    if format == "ndjson":
+        return StreamingResponse(
+            stream_ndjson(qs),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": 'attachment; filename="tickets.ndjson"'},
+        )
+    return StreamingResponse(
+        stream_csv(qs),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="tickets.csv"'},
+    )
+
+
+@router.get("/{ticket_id}", response_model=TicketExpandedOut, response_model_exclude_unset=True)
 def get_ticket(
     ticket_id: int,
+    request: Request,
+    response: Response,
+    expand: Optional[str] = Query(None, description="requester,assignee"),
     db: Session = Depends(get_db),
     company_id: int = Depends(resolve_company_scope),
     user: User = Depends(get_current_user),
 ):
-    t = db.get(Ticket, ticket_id)
+    expanded = _parse_expand(expand)
+    # Sondeo ligero (scope + versión) antes de cargar el ticket completo
+    probe = (
+        db.query(*_VERSION_COLUMNS, Ticket.company_id, Ticket.requester_id, Ticket.assignee_id)
+        .filter(Ticket.id == ticket_id)
+        .first()
+    )
+    _assert_ticket_scope(probe, user, company_id)
+    users_version = _user_versions(db, {getattr(probe, f"{e}_id") for e in expanded})
+    etag = make_etag("ticket", ticket_id, _version(probe), request.url.query, *users_version)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
+    t = db.get(Ticket, ticket_id, options=[undefer_group("text")])
+    out = TicketOut.model_validate(t).model_dump()
+    users = _user_summaries(db, {getattr(t, f"{e}_id") for e in expanded})
+    for e in expanded:
+        out[e] = users.get(getattr(t, f"{e}_id"))
+    return TicketExpandedOut(**out)
+
+
+@router.get("/{ticket_id}/detail", response_model=TicketDetailOut)
+def get_ticket_detail(
+    ticket_id: int,
+    mine_only: bool = Query(True, description="Worklogs: sólo los del usuario actual"),
+    db: Session = Depends(get_db),
+    company_id: int = Depends(resolve_company_scope),
+    user: User = Depends(get_current_user),
+):
+    """
+    Ticket con comentarios, adjuntos, worklogs y solicitante/asignado en un número fijo de consultas
+    (mismas reglas de visibilidad que los endpoints individuales).
+    """
+    role = (user._token_payload or {}).get("role")
+    comments = Ticket.comments
+    if role == "user":
+        comments = comments.and_(Comment.is_public.is_(True))
+    worklogs = Ticket.worklogs
+    if mine_only or role == "user":
+        worklogs = worklogs.and_(Worklog.user_id == user.id)
+
+    t = db.get(
+        Ticket,
+        ticket_id,
+        options=[
+            undefer_group("text"),
+            selectinload(Ticket.requester),
+            selectinload(Ticket.assignee),
+            selectinload(comments),
+            selectinload(Ticket.attachments),
+            selectinload(worklogs),
+        ],
+    )
     _assert_ticket_scope(t, user, company_id)
-    return t  # type: ignore[return-value]
+
+    storage = StorageService()
+    return TicketDetailOut(
+        **TicketOut.model_validate(t).model_dump(),
+        requester=t.requester,
+        assignee=t.assignee,
+        comments=sorted(t.comments, key=lambda c: c.created_at, reverse=True),
+        worklogs=sorted(t.worklogs, key=lambda w: w.started_at),
+        attachments=[
+            AttachmentOut(
+                id=att.id,
+                filename=att.filename,
+                content_type=att.content_type,
+                url=storage.get_file_url(att.storage_key),
+            )
+            for att in t.attachments
+        ],
+    )
 
 
 @router.post("/", response_model=TicketOut)
@@ -119,11 +390,16 @@ def create_ticket(
         description=payload.description,
         status=payload.status or "open",
         priority=payload.priority,
+        category=classify(payload.title, payload.description),
         requester_id=user.id,
         assignee_id=payload.assignee_id,
         company_id=company_id,
     )
+    sla.stamp(db, t)
     db.add(t)
+    db.flush()
+    index_tickets(db, [t.id])
+    apply_changes(db, [(None, snapshot(t))])
     db.commit()
     db.refresh(t)
     return t
@@ -137,20 +413,33 @@ def update_ticket(
     company_id: int = Depends(resolve_company_scope),
     user: User = Depends(get_current_user),
 ):
-    t = db.get(Ticket, ticket_id)
+    # FOR UPDATE: el delta del rollup parte del estado leído aquí
+    t = db.get(Ticket, ticket_id, with_for_update=True)
     _assert_ticket_scope(t, user, company_id)
     role = (user._token_payload or {}).get("role")
     if role not in {"superadmin", "admin", "tech"}:
         raise HTTPException(status_code=403, detail="Forbidden")
 
+    before = snapshot(t)
+    before_category = t.category
     if payload.status is not None:
         t.status = payload.status  # type: ignore[attr-defined]
-    if payload.priority is not None:
+        if payload.status != "open" and t.first_responded_at is None:
+            # El personal ha tomado el ticket: cuenta como primera respuesta
+            t.first_responded_at = datetime.utcnow()  # type: ignore[attr-defined]
+    if payload.priority is not None and payload.priority != t.priority:
         t.priority = payload.priority  # type: ignore[attr-defined]
+        sla.stamp(db, t)
     if payload.assignee_id is not None:
         t.assignee_id = payload.assignee_id  # type: ignore[attr-defined]
+    if payload.category is not None:
+        t.category = payload.category  # type: ignore[attr-defined]
 
     db.add(t)
+    if t.category != before_category:
+        # La categoría no forma parte del rollup: invalida directamente las stats cacheadas
+        invalidate_ticket_stats(db, [t.company_id])
+    apply_changes(db, [(before, snapshot(t))])
     db.commit()
     db.refresh(t)
     return t
@@ -168,6 +457,8 @@ def delete_ticket(
     role = (user._token_payload or {}).get("role")
     if role not in {"superadmin", "admin"}:
         raise HTTPException(status_code=403, detail="Forbidden")
+    remove_tickets(db, [t.id])
+    apply_changes(db, [(snapshot(t), None)])
     db.delete(t)
     db.commit()
     return {"ok": True}
@@ -181,30 +472,175 @@ def resolve_ticket(
     company_id: int = Depends(resolve_company_scope),
     user: User = Depends(get_current_user),
 ):
-    t = db.get(Ticket, ticket_id)
+    t = db.get(Ticket, ticket_id, with_for_update=True)
     _assert_ticket_scope(t, user, company_id)
 
     role = (user._token_payload or {}).get("role")
     if role not in {"superadmin", "admin", "tech"}:
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    # Parse HH:MM
-    hh, mm = payload.time_spent_hhmm.split(":")
-    minutes = int(hh) * 60 + int(mm)
-
+    before = snapshot(t)
     t.resolution_summary = payload.resolution_summary  # type: ignore[attr-defined]
-    t.time_spent_minutes = minutes  # type: ignore[attr-defined]
+    t.time_spent_minutes = _hhmm_to_minutes(payload.time_spent_hhmm)  # type: ignore[attr-defined]
     t.status = payload.status or "closed"  # type: ignore[attr-defined]
-    if payload.priority is not None:
+    if payload.priority is not None and payload.priority != t.priority:
         t.priority = payload.priority  # type: ignore[attr-defined]
+        sla.stamp(db, t)
     t.resolved_at = datetime.utcnow()  # type: ignore[attr-defined]
+    if t.first_responded_at is None:
+        t.first_responded_at = t.resolved_at  # type: ignore[attr-defined]
+    t.sla_state = sla.resolved_state(t)  # type: ignore[attr-defined]
 
     db.add(t)
+    apply_changes(db, [(before, snapshot(t))])
     db.commit()
     db.refresh(t)
     return t
 
 
+def _bulk_batches(qs, ids: Optional[list[int]]):
+    """
+    Afectados de /bulk en lotes de BULK_CHUNK, bloqueados y con las columnas del snapshot (delta
+    del rollup): por trozos de ids o, con filtro, por keyset sobre id. Acota memoria y parámetros.
+    """
+
+    def locked(q):
+        return q.with_entities(Ticket.id, *SNAPSHOT_COLUMNS).with_for_update(of=Ticket).all()
+
+    if ids is not None:
+        for i in range(0, len(ids), BULK_CHUNK):
+            rows = locked(qs.filter(Ticket.id.in_(ids[i : i + BULK_CHUNK])))
+            if rows:
+                yield rows
+        return
+    last_id = 0
+    while True:
+        rows = locked(qs.filter(Ticket.id > last_id).order_by(Ticket.id).limit(BULK_CHUNK))
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+@router.post("/bulk", response_model=TicketBulkResult)
+def bulk_update_tickets(
+    payload: TicketBulkUpdate,
+    db: Session = Depends(get_db),
+    company_id: int = Depends(resolve_company_scope),
+    user: User = Depends(get_current_user),
+    x_company_id: Optional[int] = Header(None, alias="X-Company-Id"),
+):
+    """
+    Asigna/cambia prioridad/resuelve muchos tickets en una sola transacción, por lotes de
+    BULK_CHUNK: por cada lote una consulta que valida el scope y bloquea las filas y un UPDATE.
+    Con filtro se cuenta antes y se rechaza si afecta a más de BULK_MAX tickets.
+    """
+    role = (user._token_payload or {}).get("role")
+    if role not in {"superadmin", "admin", "tech"}:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    if (payload.ids is None) == (payload.filter is None):
+        raise HTTPException(status_code=422, detail="Indica 'ids' o 'filter'")
+    if payload.update is None and payload.resolve is None:
+        raise HTTPException(status_code=422, detail="Indica 'update' y/o 'resolve'")
+
+    now = datetime.utcnow()
+    values: dict = {}
+    if payload.update is not None:
+        if payload.update.status is not None:
+            values[Ticket.status] = payload.update.status
+        if payload.update.priority is not None:
+            values[Ticket.priority] = payload.update.priority
+        if payload.update.assignee_id is not None:
+            values[Ticket.assignee_id] = payload.update.assignee_id
+        if payload.update.category is not None:
+            values[Ticket.category] = payload.update.category
+    if payload.resolve is not None:
+        values[Ticket.resolution_summary] = payload.resolve.resolution_summary
+        values[Ticket.time_spent_minutes] = _hhmm_to_minutes(payload.resolve.time_spent_hhmm)
+        values[Ticket.status] = payload.resolve.status or "closed"
+        if payload.resolve.priority is not None:
+            values[Ticket.priority] = payload.resolve.priority
+        values[Ticket.resolved_at] = now
+        values[Ticket.sla_state] = sla.resolved_state_sql(now)
+    if not values:
+        raise HTTPException(status_code=422, detail="No hay cambios que aplicar")
+    if values.get(Ticket.status, "open") != "open":
+        values[Ticket.first_responded_at] = func.coalesce(Ticket.first_responded_at, now)
+    values[Ticket.updated_at] = now
+
+    if payload.ids is not None:
+        requested = list(dict.fromkeys(payload.ids))
+        qs = db.query(Ticket)
+        scope = _ticket_scope_clause(user, company_id)
+        if scope is not None:
+            qs = qs.filter(scope)
+    else:
+        f = payload.filter
+        requested = None
+        qs = _filtered_tickets(db, user, company_id, x_company_id, f.status, f.priority, f.assignee_id, f.q)
+        qs = qs.order_by(None)
+        matched = qs.with_entities(func.count(Ticket.id)).scalar() or 0
+        if matched > BULK_MAX:
+            raise HTTPException(
+                status_code=422, detail=f"El filtro afecta a {matched} tickets (máximo {BULK_MAX}); acótalo más"
+            )
+
+    allowed: set[int] = set()
+    changed = {col.key: v for col, v in values.items()}
+    for current in _bulk_batches(qs, requested):
+        ids = [r.id for r in current]
+        if Ticket.priority in values:
+            # Antes del UPDATE: el estado final al resolver se calcula con los nuevos vencimientos
+            new_priority = values[Ticket.priority]
+            sla.restamp(db, [r for r in current if r.priority != new_priority], priority=new_priority)
+        db.query(Ticket).filter(Ticket.id.in_(ids)).update(values, synchronize_session=False)
+        apply_changes(db, ((snapshot(r), snapshot(r).with_values(changed)) for r in current))
+        if Ticket.category in values:
+            invalidate_ticket_stats(db, {r.company_id for r in current})
+        allowed.update(ids)
+    db.commit()
+
+    if requested is None:
+        requested = sorted(allowed)
+    results = [
+        TicketBulkItem(id=tid, ok=True) if tid in allowed else TicketBulkItem(id=tid, ok=False, detail="Ticket not found")
+        for tid in requested
+    ]
+    return TicketBulkResult(updated=len(allowed), results=results)
+
+
+@router.post("/import", response_model=TicketImportResult)
+def import_tickets_json(
+    payload: list[Any] = Body(...),
+    db: Session = Depends(get_db),
+    company_id: int = Depends(resolve_company_scope),
+    user: User = Depends(get_current_user),
+):
+    """Importación masiva desde un array JSON de TicketCreate; los errores se reportan por fila."""
+    role = (user._token_payload or {}).get("role")
+    if role not in {"superadmin", "admin", "tech"}:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return import_tickets(db, rows_from_json(payload), requester_id=user.id, company_id=company_id)
+
+
+@router.post("/import/file", response_model=TicketImportResult)
+def import_tickets_file(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Por defecto según la extensión"),
+    db: Session = Depends(get_db),
+    company_id: int = Depends(resolve_company_scope),
+    user: User = Depends(get_current_user),
+):
+    """Importación masiva desde un fichero CSV (con cabecera) o NDJSON, leído en streaming."""
+    role = (user._token_payload or {}).get("role")
+    if role not in {"superadmin", "admin", "tech"}:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    fmt = format or ("ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv")
+    rows = rows_from_ndjson(file.file) if fmt == "ndjson" else rows_from_csv(file.file)
+    return import_tickets(db, rows, requester_id=user.id, company_id=company_id)
+
+
 # Attachments
 @router.post("/{ticket_id}/attachments", response_model=AttachmentOut)
 def upload_attachment(
@@ -279,7 +715,6 @@ def list_comments(
 def add_comment(
     ticket_id: int,
     payload: CommentIn,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     company_id: int = Depends(resolve_company_scope),
     user: User = Depends(get_current_user),
@@ -290,26 +725,28 @@ def add_comment(
     is_public = payload.is_public if role in {"superadmin", "admin", "tech"} else True
     c = Comment(ticket_id=ticket_id, user_id=user.id, body=payload.body, is_public=is_public)
     db.add(c)
+    if role in {"superadmin", "admin", "tech"} and is_public and t.first_responded_at is None:
+        t.first_responded_at = datetime.utcnow()  # type: ignore[attr-defined]
+    if is_public:
+        index_tickets(db, [ticket_id])
+
+    # Notificaciones email en la misma transacción que el comentario: se agrupan por (destinatario, ticket)
+    # o en el resumen horario/diario del destinatario y el worker del outbox las envía
+    recipient = None
+    # Staff -> user (only if public)
+    if role in {"superadmin", "admin", "tech"} and is_public and t.requester and t.requester.email:
+        recipient = t.requester
+    # User -> technician (if assigned)
+    if role == "user" and t.assignee and t.assignee.email:
+        recipient = t.assignee
+    if recipient is not None:
+        queue_comment(
+            db, recipient.email, recipient.email_digest, t.id, t.title, user.full_name or user.email, payload.body
+        )
+
     db.commit()
     db.refresh(c)
 
-    # Notifications email
-    try:
-        subject = f"Nueva actividad en tu ticket #{t.id}"
-        # Staff -> user (only if public)
-        if role in {"superadmin", "admin", "tech"} and is_public and t.requester and t.requester.email:
-            to_email = t.requester.email
-            body = f"Hola,\n\nHay un nuevo comentario en tu ticket #{t.id} - {t.title}.\n\nComentario:\n{payload.body}\n\n--\nServiceFlow"
-            background_tasks.add_task(send_email, to_email, subject, body, db)
-        # User -> technician (if assigned)
-        if role == "user" and t.assignee and t.assignee.email:
-            to_email = t.assignee.email
-            body = f"Hola,\n\nEl usuario ha añadido un comentario en el ticket #{t.id} - {t.title}.\n\nComentario:\n{payload.body}\n\n--\nServiceFlow"
-            background_tasks.add_task(send_email, to_email, subject, body, db)
-    except Exception:
-        # Nunca romper la API por el envío de email
-        pass
-
     return c
 
 
@@ -1,18 +1,24 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_current_user, get_db, resolve_company_scope
+from app.core.etag import make_etag, not_modified
+from app.core.principal_cache import invalidate_principal
 from app.core.security import get_password_hash
 from app.models.user import User
 from app.schemas.user import UserCreate, UserOut, UserUpdate
+from app.services.notifications import DIGEST_MODES
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/", response_model=list[UserOut])
 def list_users(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
     company_id: int = Depends(resolve_company_scope),
@@ -33,6 +39,12 @@ def list_users(
         qs = qs.filter(User.is_active.is_(active))
     if role_filter:
         qs = qs.filter(User.role == role_filter)
+
+    count, last_update = qs.with_entities(func.count(User.id), func.max(User.updated_at)).one()
+    etag = make_etag("users", user.id, company_id, request.url.query, count, last_update)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
     return qs.all()
 
 
@@ -112,10 +124,15 @@ def update_user(
         if role not in {"superadmin", "admin"}:
             raise HTTPException(status_code=403, detail="Forbidden")
         u.can_view_all_companies = payload.can_view_all_companies
+    if payload.email_digest is not None:
+        if payload.email_digest not in DIGEST_MODES:
+            raise HTTPException(status_code=422, detail=f"email_digest debe ser uno de: {', '.join(DIGEST_MODES)}")
+        u.email_digest = payload.email_digest
     if payload.password:
         u.hashed_password = get_password_hash(payload.password)
 
     db.add(u)
+    invalidate_principal(db, u.id)
     db.commit()
     db.refresh(u)
     return u
@@ -136,6 +153,7 @@ def delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     if role == "admin" and u.company_id != current.company_id:
         raise HTTPException(status_code=403, detail="Forbidden")
+    invalidate_principal(db, u.id)
     db.delete(u)
     db.commit()
     return {"ok": True}
\ No newline at end of file
@@ -8,6 +8,7 @@ from app.api.v1.endpoints.companies import router as companies_router
 from app.api.v1.endpoints.dashboard import router as dashboard_router
 from app.api.v1.endpoints.stats import router as stats_router
 from app.api.v1.endpoints.system import router as system_router
+from app.api.v1.endpoints.sla import router as sla_router
 
 api_router = APIRouter()
 
@@ -30,4 +31,7 @@ api_router.include_router(dashboard_router)
 api_router.include_router(stats_router)
 
 # System
-api_router.include_router(system_router)
\ No newline at end of file
+api_router.include_router(system_router)
+
+# SLA
+api_router.include_router(sla_router)
\ No newline at end of file
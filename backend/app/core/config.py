@@ -7,6 +7,37 @@ class Settings(BaseSettings):
     JWT_SECRET: str = Field(..., description="Secret used to sign JWTs")
     JWT_EXPIRE_MIN: int = 60 * 24
 
+    # Verified JWT cache size (0 disables)
+    TOKEN_CACHE_SIZE: int = 10000
+
+    # Principal cache for get_current_user (0 disables)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_SIZE: int = 10000
+
+    # /stats/tickets result cache (0 disables)
+    STATS_CACHE_TTL_SECONDS: int = 30
+    STATS_CACHE_SIZE: int = 1000
+
+    # app_config cache (invalidated on write via NOTIFY; TTL is a safety net, 0 disables)
+    APP_CONFIG_CACHE_TTL_SECONDS: int = 300
+
+    # SLA breach scanner (0 disables the in-process scanner thread)
+    SLA_SCAN_INTERVAL_SECONDS: int = 60
+    SLA_AT_RISK_MINUTES: int = 60
+
+    # Ticket categorization: "module:attr" of a custom classifier (empty = built-in keyword rules)
+    TICKET_CLASSIFIER: str = ""
+
+    # Login throttling (token buckets per IP and per account)
+    LOGIN_THROTTLE_BACKEND: str = "memory"  # memory | database
+    LOGIN_THROTTLE_IP_BURST: int = 20
+    LOGIN_THROTTLE_IP_PER_MIN: float = 20
+    LOGIN_THROTTLE_ACCOUNT_BURST: int = 5
+    LOGIN_THROTTLE_ACCOUNT_PER_MIN: float = 5
+
+    # Dedicated bcrypt executor size (concurrent password hash/verify operations)
+    PASSWORD_HASH_WORKERS: int = 4
+
     # Email provider (default SMTP); can be overridden by DB settings
     EMAIL_PROVIDER: str = "smtp"  # smtp | mailjet
     FROM_EMAIL: str | None = None
@@ -16,10 +47,34 @@ class Settings(BaseSettings):
     SMTP_PORT: int | None = None
     SMTP_USER: str | None = None
     SMTP_PASS: str | None = None
+    # Pooled SMTP sessions (reused across sends)
+    SMTP_POOL_SIZE: int = 4
+    SMTP_POOL_IDLE_SECONDS: int = 60
+    SMTP_POOL_HEALTHCHECK_SECONDS: int = 5
+    SMTP_TIMEOUT_SECONDS: int = 30
 
     # Mailjet defaults (can be overridden by DB settings)
     MAILJET_API_KEY: str | None = None
     MAILJET_API_SECRET: str | None = None
+    MAILJET_API_URL: str = "https://api.mailjet.com/v3.1/send"
+    MAILJET_POOL_SIZE: int = 4  # conexiones keep-alive a la API de Mailjet
+
+    # Email outbox worker (python -m app.services.outbox worker)
+    EMAIL_OUTBOX_BATCH: int = 50
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_BACKOFF_SECONDS: int = 30
+    EMAIL_OUTBOX_BACKOFF_MAX_SECONDS: int = 3600
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 300
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 7
+
+    # Comment notifications: merged per (recipient, ticket) over this window (0 = one email per comment);
+    # users with hourly/daily digests get one email per period
+    NOTIFY_COALESCE_SECONDS: int = 300
+    NOTIFY_DAILY_DIGEST_HOUR: int = 8  # UTC
+
+    # Full-text search (Postgres text search configuration)
+    SEARCH_LANGUAGE: str = "spanish"
 
     # File storage
     UPLOAD_DIR: str = "./storage/uploads"
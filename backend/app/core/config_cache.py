@@ -0,0 +1,60 @@
+"""
+Caché en proceso de app_config (clave -> valor).
+
+Se carga una vez por worker y se sirve desde memoria; cada escritura incrementa la versión
+local e invalida al resto de workers por NOTIFY (app.core.notify). Una carga iniciada antes de
+una invalidación no se guarda. APP_CONFIG_CACHE_TTL_SECONDS es sólo una red de seguridad por
+si se pierde algún NOTIFY (p. ej. mientras el listener reconecta); 0 desactiva la caché.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import notify
+from app.core.config import settings
+from app.models.config import AppConfig
+
+CHANNEL = "app_config_invalidate"
+
+
+class AppConfigCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self._data: Optional[Dict[str, str]] = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> Dict[str, str]:
+        """Copia de la configuración; sólo consulta la BD si no está cargada o ha caducado."""
+        with self._lock:
+            if self._data is not None and self._expires >= time.monotonic():
+                return dict(self._data)
+            version = self.version
+        c = AppConfig.__table__.c
+        data = {r.key: r.value for r in db.execute(select(c.key, c.value)).all()}
+        with self._lock:
+            if self.ttl > 0 and version == self.version:
+                self._data = data
+                self._expires = time.monotonic() + self.ttl
+        return dict(data)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._data = None
+
+
+app_config_cache = AppConfigCache(settings.APP_CONFIG_CACHE_TTL_SECONDS)
+
+notify.subscribe(CHANNEL, lambda _payload: app_config_cache.invalidate())
+
+
+def invalidate_app_config(db: Session) -> None:
+    """Invalida la configuración en este y en los demás workers (al hacer commit de db)."""
+    notify.publish(db, CHANNEL, "*")
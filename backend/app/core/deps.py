@@ -5,6 +5,8 @@ from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.core.token_cache import token_cache
 from app.db.session import SessionLocal
 from app.models.user import User
 
@@ -25,13 +27,20 @@ def get_current_user(
         raise HTTPException(status_code=401, detail="Not authenticated")
     token = authorization.split(" ", 1)[1]
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
+        # Firma verificada una vez por token; después, desde la caché hasta su exp
+        payload = token_cache.decode(token, lambda t: jwt.decode(t, settings.JWT_SECRET, algorithms=["HS256"]))
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
-    user = db.get(User, int(user_id))
+    # Identidad desde la caché en proceso; sólo se consulta la BD en un fallo de caché
+    user = principal_cache.get(int(user_id))
+    if user is None:
+        version = principal_cache.version
+        user = db.get(User, int(user_id))
+        if user:
+            principal_cache.put(user, version)
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail="Inactive user")
     user._token_payload = payload  # attach token payload (role, company_id)
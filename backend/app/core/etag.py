@@ -0,0 +1,34 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    ETag débil a partir de una huella barata (p. ej. id + updated_at, o count + max(updated_at)).
+    """
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    tags = [t.strip() for t in if_none_match.split(",")]
+    if "*" in tags:
+        return True
+    # Comparación débil: se ignora el prefijo W/
+    bare = etag.removeprefix("W/")
+    return any(t.removeprefix("W/") == bare for t in tags)
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Añade ETag a la respuesta y, si el cliente ya tiene esa versión (If-None-Match),
+    devuelve un 304 listo para retornar sin serializar nada.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    response.headers.update(headers)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return None
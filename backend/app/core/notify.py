@@ -0,0 +1,109 @@
+"""
+Invalidación entre workers vía Postgres LISTEN/NOTIFY.
+
+publish() emite un NOTIFY dentro de la transacción de la sesión (se entrega al hacer commit) y
+ejecuta los callbacks locales tras ese commit; cada worker mantiene un hilo con una conexión
+dedicada en LISTEN que despacha a los callbacks registrados con subscribe(). En SQLite (un solo proceso) sólo se ejecutan los callbacks locales.
+"""
+from __future__ import annotations
+
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Callable
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_handlers: dict[str, list[Callable[[str], None]]] = defaultdict(list)
+_listener: threading.Thread | None = None
+_stop = threading.Event()
+# Clave en Session.info con las notificaciones pendientes de commit
+_PENDING_KEY = "notify_pending"
+
+
+def subscribe(channel: str, handler: Callable[[str], None]) -> None:
+    _handlers[channel].append(handler)
+
+
+def _dispatch(channel: str, payload: str) -> None:
+    for handler in _handlers.get(channel, []):
+        try:
+            handler(payload)
+        except Exception:
+            logger.exception("notify handler failed for channel %s", channel)
+
+
+def publish(db: Session, channel: str, payload: str) -> None:
+    """
+    Notifica a todos los workers cuando la transacción de db hace commit: los demás por NOTIFY y
+    este proceso desde el hook after_commit (si se invalidara antes, otra petición podría recargar
+    la fila aún sin confirmar y cachearla hasta el TTL). Un rollback descarta la notificación.
+    """
+    # connection() abre la transacción de la sesión si aún no existe: sus hooks de fin la acompañan
+    conn = db.connection()
+    db.info.setdefault(_PENDING_KEY, []).append((channel, payload))
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+def _connect(engine: Engine):
+    """Conexión DBAPI propia, fuera del pool: el LISTEN y el autocommit no llegan nunca a las peticiones."""
+    cargs, cparams = engine.dialect.create_connect_args(engine.url)
+    return engine.dialect.connect(*cargs, **cparams)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed(session: Session) -> None:
+    for channel, payload in session.info.pop(_PENDING_KEY, []):
+        _dispatch(channel, payload)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session: Session, transaction) -> None:
+    # Tras after_commit ya no queda nada; si la transacción acabó en rollback o close, se descarta
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _listen_loop(engine: Engine, poll_seconds: float) -> None:
+    while not _stop.is_set():
+        try:
+            dbapi_conn = _connect(engine)
+            try:
+                dbapi_conn.autocommit = True
+                cur = dbapi_conn.cursor()
+                for channel in list(_handlers):
+                    cur.execute(f'LISTEN "{channel}"')
+                while not _stop.is_set():
+                    if select.select([dbapi_conn], [], [], poll_seconds) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        n = dbapi_conn.notifies.pop(0)
+                        _dispatch(n.channel, n.payload)
+            finally:
+                dbapi_conn.close()
+        except Exception:
+            logger.exception("notify listener error, reconnecting")
+            _stop.wait(poll_seconds)
+
+
+def start_listener(engine: Engine, poll_seconds: float = 5.0) -> None:
+    """Arranca (una vez por proceso) el hilo LISTEN. No-op fuera de Postgres."""
+    global _listener
+    if engine.dialect.name != "postgresql" or _listener is not None:
+        return
+    _stop.clear()
+    _listener = threading.Thread(target=_listen_loop, args=(engine, poll_seconds), name="pg-notify", daemon=True)
+    _listener.start()
+
+
+def stop_listener() -> None:
+    global _listener
+    _stop.set()
+    _listener = None
@@ -0,0 +1,85 @@
+"""
+Caché en proceso de la identidad del usuario autenticado (get_current_user).
+
+Guarda por user_id los campos no sensibles de User con TTL y tamaño acotado (LRU) para que
+las peticiones autenticadas no consulten la BD. users.py invalida al modificar/eliminar
+usuarios y la invalidación se propaga al resto de workers por NOTIFY (app.core.notify).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import notify
+from app.core.config import settings
+from app.models.user import User
+
+CHANNEL = "principal_invalidate"
+_ALL = "*"
+
+_FIELDS = ("id", "email", "full_name", "role", "company_id", "is_active", "can_view_all_companies", "email_digest")
+
+
+class PrincipalCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[int, tuple[float, dict[str, Any]]] = OrderedDict()
+        # Se incrementa en cada invalidación: un usuario leído antes no se guarda
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[User]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None:
+                return None
+            expires, fields = entry
+            if expires < time.monotonic():
+                del self._data[user_id]
+                return None
+            self._data.move_to_end(user_id)
+        # Instancia transitoria (sin sesión): sólo lectura de atributos
+        return User(**fields)
+
+    def put(self, user: User, version: Optional[int] = None) -> None:
+        """Guarda el usuario; version es self.version leída antes de cargarlo de la BD."""
+        if self.ttl <= 0:
+            return
+        fields = {f: getattr(user, f) for f in _FIELDS}
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._data[user.id] = (time.monotonic() + self.ttl, fields)
+            self._data.move_to_end(user.id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        with self._lock:
+            self.version += 1
+            if user_id is None:
+                self._data.clear()
+            else:
+                self._data.pop(user_id, None)
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def _on_notify(payload: str) -> None:
+    principal_cache.invalidate(None if payload == _ALL else int(payload))
+
+
+notify.subscribe(CHANNEL, _on_notify)
+
+
+def invalidate_principal(db: Session, user_id: Optional[int] = None) -> None:
+    """Invalida la entrada de user_id (o todas) en este y en los demás workers."""
+    notify.publish(db, CHANNEL, _ALL if user_id is None else str(user_id))
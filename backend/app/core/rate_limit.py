@@ -0,0 +1,180 @@
+"""
+Token buckets para limitar intentos de login antes de consultar la BD o ejecutar bcrypt.
+
+Backends (settings.LOGIN_THROTTLE_BACKEND):
+- memory: estado en proceso (por defecto; cada worker limita por separado).
+- database: tabla rate_limit_buckets compartida por todos los workers, actualizada con un
+  único UPSERT atómico por intento (no toca users ni ejecuta hashes). Cada worker borra
+  periódicamente los buckets ya rellenos del todo (equivalen a no tener fila), así que la tabla
+  no crece sin límite con ataques de relleno de credenciales sobre muchas IPs/cuentas.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class BucketPolicy:
+    capacity: float  # ráfaga máxima
+    refill_per_sec: float
+
+
+class BucketBackend(Protocol):
+    blocking: bool
+
+    def take(self, key: str, policy: BucketPolicy) -> float:
+        """Consume un token; devuelve 0 si se permite o los segundos a esperar si no."""
+        ...
+
+
+class MemoryBackend:
+    blocking = False
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, policy: BucketPolicy) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (policy.capacity, now))
+            tokens = min(policy.capacity, tokens + (now - last) * policy.refill_per_sec)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / policy.refill_per_sec
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class DatabaseBackend:
+    blocking = True
+    PRUNE_INTERVAL_SECONDS = 300.0
+
+    def __init__(self, engine):
+        self.engine = engine
+        # Segundos que tarda en rellenarse del todo el bucket más lento visto (desde tokens = -1)
+        self._refill_horizon = 0.0
+        self._next_prune = 0.0
+        self._prune_lock = threading.Lock()
+        self._prune_stmt = text("DELETE FROM rate_limit_buckets WHERE updated_at < :before")
+        if engine.dialect.name == "postgresql":
+            least, greatest = "LEAST", "GREATEST"
+        else:
+            least, greatest = "min", "max"
+        # tokens puede quedar en -1 como mínimo: un intento rechazado no acumula deuda infinita
+        self._stmt = text(
+            f"""
+            INSERT INTO rate_limit_buckets (key, tokens, updated_at)
+            VALUES (:key, :capacity - 1, :now)
+            ON CONFLICT (key) DO UPDATE SET
+                tokens = {greatest}(
+                    {least}(:capacity, rate_limit_buckets.tokens
+                        + (:now - rate_limit_buckets.updated_at) * :rate) - 1,
+                    -1),
+                updated_at = :now
+            RETURNING tokens
+            """
+        )
+
+    def take(self, key: str, policy: BucketPolicy) -> float:
+        now = time.time()
+        self._refill_horizon = max(self._refill_horizon, (policy.capacity + 1) / policy.refill_per_sec)
+        with self.engine.begin() as conn:
+            tokens = conn.execute(
+                self._stmt,
+                {"key": key, "capacity": policy.capacity, "rate": policy.refill_per_sec, "now": now},
+            ).scalar_one()
+        self._maybe_prune(now)
+        if tokens >= 0:
+            return 0.0
+        # El intento rechazado también gasta (hasta tokens = -1): hace falta volver a tener 1 token
+        return (1 - tokens) / policy.refill_per_sec
+
+    def prune(self, before: float) -> int:
+        """Borra los buckets sin actividad desde `before` (epoch); devuelve cuántos."""
+        with self.engine.begin() as conn:
+            return conn.execute(self._prune_stmt, {"before": before}).rowcount or 0
+
+    def _maybe_prune(self, now: float) -> None:
+        # Como mucho una vez por intervalo y worker; un fallo no debe afectar al login
+        if now < self._next_prune or not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_prune = now + self.PRUNE_INTERVAL_SECONDS
+            self.prune(now - self._refill_horizon)
+        except Exception:
+            logger.exception("rate limit bucket pruning failed")
+        finally:
+            self._prune_lock.release()
+
+
+class LoginThrottle:
+    def __init__(self, backend: BucketBackend, per_ip: BucketPolicy, per_account: BucketPolicy):
+        self.backend = backend
+        self.per_ip = per_ip
+        self.per_account = per_account
+        self._metrics: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._metrics[name] += 1
+
+    def check(self, ip: str | None, email: str) -> float:
+        """
+        Consume un intento por IP y por cuenta. Devuelve 0 si se permite o los segundos
+        (Retry-After) si alguno de los dos buckets está vacío.
+        """
+        wait = self.backend.take(f"login:ip:{ip or 'unknown'}", self.per_ip)
+        if wait:
+            self._count("rejected_ip")
+            return wait
+        wait = self.backend.take(f"login:account:{email.strip().lower()}", self.per_account)
+        if wait:
+            self._count("rejected_account")
+            return wait
+        self._count("allowed")
+        return 0.0
+
+    def metrics(self) -> dict:
+        with self._lock:
+            data = dict(self._metrics)
+        return {
+            "backend": type(self.backend).__name__,
+            "allowed": data.get("allowed", 0),
+            "rejected_ip": data.get("rejected_ip", 0),
+            "rejected_account": data.get("rejected_account", 0),
+        }
+
+
+def _build_login_throttle() -> LoginThrottle:
+    if settings.LOGIN_THROTTLE_BACKEND == "database":
+        from app.db.session import engine
+
+        backend: BucketBackend = DatabaseBackend(engine)
+    else:
+        backend = MemoryBackend()
+    return LoginThrottle(
+        backend,
+        per_ip=BucketPolicy(settings.LOGIN_THROTTLE_IP_BURST, settings.LOGIN_THROTTLE_IP_PER_MIN / 60.0),
+        per_account=BucketPolicy(settings.LOGIN_THROTTLE_ACCOUNT_BURST, settings.LOGIN_THROTTLE_ACCOUNT_PER_MIN / 60.0),
+    )
+
+
+login_throttle = _build_login_throttle()
@@ -1,12 +1,22 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from jose import jwt
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import settings
+
+# min_rounds: hashes con coste menor se marcan como obsoletos y se re-generan en el siguiente login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__min_rounds=12)
 ALGO = "HS256"
 
+# Pool acotado por el que pasan todas las operaciones bcrypt (libera el GIL): limita la CPU dedicada
+# a hashes aunque lleguen muchas altas/cambios de contraseña a la vez y mantiene el event loop libre
+# durante picos de login. Las versiones síncronas esperan el resultado en el hilo del llamante.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="pwd-hash")
+
 
 def create_access_token(data: Dict[str, Any], secret: str, expires_minutes: int) -> str:
     to_encode = data.copy()
@@ -16,8 +26,17 @@ def create_access_token(data: Dict[str, Any], secret: str, expires_minutes: int)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return _hash_executor.submit(pwd_context.verify, plain, hashed).result()
 
 
 def get_password_hash(plain: str) -> str:
-    return pwd_context.hash(plain)
\ No newline at end of file
+    return _hash_executor.submit(pwd_context.hash, plain).result()
+
+
+async def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """
+    Verifica sin bloquear el event loop. Si el hash usa un esquema/coste obsoleto
+    devuelve también el nuevo hash para re-guardarlo (rehash transparente en login).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.verify_and_update, plain, hashed)
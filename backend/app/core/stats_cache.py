@@ -0,0 +1,107 @@
+"""
+Caché en proceso de resultados de /stats/tickets por (scope, periodo).
+
+TTL corto con coalescencia de peticiones (single-flight): ante varios fallos simultáneos
+de la misma clave sólo uno calcula y el resto espera su resultado. Las escrituras de tickets
+invalidan por empresa (app.services.rollup) y se propagan al resto de workers por NOTIFY.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import notify
+from app.core.config import settings
+
+CHANNEL = "ticket_stats_invalidate"
+_ALL = "*"
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlightCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, _Call] = {}
+        # Se incrementa en cada invalidación: un cálculo iniciado antes no se guarda
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if self.ttl <= 0:
+            return compute()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._data.move_to_end(key)
+                return entry[1]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                generation = self._generation
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = compute()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if call.error is None and generation == self._generation:
+                    self._data[key] = (time.monotonic() + self.ttl, call.value)
+                    self._data.move_to_end(key)
+                    while len(self._data) > self.maxsize:
+                        self._data.popitem(last=False)
+            call.done.set()
+        return call.value
+
+    def invalidate(self, match: Optional[Callable[[Hashable], bool]] = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if match is None:
+                self._data.clear()
+            else:
+                for key in [k for k in self._data if match(k)]:
+                    del self._data[key]
+
+
+ticket_stats_cache = SingleFlightCache(settings.STATS_CACHE_SIZE, settings.STATS_CACHE_TTL_SECONDS)
+
+
+def _on_notify(payload: str) -> None:
+    if payload == _ALL:
+        ticket_stats_cache.invalidate()
+        return
+    companies = {int(c) for c in payload.split(",")}
+    # Clave = (company_id | None para vista global, periodo): la vista global siempre cae
+    ticket_stats_cache.invalidate(lambda key: key[0] is None or key[0] in companies)
+
+
+notify.subscribe(CHANNEL, _on_notify)
+
+
+def invalidate_ticket_stats(db: Session, company_ids: Optional[Iterable[int]] = None) -> None:
+    """Invalida las estadísticas de esas empresas (o todas) en este y en los demás workers."""
+    ids = sorted(set(company_ids)) if company_ids is not None else None
+    if ids == []:
+        return
+    notify.publish(db, CHANNEL, _ALL if ids is None else ",".join(map(str, ids)))
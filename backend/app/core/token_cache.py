@@ -0,0 +1,65 @@
+"""
+LRU de JWT ya verificados: sha256(token) -> payload decodificado.
+
+Evita repetir la verificación de firma (python-jose) en cada petición con el mismo
+bearer token. Cada entrada caduca con el `exp` del propio token.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+
+class VerifiedTokenCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict[str, Any]]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            exp, payload = entry
+            if exp <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return dict(payload)
+
+    def put(self, token: str, payload: dict[str, Any]) -> None:
+        exp = payload.get("exp")
+        if self.maxsize <= 0 or not isinstance(exp, (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._data[key] = (float(exp), dict(payload))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def decode(self, token: str, verify: Callable[[str], dict[str, Any]]) -> dict[str, Any]:
+        """Payload desde la caché o, si no está, verificado con verify() y cacheado."""
+        payload = self.get(token)
+        if payload is None:
+            payload = verify(token)
+            self.put(token, payload)
+        return payload
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_SIZE)
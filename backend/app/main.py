@@ -14,6 +14,16 @@ from app.models.company import Company
 from app.models.user import User
 from app.models.ticket import Ticket, Attachment, Comment  # noqa: F401
 from app.models.config import AppConfig  # noqa: F401  ensure table is created
+from app.models.rate_limit import RateLimitBucket  # noqa: F401  ensure table is created
+from app.models.stats import TicketDailyStats  # noqa: F401  ensure table is created
+from app.models.sla import SlaPolicy  # noqa: F401  ensure table is created
+from app.models.outbox import EmailOutbox  # noqa: F401  ensure table is created
+from app.models.notification import PendingNotification  # noqa: F401  ensure table is created
+from app.services import sla
+from app.services.classifier import classify
+from app.services.rollup import rebuild as rebuild_rollup
+from app.services.search import ensure_search_schema, index_tickets
+from app.core import notify
 
 app = FastAPI(title="ServiceFlow API", version="0.1.0")
 
@@ -24,6 +34,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 
@@ -35,6 +46,13 @@ def on_startup():
 
     # Crear tablas (solo para desarrollo/pruebas; en prod usar Alembic)
     Base.metadata.create_all(bind=engine)
+    ensure_search_schema(engine)
+
+    # Invalidación de cachés en proceso entre workers (LISTEN/NOTIFY en Postgres)
+    notify.start_listener(engine)
+
+    # Escáner periódico de SLA (marca tickets en riesgo/incumplidos)
+    sla.start_scanner(SessionLocal, settings.SLA_SCAN_INTERVAL_SECONDS)
 
     # Seed demo si no existe nada: empresas, usuarios (admin/tech/user) y tickets
     db = SessionLocal()
@@ -158,7 +176,13 @@ def on_startup():
                     company_id=globex.id,
                 ),
             ]
+            for t in tickets:
+                t.category = classify(t.title, t.description)
+                sla.stamp(db, t)
             db.add_all(tickets)
+            db.flush()
+            index_tickets(db, [t.id for t in tickets])
+            rebuild_rollup(db)
             db.commit()
     finally:
         db.close()
@@ -1,4 +1,6 @@
-from sqlalchemy import String, Integer
+from datetime import datetime
+
+from sqlalchemy import String, Integer, DateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -9,5 +11,6 @@ class Company(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(200), unique=True, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     users: Mapped[list["User"]] = relationship(back_populates="company", cascade="all,delete-orphan")
\ No newline at end of file
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class PendingNotification(Base):
+    """
+    Comentarios pendientes de notificar, agrupados por group_key (destinatario + ticket o
+    destinatario + resumen horario/diario). app.services.notifications los funde en un email.
+    """
+
+    __tablename__ = "pending_notifications"
+    __table_args__ = (
+        Index("ix_pending_notifications_due", "deliver_after"),
+        Index("ix_pending_notifications_group", "group_key", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    to_email: Mapped[str] = mapped_column(String(320), nullable=False)
+    group_key: Mapped[str] = mapped_column(String(400), nullable=False)
+    ticket_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    ticket_title: Mapped[str] = mapped_column(String(255), nullable=False)
+    author: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    # El grupo se envía cuando vence su notificación más antigua
+    deliver_after: Mapped[datetime] = mapped_column(DateTime, nullable=False)
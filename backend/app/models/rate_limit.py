@@ -0,0 +1,14 @@
+from sqlalchemy import String, Float
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RateLimitBucket(Base):
+    """Estado compartido de token buckets (backend 'database' de app.core.rate_limit)."""
+
+    __tablename__ = "rate_limit_buckets"
+
+    key: Mapped[str] = mapped_column(String(320), primary_key=True)
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[float] = mapped_column(Float, nullable=False)  # epoch seconds
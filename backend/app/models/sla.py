@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class SlaPolicy(Base):
+    """Objetivos de SLA por empresa y prioridad (sin fila: app.services.sla.DEFAULT_POLICIES)."""
+
+    __tablename__ = "sla_policies"
+    __table_args__ = (UniqueConstraint("company_id", "priority", name="uq_sla_policies_company_priority"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"), nullable=False)
+    priority: Mapped[str] = mapped_column(String(32), nullable=False)
+    first_response_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    resolve_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
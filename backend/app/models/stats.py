@@ -0,0 +1,31 @@
+from datetime import date
+
+from sqlalchemy import Date, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class TicketDailyStats(Base):
+    """
+    Rollup diario de tickets mantenido incrementalmente (app.services.rollup).
+
+    Cada ticket aporta con su estado actual (status/priority/assignee):
+    - created: +1 en el día de created_at
+    - resolved, resolution_minutes, time_spent_minutes: en el día de resolved_at (si tiene)
+    """
+
+    __tablename__ = "ticket_daily_stats"
+    __table_args__ = (Index("ix_ticket_daily_stats_day", "day"),)
+
+    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    status: Mapped[str] = mapped_column(String(32), primary_key=True)
+    priority: Mapped[str] = mapped_column(String(32), primary_key=True)
+    # 0 = sin asignar (la clave primaria no admite NULL)
+    assignee_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    created: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    resolved: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    resolution_minutes: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    time_spent_minutes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String, Integer, ForeignKey, Text, DateTime, Boolean
+from sqlalchemy import String, Integer, ForeignKey, Text, DateTime, Boolean, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -8,12 +8,50 @@ from app.db.base import Base
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at DESC, id DESC (por empresa y global)
+        Index("ix_tickets_company_created_id", "company_id", "created_at", "id"),
+        Index("ix_tickets_created_id", "created_at", "id"),
+        # Filtros de GET /tickets y agregados de stats/dashboard por empresa
+        Index("ix_tickets_company_status_created", "company_id", "status", "created_at"),
+        Index("ix_tickets_company_priority_created", "company_id", "priority", "created_at"),
+        Index("ix_tickets_company_assignee_created", "company_id", "assignee_id", "created_at"),
+        # Conteos por categoría (stats) sin escanear los TEXT
+        Index("ix_tickets_company_category_status", "company_id", "category", "status"),
+        # Escáner de SLA: sólo tickets abiertos, ordenados por vencimiento
+        Index(
+            "ix_tickets_sla_resolve_due_open",
+            "resolve_due_at",
+            postgresql_where=text("status <> 'closed'"),
+            sqlite_where=text("status <> 'closed'"),
+        ),
+        Index(
+            "ix_tickets_sla_response_due_open",
+            "first_response_due_at",
+            postgresql_where=text("status <> 'closed' AND first_responded_at IS NULL"),
+            sqlite_where=text("status <> 'closed' AND first_responded_at IS NULL"),
+        ),
+        # Cumplimiento de SLA (dashboard): resueltos en la ventana frente a su vencimiento
+        Index("ix_tickets_company_resolved_due", "company_id", "resolved_at", "resolve_due_at"),
+        Index("ix_tickets_resolved_due", "resolved_at", "resolve_due_at"),
+        # Alerta de urgentes sin asignar (stats): sólo backlog abierto sin técnico
+        Index(
+            "ix_tickets_unassigned_open",
+            "company_id",
+            "priority",
+            postgresql_where=text("assignee_id IS NULL AND status <> 'closed'"),
+            sqlite_where=text("assignee_id IS NULL AND status <> 'closed'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
-    description: Mapped[str | None] = mapped_column(Text)
+    # TEXT potencialmente grandes (logs pegados): diferidos, se cargan sólo al acceder o con undefer_group("text")
+    description: Mapped[str | None] = mapped_column(Text, deferred=True, deferred_group="text")
     status: Mapped[str] = mapped_column(String(32), default="open")  # open|in_progress|closed
     priority: Mapped[str] = mapped_column(String(32), default="normal")  # low|normal|high|urgent
+    # Asignada al crear/editar por app.services.classifier (hardware|network|access|email|software|other)
+    category: Mapped[str | None] = mapped_column(String(32), nullable=True)
 
     requester_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     assignee_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"))
@@ -22,9 +60,15 @@ class Ticket(Base):
 
     # Resolution fields
     resolved_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
-    resolution_summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    resolution_summary: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True, deferred_group="text")
     time_spent_minutes: Mapped[int] = mapped_column(Integer, default=0)
 
+    # SLA (app.services.sla): vencimientos calculados al escribir y estado marcado por el escáner
+    first_response_due_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    resolve_due_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    first_responded_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    sla_state: Mapped[str] = mapped_column(String(16), default="ok")  # ok|at_risk|breached|met
+
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -50,6 +94,7 @@ class Attachment(Base):
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (Index("ix_comments_ticket_created", "ticket_id", "created_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     ticket_id: Mapped[int] = mapped_column(ForeignKey("tickets.id"), index=True, nullable=False)
@@ -63,6 +108,16 @@ class Comment(Base):
 
 class Worklog(Base):
     __tablename__ = "worklogs"
+    __table_args__ = (
+        # start_work/stop_work buscan el worklog activo (ended_at IS NULL) del usuario
+        Index(
+            "ix_worklogs_active_user_ticket",
+            "user_id",
+            "ticket_id",
+            postgresql_where=text("ended_at IS NULL"),
+            sqlite_where=text("ended_at IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     ticket_id: Mapped[int] = mapped_column(ForeignKey("tickets.id"), index=True, nullable=False)
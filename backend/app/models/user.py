@@ -1,4 +1,6 @@
-from sqlalchemy import String, Integer, Boolean, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import String, Integer, DateTime, Boolean, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -6,6 +8,17 @@ from app.db.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Directorio de técnicos por empresa (stats) y listados filtrados por rol
+        Index("ix_users_company_role", "company_id", "role"),
+        # Aprobaciones pendientes: usuarios inactivos por empresa
+        Index(
+            "ix_users_company_inactive",
+            "company_id",
+            postgresql_where=text("is_active IS false"),
+            sqlite_where=text("is_active IS 0"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
@@ -17,5 +30,10 @@ class User(Base):
     # Permission flag for technicians/admins to view across companies
     can_view_all_companies: Mapped[bool] = mapped_column(Boolean, default=False)
 
+    # Notificaciones de comentarios: immediate (agrupadas por ticket en una ventana corta) | hourly | daily
+    email_digest: Mapped[str] = mapped_column(String(16), default="immediate", server_default="immediate")
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
     company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"), index=True, nullable=False)
     company: Mapped["Company"] = relationship(back_populates="users")
\ No newline at end of file
@@ -19,6 +19,7 @@ class UserOut(BaseModel):
     role: str
     company_id: int
     is_active: bool
+    email_digest: str = "immediate"
 
     class Config:
         from_attributes = True
\ No newline at end of file
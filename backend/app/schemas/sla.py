@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+
+class SlaPolicyIn(BaseModel):
+    first_response_minutes: int = Field(..., ge=1)
+    resolve_minutes: int = Field(..., ge=1)
+
+
+class SlaPolicyOut(BaseModel):
+    company_id: int
+    priority: str
+    first_response_minutes: int
+    resolve_minutes: int
+    # True si no hay política propia y se aplica la de por defecto
+    is_default: bool = False
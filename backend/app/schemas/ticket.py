@@ -1,6 +1,8 @@
 from datetime import datetime
 from pydantic import BaseModel, Field, field_validator
 
+from app.schemas.user import UserSummary
+
 
 class TicketCreate(BaseModel):
     title: str
@@ -14,6 +16,8 @@ class TicketUpdate(BaseModel):
     status: str | None = None
     priority: str | None = None
     assignee_id: int | None = None
+    # Corrección manual de la categoría asignada automáticamente
+    category: str | None = Field(None, max_length=32)
 
 
 class TicketResolve(BaseModel):
@@ -37,12 +41,52 @@ class TicketResolve(BaseModel):
         return v
 
 
+# Bulk
+class TicketBulkFilter(BaseModel):
+    status: str | None = None
+    priority: str | None = None
+    assignee_id: int | None = None
+    q: str | None = None
+
+
+class TicketBulkUpdate(BaseModel):
+    # ids explícitos o un filtro (mismos criterios que GET /tickets)
+    ids: list[int] | None = Field(None, min_length=1, max_length=5000)
+    filter: TicketBulkFilter | None = None
+    update: TicketUpdate | None = None
+    resolve: TicketResolve | None = None
+
+
+class TicketBulkItem(BaseModel):
+    id: int
+    ok: bool
+    detail: str | None = None
+
+
+class TicketBulkResult(BaseModel):
+    updated: int
+    results: list[TicketBulkItem]
+
+
+# Import
+class TicketImportError(BaseModel):
+    row: int
+    detail: str
+
+
+class TicketImportResult(BaseModel):
+    created: int
+    failed: int
+    errors: list[TicketImportError]
+
+
 class TicketOut(BaseModel):
     id: int
     title: str
     description: str | None
     status: str
     priority: str
+    category: str | None = None
     requester_id: int
     assignee_id: int | None
     company_id: int
@@ -51,11 +95,65 @@ class TicketOut(BaseModel):
     resolved_at: datetime | None = None
     resolution_summary: str | None = None
     time_spent_minutes: int | None = 0
+    first_response_due_at: datetime | None = None
+    resolve_due_at: datetime | None = None
+    first_responded_at: datetime | None = None
+    sla_state: str | None = None
 
     class Config:
         from_attributes = True
 
 
+# Listado: los campos TEXT pesados (description, resolution_summary) sólo se devuelven si se piden con fields=
+TICKET_LIST_DEFAULT_FIELDS = [
+    "id",
+    "title",
+    "status",
+    "priority",
+    "category",
+    "requester_id",
+    "assignee_id",
+    "company_id",
+    "created_at",
+    "updated_at",
+    "resolved_at",
+    "time_spent_minutes",
+    "resolve_due_at",
+    "sla_state",
+]
+
+
+class TicketListOut(BaseModel):
+    # Todos opcionales: la respuesta incluye sólo los campos seleccionados (exclude_unset)
+    id: int
+    title: str | None = None
+    description: str | None = None
+    status: str | None = None
+    priority: str | None = None
+    category: str | None = None
+    requester_id: int | None = None
+    assignee_id: int | None = None
+    company_id: int | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    resolved_at: datetime | None = None
+    resolution_summary: str | None = None
+    time_spent_minutes: int | None = None
+    first_response_due_at: datetime | None = None
+    resolve_due_at: datetime | None = None
+    first_responded_at: datetime | None = None
+    sla_state: str | None = None
+    # expand=requester,assignee
+    requester: UserSummary | None = None
+    assignee: UserSummary | None = None
+
+
+class TicketExpandedOut(TicketOut):
+    # expand=requester,assignee (sólo presentes si se piden)
+    requester: UserSummary | None = None
+    assignee: UserSummary | None = None
+
+
 class AttachmentOut(BaseModel):
     id: int
     filename: str
@@ -91,4 +189,13 @@ class WorklogOut(BaseModel):
     ended_at: datetime | None = None
     # duration computed on backend when ended; for active it's None
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# Detalle agregado (ticket + relaciones en una sola llamada)
+class TicketDetailOut(TicketOut):
+    requester: UserSummary | None = None
+    assignee: UserSummary | None = None
+    comments: list[CommentOut] = []
+    attachments: list[AttachmentOut] = []
+    worklogs: list[WorklogOut] = []
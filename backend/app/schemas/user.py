@@ -22,6 +22,7 @@ class UserUpdate(BaseModel):
     company_id: int | None = None
     is_active: bool | None = None
     can_view_all_companies: bool | None = None
+    email_digest: str | None = None  # immediate | hourly | daily
     password: str | None = None
 
 
@@ -33,6 +34,16 @@ class UserOut(BaseModel):
     company_id: int
     is_active: bool
     can_view_all_companies: bool
+    email_digest: str = "immediate"
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class UserSummary(BaseModel):
+    id: int
+    email: str
+    full_name: str | None = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,120 @@
+"""
+Categorización de tickets al escribirlos (columna indexada Ticket.category).
+
+El clasificador es enchufable: settings.TICKET_CLASSIFIER apunta a "modulo:atributo" con un
+objeto que expone classify(title, description) -> str (o una clase/callable que lo construye).
+Por defecto se usa KeywordClassifier con DEFAULT_RULES. Para tickets existentes:
+
+    python -m app.services.classifier backfill [--all] [--batch N]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import re
+from functools import lru_cache
+from typing import Optional, Protocol
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.ticket import Ticket
+
+DEFAULT_CATEGORY = "other"
+BACKFILL_BATCH = 1000
+
+# Orden = prioridad: gana la primera categoría con alguna coincidencia
+DEFAULT_RULES: dict[str, tuple[str, ...]] = {
+    "hardware": (
+        "hardware", "impresora", "printer", "teclado", "keyboard", "ratón", "raton", "mouse",
+        "monitor", "portátil", "portatil", "laptop", "disco", "disk", "memoria ram", "cargador",
+    ),
+    "network": ("red", "wifi", "vpn", "internet", "network", "conexión", "conexion", "router", "dns"),
+    "access": ("contraseña", "password", "acceso", "login", "permiso", "bloqueado", "cuenta"),
+    "email": ("correo", "email", "outlook", "buzón", "buzon"),
+    "software": ("software", "instalar", "licencia", "aplicación", "aplicacion", "actualización", "bsod"),
+}
+
+
+class TicketClassifier(Protocol):
+    def classify(self, title: str, description: Optional[str]) -> str: ...
+
+
+class KeywordClassifier:
+    """Reglas por palabra clave (coincidencia de palabra completa, sin distinguir mayúsculas)."""
+
+    def __init__(self, rules: Optional[dict[str, tuple[str, ...]]] = None, default: str = DEFAULT_CATEGORY):
+        self.default = default
+        self._patterns = [
+            (category, re.compile(r"\b(?:" + "|".join(map(re.escape, words)) + r")\b", re.IGNORECASE))
+            for category, words in (rules or DEFAULT_RULES).items()
+            if words
+        ]
+
+    def classify(self, title: str, description: Optional[str]) -> str:
+        text = f"{title or ''}\n{description or ''}"
+        for category, pattern in self._patterns:
+            if pattern.search(text):
+                return category
+        return self.default
+
+
+@lru_cache
+def get_classifier() -> TicketClassifier:
+    path = settings.TICKET_CLASSIFIER
+    if not path:
+        return KeywordClassifier()
+    module_name, _, attr = path.partition(":")
+    target = getattr(importlib.import_module(module_name), attr)
+    return target if hasattr(target, "classify") else target()
+
+
+def classify(title: str, description: Optional[str]) -> str:
+    return get_classifier().classify(title, description)
+
+
+def backfill(db: Session, only_missing: bool = True, batch: int = BACKFILL_BATCH) -> int:
+    """Clasifica tickets existentes por lotes de id (keyset), con un commit por lote."""
+    tickets = Ticket.__table__
+    stmt = (
+        update(tickets)
+        .where(tickets.c.id == bindparam("b_id"))
+        # updated_at explícito: si no, el onupdate del modelo marcaría todos los tickets como recién editados
+        # (la categoría ya forma parte del ETag de los tickets)
+        .values(category=bindparam("b_category"), updated_at=tickets.c.updated_at)
+    )
+    last_id = 0
+    done = 0
+    while True:
+        q = select(tickets.c.id, tickets.c.title, tickets.c.description).where(tickets.c.id > last_id)
+        if only_missing:
+            q = q.where(tickets.c.category.is_(None))
+        rows = db.execute(q.order_by(tickets.c.id).limit(batch)).all()
+        if not rows:
+            return done
+        db.execute(stmt, [{"b_id": r.id, "b_category": classify(r.title, r.description)} for r in rows])
+        db.commit()
+        last_id = rows[-1].id
+        done += len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Categorización de tickets existentes")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--all", action="store_true", help="Reclasificar también los que ya tienen categoría")
+    parser.add_argument("--batch", type=int, default=BACKFILL_BATCH)
+    args = parser.parse_args()
+
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        done = backfill(db, only_missing=not args.all, batch=args.batch)
+    finally:
+        db.close()
+    print(f"[classifier] {done} tickets categorized")
+
+
+if __name__ == "__main__":
+    main()
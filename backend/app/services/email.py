@@ -1,24 +1,25 @@
 from __future__ import annotations
 
+from collections import deque
+from contextlib import contextmanager
 from email.message import EmailMessage
 import smtplib
-from typing import Optional, Dict, Any
+import threading
+import time
+from typing import Optional, Dict, Any, Iterator, Sequence
 
 import requests
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.models.config import AppConfig
+from app.core.config_cache import app_config_cache
 
 
 def _get_config_from_db(db: Optional[Session]) -> Dict[str, Any]:
-    data: Dict[str, Any] = {}
     if not db:
-        return data
-    rows = db.query(AppConfig).all()
-    for r in rows:
-        data[r.key] = r.value
-    return data
+        return {}
+    # Desde la caché en proceso: sólo va a la BD tras una escritura (o al caducar el TTL)
+    return app_config_cache.get(db)
 
 
 def _runtime_email_settings(db: Optional[Session]) -> Dict[str, Any]:
@@ -44,94 +45,256 @@ def _smtp_client(host: Optional[str], port: Optional[int]):
     if not host or not port:
         return None, None  # disabled
     if int(port) == 465:
-        client = smtplib.SMTP_SSL(host, int(port))
+        client = smtplib.SMTP_SSL(host, int(port), timeout=settings.SMTP_TIMEOUT_SECONDS)
         starttls = False
     else:
-        client = smtplib.SMTP(host, int(port))
+        client = smtplib.SMTP(host, int(port), timeout=settings.SMTP_TIMEOUT_SECONDS)
         starttls = True
     return client, starttls
 
 
-def send_email(to_email: str, subject: str, body: str, db: Optional[Session] = None) -> bool:
+class SmtpPool:
     """
-    Provider-aware email sending.
-    - provider=smtp: sends via SMTP_* settings
-    - provider=mailjet: sends via Mailjet API
-    - provider=console: prints to logs only
-    - provider=disabled: returns False
+    Sesiones SMTP ya autenticadas (TLS + login hechos) reutilizables entre envíos.
+
+    Al sacar una sesión que lleva parada más de SMTP_POOL_HEALTHCHECK_SECONDS se comprueba con
+    NOOP; las que superan SMTP_POOL_IDLE_SECONDS se cierran. Una sesión que falla se descarta.
     """
-    cfg = _runtime_email_settings(db)
-    provider = cfg["provider"]
 
-    if provider == "disabled" or provider is None:
-        return False
+    def __init__(self, host: str, port: int, user: Optional[str], password: Optional[str]):
+        self.host, self.port, self.user, self.password = host, int(port), user, password
+        self._idle: deque[tuple[float, smtplib.SMTP]] = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(settings.SMTP_POOL_SIZE, 1))
+        self._closed = False
 
-    if provider == "console":
-        print(f"[email console] To: {to_email}\nSubject: {subject}\n\n{body}")
-        return True
+    def _connect(self) -> smtplib.SMTP:
+        client, starttls = _smtp_client(self.host, self.port)
+        try:
+            if starttls:
+                client.starttls()
+            if self.user and self.password:
+                client.login(self.user, self.password)
+        except Exception:
+            _quit(client)
+            raise
+        return client
 
-    if provider == "mailjet":
-        key = cfg.get("mailjet_key")
-        secret = cfg.get("mailjet_secret")
-        from_email = cfg.get("from_email") or "no-reply@serviceflow.local"
-        if not key or not secret:
-            print("[email] Mailjet configured without API key/secret")
-            return False
+    def _checkout(self) -> smtplib.SMTP:
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                last_used, client = self._idle.pop()
+            idle = now - last_used
+            if idle > settings.SMTP_POOL_IDLE_SECONDS:
+                _quit(client)
+                continue
+            if idle > settings.SMTP_POOL_HEALTHCHECK_SECONDS:
+                try:
+                    if client.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP failed")
+                except Exception:
+                    _quit(client)
+                    continue
+            return client
+        return self._connect()
+
+    def _checkin(self, client: smtplib.SMTP) -> None:
+        with self._lock:
+            if not self._closed:
+                self._idle.append((time.monotonic(), client))
+                return
+        _quit(client)  # pool cerrado mientras la sesión estaba en uso
+
+    @contextmanager
+    def session(self) -> Iterator[smtplib.SMTP]:
+        """Sesión del pool; si el bloque lanza una excepción la sesión se descarta."""
+        self._slots.acquire()
         try:
-            resp = requests.post(
-                "https://api.mailjet.com/v3.1/send",
-                auth=(key, secret),
-                json={
-                    "Messages": [
-                        {
-                            "From": {"Email": from_email, "Name": "ServiceFlow"},
-                            "To": [{"Email": to_email}],
-                            "Subject": subject,
-                            "TextPart": body,
-                        }
-                    ]
-                },
-                timeout=10,
-            )
-            if resp.status_code // 100 == 2:
-                return True
-            print(f"[email] Mailjet failed {resp.status_code}: {resp.text}")
-            return False
-        except Exception as e:
-            print(f"[email] Mailjet exception: {e}")
-            return False
+            client = self._checkout()
+            try:
+                yield client
+            except Exception:
+                _quit(client)
+                raise
+            self._checkin(client)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+        for _, client in idle:
+            _quit(client)
+
+
+_pools: Dict[tuple, SmtpPool] = {}
+_pools_lock = threading.Lock()
 
-    # default SMTP
-    client, starttls = _smtp_client(cfg.get("smtp_host"), cfg.get("smtp_port"))
-    if client is None:
-        return False
 
+def _smtp_pool(cfg: Dict[str, Any]) -> Optional[SmtpPool]:
+    host, port = cfg.get("smtp_host"), cfg.get("smtp_port")
+    if not host or not port:
+        return None
+    # Un pool por configuración: si cambian host/credenciales se cierran los pools anteriores
+    key = (host, int(port), cfg.get("smtp_user"), cfg.get("smtp_pass"))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            stale = [_pools.pop(k) for k in list(_pools)]
+            pool = _pools[key] = SmtpPool(host, int(port), cfg.get("smtp_user"), cfg.get("smtp_pass"))
+        else:
+            stale = []
+    for old in stale:
+        old.close()
+    return pool
+
+
+def _quit(client: smtplib.SMTP) -> None:
     try:
-        if starttls:
-            client.starttls()
-
-        user = cfg.get("smtp_user")
-        password = cfg.get("smtp_pass")
-        if user and password:
-            client.login(user, password)
-
-        msg = EmailMessage()
-        from_email = cfg.get("from_email") or user or "no-reply@serviceflow.local"
-        msg["From"] = from_email
-        msg["To"] = to_email
-        msg["Subject"] = subject
-        msg.set_content(body)
-
-        client.send_message(msg)
+        client.quit()
+    except Exception:
         try:
-            client.quit()
+            client.close()
         except Exception:
             pass
-        return True
-    except Exception as e:
-        print(f"[email] SMTP failed to send to {to_email}: {e}")
+
+
+def _build_message(from_email: str, to_email: str, subject: str, body: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = from_email
+    msg["To"] = to_email
+    msg["Subject"] = subject
+    msg.set_content(body)
+    return msg
+
+
+def _send_many_smtp(cfg: Dict[str, Any], messages: Sequence[tuple[str, str, str]]) -> list[bool]:
+    pool = _smtp_pool(cfg)
+    if pool is None:
+        return [False] * len(messages)
+    from_email = cfg.get("from_email") or cfg.get("smtp_user") or "no-reply@serviceflow.local"
+    results: list[bool] = []
+    pending = list(messages)
+    # Un reintento con sesión nueva si el servidor corta la conexión a mitad del lote
+    for attempt in range(2):
         try:
-            client.quit()
-        except Exception:
-            pass
-        return False
\ No newline at end of file
+            with pool.session() as client:
+                while pending:
+                    to_email, subject, body = pending[0]
+                    try:
+                        client.send_message(_build_message(from_email, to_email, subject, body))
+                        results.append(True)
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError, smtplib.SMTPSenderRefused) as e:
+                        # Rechazo de ese mensaje: la sesión sigue siendo válida
+                        print(f"[email] SMTP rejected {to_email}: {e}")
+                        results.append(False)
+                    pending.pop(0)
+            break
+        except Exception as e:
+            print(f"[email] SMTP failed ({len(pending)} pending): {e}")
+            if attempt == 1:
+                results.extend([False] * len(pending))
+    return results
+
+
+MAILJET_BATCH = 50  # máximo de mensajes por llamada a la Send API v3.1
+
+_mailjet_session: Optional[requests.Session] = None
+_mailjet_lock = threading.Lock()
+
+
+def _mailjet_http() -> requests.Session:
+    """requests.Session compartida (keep-alive) para la API de Mailjet."""
+    global _mailjet_session
+    with _mailjet_lock:
+        if _mailjet_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=settings.MAILJET_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _mailjet_session = session
+        return _mailjet_session
+
+
+def _send_many_mailjet(cfg: Dict[str, Any], messages: Sequence[tuple[str, str, str]]) -> list[bool]:
+    key = cfg.get("mailjet_key")
+    secret = cfg.get("mailjet_secret")
+    from_email = cfg.get("from_email") or "no-reply@serviceflow.local"
+    if not key or not secret:
+        print("[email] Mailjet configured without API key/secret")
+        return [False] * len(messages)
+
+    results: list[bool] = []
+    for start in range(0, len(messages), MAILJET_BATCH):
+        chunk = messages[start : start + MAILJET_BATCH]
+        payload = {
+            "Messages": [
+                {
+                    "From": {"Email": from_email, "Name": "ServiceFlow"},
+                    "To": [{"Email": to_email}],
+                    "Subject": subject,
+                    "TextPart": body,
+                }
+                for to_email, subject, body in chunk
+            ]
+        }
+        try:
+            resp = _mailjet_http().post(settings.MAILJET_API_URL, auth=(key, secret), json=payload, timeout=10)
+            # Con fallos parciales Mailjet responde 400 pero informa el estado de cada mensaje, en orden
+            statuses = (resp.json() or {}).get("Messages") if resp.content else None
+        except Exception as e:
+            print(f"[email] Mailjet exception: {e}")
+            results.extend([False] * len(chunk))
+            continue
+        if isinstance(statuses, list) and len(statuses) == len(chunk):
+            for (to_email, _, _), status in zip(chunk, statuses):
+                ok = status.get("Status") == "success"
+                if not ok:
+                    print(f"[email] Mailjet rejected {to_email}: {status.get('Errors')}")
+                results.append(ok)
+        else:
+            ok = resp.status_code // 100 == 2
+            if not ok:
+                print(f"[email] Mailjet failed {resp.status_code}: {resp.text}")
+            results.extend([ok] * len(chunk))
+    return results
+
+
+def send_many(messages: Sequence[tuple[str, str, str]], db: Optional[Session] = None) -> list[bool]:
+    """
+    Envía varios (to, subject, body) con la configuración actual; un resultado por mensaje.
+    Con SMTP todos viajan por una misma sesión del pool; con Mailjet en llamadas de hasta 50.
+    """
+    if not messages:
+        return []
+    cfg = _runtime_email_settings(db)
+    provider = cfg["provider"]
+
+    if provider == "disabled" or provider is None:
+        return [False] * len(messages)
+
+    if provider == "console":
+        for to_email, subject, body in messages:
+            print(f"[email console] To: {to_email}\nSubject: {subject}\n\n{body}")
+        return [True] * len(messages)
+
+    if provider == "mailjet":
+        return _send_many_mailjet(cfg, messages)
+
+    # default SMTP
+    return _send_many_smtp(cfg, messages)
+
+
+def send_email(to_email: str, subject: str, body: str, db: Optional[Session] = None) -> bool:
+    """
+    Provider-aware email sending.
+    - provider=smtp: sends via SMTP_* settings (pooled sessions)
+    - provider=mailjet: sends via Mailjet API
+    - provider=console: prints to logs only
+    - provider=disabled: returns False
+    """
+    return send_many([(to_email, subject, body)], db)[0]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Iterator
+
+from sqlalchemy.orm import Query
+
+from app.db.session import SessionLocal
+from app.models.ticket import Ticket
+
+# Filas por lote: tamaño del fetch del cursor de servidor y de cada chunk enviado
+EXPORT_BATCH = 1000
+
+EXPORT_COLUMNS = [
+    Ticket.id,
+    Ticket.title,
+    Ticket.description,
+    Ticket.status,
+    Ticket.priority,
+    Ticket.category,
+    Ticket.requester_id,
+    Ticket.assignee_id,
+    Ticket.company_id,
+    Ticket.created_at,
+    Ticket.updated_at,
+    Ticket.resolved_at,
+    Ticket.resolution_summary,
+    Ticket.time_spent_minutes,
+]
+EXPORT_FIELDS = [c.key for c in EXPORT_COLUMNS]
+
+
+def _rows(qs: Query) -> Iterator[tuple[Any, ...]]:
+    """
+    Recorre qs en una sesión propia (la del request ya está cerrada cuando se envía el cuerpo)
+    con yield_per: en Postgres usa un cursor de servidor y la memoria no crece con el volumen.
+    """
+    session = SessionLocal()
+    try:
+        yield from qs.with_session(session).with_entities(*EXPORT_COLUMNS).yield_per(EXPORT_BATCH)
+    finally:
+        session.close()
+
+
+def _value(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return v
+
+
+def stream_csv(qs: Query) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_FIELDS)
+    pending = 0
+    for row in _rows(qs):
+        writer.writerow([_value(v) for v in row])
+        pending += 1
+        if pending >= EXPORT_BATCH:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    yield buf.getvalue()
+
+
+def stream_ndjson(qs: Query) -> Iterator[str]:
+    lines: list[str] = []
+    for row in _rows(qs):
+        lines.append(json.dumps({k: _value(v) for k, v in zip(EXPORT_FIELDS, row)}, ensure_ascii=False))
+        if len(lines) >= EXPORT_BATCH:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
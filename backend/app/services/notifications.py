@@ -0,0 +1,119 @@
+"""
+Coalescencia de notificaciones de comentarios.
+
+add_comment no envía un email por comentario: deja una fila en pending_notifications agrupada
+por (destinatario, ticket) y el worker del outbox (flush_due) funde cada grupo en un único email
+cuando vence la ventana NOTIFY_COALESCE_SECONDS, contada desde el primer comentario. Los usuarios
+con email_digest hourly/daily reciben un solo resumen por periodo con todos sus tickets.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Optional, Sequence
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.notification import PendingNotification
+from app.services.outbox import enqueue_email
+
+DIGEST_MODES = ("immediate", "hourly", "daily")
+FLUSH_GROUPS = 200
+
+
+def deliver_after(mode: str, now: datetime) -> datetime:
+    if mode == "hourly":
+        return now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    if mode == "daily":
+        at = now.replace(hour=settings.NOTIFY_DAILY_DIGEST_HOUR, minute=0, second=0, microsecond=0)
+        return at if at > now else at + timedelta(days=1)
+    return now + timedelta(seconds=settings.NOTIFY_COALESCE_SECONDS)
+
+
+def queue_comment(
+    db: Session,
+    to_email: str,
+    digest: Optional[str],
+    ticket_id: int,
+    ticket_title: str,
+    author: Optional[str],
+    body: str,
+    now: Optional[datetime] = None,
+) -> None:
+    """Encola la notificación de un comentario público; se confirma con la transacción del llamante."""
+    now = now or datetime.utcnow()
+    mode = digest if digest in DIGEST_MODES else "immediate"
+    if mode == "immediate" and settings.NOTIFY_COALESCE_SECONDS <= 0:
+        subject, text = render([(ticket_id, ticket_title, author, now, body)])
+        enqueue_email(db, to_email, subject, text)
+        return
+    group_key = f"{to_email}|{ticket_id}" if mode == "immediate" else f"{to_email}|{mode}"
+    db.add(
+        PendingNotification(
+            to_email=to_email,
+            group_key=group_key,
+            ticket_id=ticket_id,
+            ticket_title=ticket_title[:255],
+            author=author,
+            body=body,
+            created_at=now,
+            deliver_after=deliver_after(mode, now),
+        )
+    )
+
+
+def render(items: Sequence[tuple]) -> tuple[str, str]:
+    """Asunto y cuerpo para (ticket_id, ticket_title, author, created_at, body) ordenados por ticket."""
+    tickets = [(tid, list(group)) for tid, group in groupby(items, key=lambda i: i[0])]
+    if len(tickets) == 1:
+        tid, comments = tickets[0]
+        subject = f"Nueva actividad en tu ticket #{tid}"
+        intro = (
+            f"Hay un nuevo comentario en el ticket #{tid} - {comments[0][1]}."
+            if len(comments) == 1
+            else f"Hay {len(comments)} comentarios nuevos en el ticket #{tid} - {comments[0][1]}."
+        )
+    else:
+        subject = f"Resumen de actividad: {len(items)} comentarios en {len(tickets)} tickets"
+        intro = "Resumen de los comentarios nuevos en tus tickets."
+
+    parts = [f"Hola,\n\n{intro}\n"]
+    for tid, comments in tickets:
+        if len(tickets) > 1:
+            parts.append(f"\n== Ticket #{tid} - {comments[0][1]} ==\n")
+        for _, _, author, created_at, body in comments:
+            parts.append(f"\n{author or 'ServiceFlow'} ({created_at:%d/%m %H:%M} UTC):\n{body}\n")
+    parts.append("\n--\nServiceFlow")
+    return subject, "".join(parts)
+
+
+def flush_due(db: Session, now: Optional[datetime] = None, max_groups: int = FLUSH_GROUPS) -> int:
+    """
+    Convierte los grupos vencidos en emails del outbox y borra sus filas en la misma transacción.
+    Las filas se bloquean con SKIP LOCKED para que varios workers no envíen el mismo grupo.
+    Devuelve cuántos emails se encolaron.
+    """
+    now = now or datetime.utcnow()
+    t = PendingNotification.__table__
+    due = select(t.c.group_key).where(t.c.deliver_after <= now).distinct().limit(max_groups)
+    rows = db.execute(
+        select(t.c.id, t.c.group_key, t.c.to_email, t.c.ticket_id, t.c.ticket_title, t.c.author, t.c.created_at, t.c.body)
+        .where(t.c.group_key.in_(due))
+        .order_by(t.c.group_key, t.c.ticket_id, t.c.created_at, t.c.id)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        db.rollback()
+        return 0
+
+    emails = 0
+    for _, group in groupby(rows, key=lambda r: r.group_key):
+        group = list(group)
+        subject, body = render([(r.ticket_id, r.ticket_title, r.author, r.created_at, r.body) for r in group])
+        enqueue_email(db, group[0].to_email, subject, body)
+        emails += 1
+    db.execute(delete(t).where(t.c.id.in_([r.id for r in rows])))
+    db.commit()
+    return emails
@@ -0,0 +1,188 @@
+"""
+Outbox de emails: la API inserta en email_outbox dentro de su propia transacción y un worker
+aparte los envía, de modo que la latencia del SMTP/Mailjet no afecta a las peticiones y un
+fallo o reinicio no pierde correos.
+
+    python -m app.services.outbox worker [--once] [--batch N]
+
+Se pueden lanzar N workers: cada uno reclama lotes con SELECT ... FOR UPDATE SKIP LOCKED y los
+marca como 'sending' con un lease (next_attempt_at); si un worker muere, otro los recupera al
+vencer el lease (entrega al-menos-una-vez). Los fallos se reintentan con backoff exponencial.
+Antes de cada lote el worker vuelca las notificaciones de comentarios ya agrupadas
+(app.services.notifications).
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import signal
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.outbox import EmailOutbox
+from app.services.email import send_many
+
+logger = logging.getLogger(__name__)
+
+_LIVE = ("pending", "sending")
+
+
+def enqueue_email(db: Session, to_email: str, subject: str, body: str) -> EmailOutbox:
+    """Añade el email a la sesión; se confirma (o descarta) con la transacción del llamante."""
+    row = EmailOutbox(to_email=to_email, subject=subject, body=body, status="pending", next_attempt_at=datetime.utcnow())
+    db.add(row)
+    return row
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Espera antes del siguiente intento: base * 2^(n-1) con tope y jitter (50-100%)."""
+    delay = min(settings.EMAIL_OUTBOX_BACKOFF_MAX_SECONDS, settings.EMAIL_OUTBOX_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def claim_batch(db: Session, limit: int, now: Optional[datetime] = None) -> list:
+    """Reclama hasta `limit` emails vencidos (o con lease caducado) en una transacción corta."""
+    now = now or datetime.utcnow()
+    t = EmailOutbox.__table__
+    rows = db.execute(
+        select(t.c.id, t.c.to_email, t.c.subject, t.c.body, t.c.attempts)
+        .where(t.c.status.in_(_LIVE), t.c.next_attempt_at <= now)
+        .order_by(t.c.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if rows:
+        db.execute(
+            update(t)
+            .where(t.c.id.in_([r.id for r in rows]))
+            .values(
+                status="sending",
+                attempts=t.c.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS),
+            )
+        )
+    db.commit()
+    return rows
+
+
+def _record_results(db: Session, sent: list[int], failed: list[tuple[int, int, str]]) -> None:
+    t = EmailOutbox.__table__
+    now = datetime.utcnow()
+    if sent:
+        db.execute(
+            update(t).where(t.c.id.in_(sent), t.c.status == "sending").values(status="sent", sent_at=now, last_error=None)
+        )
+    if failed:
+        params = []
+        for row_id, attempts, error in failed:
+            exhausted = attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+            params.append(
+                {
+                    "b_id": row_id,
+                    "b_status": "failed" if exhausted else "pending",
+                    "b_next": now if exhausted else now + timedelta(seconds=backoff_seconds(attempts)),
+                    "b_error": error[:2000],
+                }
+            )
+        db.execute(
+            update(t)
+            .where(t.c.id == bindparam("b_id"), t.c.status == "sending")
+            .values(status=bindparam("b_status"), next_attempt_at=bindparam("b_next"), last_error=bindparam("b_error")),
+            params,
+        )
+    db.commit()
+
+
+def process_batch(db: Session, limit: Optional[int] = None, send: Callable[..., list[bool]] = send_many) -> int:
+    """
+    Reclama un lote (por defecto EMAIL_OUTBOX_BATCH), lo envía de una vez (misma sesión SMTP) fuera
+    de transacción y registra el resultado de cada email. Devuelve cuántos se procesaron.
+    """
+    rows = claim_batch(db, limit or settings.EMAIL_OUTBOX_BATCH)
+    if not rows:
+        return 0
+    try:
+        results = send([(r.to_email, r.subject, r.body) for r in rows], db)
+        error = "provider rejected or not configured"
+    except Exception as e:
+        results, error = [False] * len(rows), f"{type(e).__name__}: {e}"
+    sent = [r.id for r, ok in zip(rows, results) if ok]
+    failed = [(r.id, r.attempts + 1, error) for r, ok in zip(rows, results) if not ok]
+    # send_many lee la configuración con esta sesión: cerrar su transacción antes de escribir
+    db.rollback()
+    _record_results(db, sent, failed)
+    if failed:
+        logger.warning("email outbox: %d sent, %d failed", len(sent), len(failed))
+    return len(rows)
+
+
+def purge_sent(db: Session, older_than: datetime) -> int:
+    t = EmailOutbox.__table__
+    n = db.execute(delete(t).where(t.c.status == "sent", t.c.sent_at < older_than)).rowcount
+    db.commit()
+    return n or 0
+
+
+def run_worker(session_factory: Callable[[], Session], batch: int, poll: float, stop: threading.Event) -> None:
+    # Import diferido: notifications encola a través de este módulo
+    from app.services.notifications import flush_due
+
+    last_purge = datetime.min
+    while not stop.is_set():
+        db = session_factory()
+        try:
+            # Primero los grupos de notificaciones vencidos, que pasan al outbox como un email cada uno
+            flush_due(db)
+            processed = process_batch(db, batch)
+            if not processed and datetime.utcnow() - last_purge > timedelta(hours=1):
+                purge_sent(db, datetime.utcnow() - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS))
+                last_purge = datetime.utcnow()
+        except Exception:
+            db.rollback()
+            processed = 0
+            logger.exception("email outbox worker error")
+        finally:
+            db.close()
+        if not processed:
+            stop.wait(poll)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker del outbox de emails")
+    parser.add_argument("command", choices=["worker"])
+    parser.add_argument("--batch", type=int, default=settings.EMAIL_OUTBOX_BATCH)
+    parser.add_argument("--poll", type=float, default=settings.EMAIL_OUTBOX_POLL_SECONDS)
+    parser.add_argument("--once", action="store_true", help="Procesar un lote y salir")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from app.core import notify
+    from app.db.session import SessionLocal, engine
+
+    if args.once:
+        from app.services.notifications import flush_due
+
+        db = SessionLocal()
+        try:
+            print(f"[outbox] coalesced {flush_due(db)}")
+            print(f"[outbox] processed {process_batch(db, args.batch)}")
+        finally:
+            db.close()
+        return
+
+    # Recibe las invalidaciones de la configuración de email (app_config) hechas desde la API
+    notify.start_listener(engine)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    run_worker(SessionLocal, args.batch, args.poll, stop)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Mantenimiento del rollup diario ticket_daily_stats.
+
+Cada escritura de tickets llama a apply_changes() con el estado anterior y el nuevo de los
+tickets afectados: se resta la aportación antigua y se suma la nueva con UPSERTs atómicos,
+en la misma transacción. rebuild() recalcula el rollup desde tickets (backfill o corrección):
+
+    python -m app.services.rollup rebuild [--company-id N]
+"""
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import bindparam, delete, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.stats_cache import invalidate_ticket_stats
+from app.models.stats import TicketDailyStats
+from app.models.ticket import Ticket
+
+UNASSIGNED = 0
+
+# Columnas de Ticket que determinan su aportación al rollup
+SNAPSHOT_COLUMNS = [
+    Ticket.company_id,
+    Ticket.created_at,
+    Ticket.resolved_at,
+    Ticket.status,
+    Ticket.priority,
+    Ticket.assignee_id,
+    Ticket.time_spent_minutes,
+]
+
+_MEASURES = ("created", "resolved", "resolution_minutes", "time_spent_minutes")
+
+
+@dataclass(frozen=True)
+class TicketSnapshot:
+    company_id: int
+    created_at: datetime
+    resolved_at: Optional[datetime]
+    status: str
+    priority: str
+    assignee_id: Optional[int]
+    time_spent_minutes: int
+
+    def with_values(self, values: dict[str, Any]) -> "TicketSnapshot":
+        """Copia con los cambios de un UPDATE (claves = nombres de columna)."""
+        return replace(self, **{k: v for k, v in values.items() if k in self.__dataclass_fields__})
+
+
+def snapshot(t: Any) -> TicketSnapshot:
+    """Estado relevante de un Ticket (ORM, Row con SNAPSHOT_COLUMNS o dict)."""
+    get = t.get if isinstance(t, dict) else lambda k: getattr(t, k)
+    return TicketSnapshot(
+        company_id=get("company_id"),
+        created_at=get("created_at"),
+        resolved_at=get("resolved_at"),
+        status=get("status") or "open",
+        priority=get("priority") or "normal",
+        assignee_id=get("assignee_id"),
+        time_spent_minutes=get("time_spent_minutes") or 0,
+    )
+
+
+def _contributions(s: TicketSnapshot, sign: int) -> list[tuple[tuple, tuple]]:
+    state = (s.status, s.priority, s.assignee_id or UNASSIGNED)
+    out = [((s.company_id, s.created_at.date(), *state), (sign, 0, 0.0, 0))]
+    if s.resolved_at is not None:
+        minutes = (s.resolved_at - s.created_at).total_seconds() / 60.0
+        out.append(((s.company_id, s.resolved_at.date(), *state), (0, sign, sign * minutes, sign * s.time_spent_minutes)))
+    return out
+
+
+def _upsert(db: Session):
+    return pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+def apply_changes(
+    db: Session, changes: Iterable[tuple[Optional[TicketSnapshot], Optional[TicketSnapshot]]]
+) -> None:
+    """
+    Aplica (antes, después) por ticket: None como 'antes' = creado, como 'después' = borrado.
+    """
+    deltas: dict[tuple, list] = defaultdict(lambda: [0, 0, 0.0, 0])
+    for before, after in changes:
+        if before == after:
+            continue
+        for snap, sign in ((before, -1), (after, 1)):
+            if snap is None:
+                continue
+            for key, values in _contributions(snap, sign):
+                acc = deltas[key]
+                for i, v in enumerate(values):
+                    acc[i] += v
+
+    rows = [
+        dict(zip(("company_id", "day", "status", "priority", "assignee_id"), key), **dict(zip(_MEASURES, values)))
+        for key, values in deltas.items()
+        if any(values)
+    ]
+    if not rows:
+        return
+    # Las estadísticas cacheadas de esas empresas dejan de ser válidas
+    invalidate_ticket_stats(db, {row["company_id"] for row in rows})
+
+    table = TicketDailyStats.__table__
+    stmt = _upsert(db)(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["company_id", "day", "status", "priority", "assignee_id"],
+        set_={m: getattr(table.c, m) + getattr(stmt.excluded, m) for m in _MEASURES},
+    )
+    db.execute(stmt, rows)
+
+    # Sin tickets que aporten (created = resolved = 0) la fila sobra: se borra para que el rollup no
+    # acumule filas vacías ni retenga empresas cuyos tickets ya no existen
+    c = table.c
+    db.execute(
+        delete(table).where(
+            c.company_id == bindparam("company_id"),
+            c.day == bindparam("day"),
+            c.status == bindparam("status"),
+            c.priority == bindparam("priority"),
+            c.assignee_id == bindparam("assignee_id"),
+            c.created == 0,
+            c.resolved == 0,
+        ),
+        [{k: row[k] for k in ("company_id", "day", "status", "priority", "assignee_id")} for row in rows],
+    )
+
+
+def _minutes_between(db: Session, start, end):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", end - start) / 60.0
+    return (func.julianday(end) - func.julianday(start)) * 1440.0
+
+
+def rebuild(db: Session, company_id: Optional[int] = None) -> None:
+    """Recalcula el rollup (todo o una empresa) a partir de tickets con dos GROUP BY."""
+    table = TicketDailyStats.__table__
+    # Core (no ORM): utilizable desde migraciones y CLI sin configurar todos los mappers
+    tickets = Ticket.__table__
+    scope = [tickets.c.company_id == company_id] if company_id is not None else []
+    assignee = func.coalesce(tickets.c.assignee_id, UNASSIGNED)
+
+    created_day = func.date(tickets.c.created_at)
+    created = (
+        select(
+            tickets.c.company_id,
+            created_day.label("day"),
+            tickets.c.status,
+            tickets.c.priority,
+            assignee.label("assignee_id"),
+            func.count(tickets.c.id).label("created"),
+            literal(0).label("resolved"),
+            literal(0.0).label("resolution_minutes"),
+            literal(0).label("time_spent_minutes"),
+        )
+        .where(*scope)
+        .group_by(tickets.c.company_id, created_day, tickets.c.status, tickets.c.priority, assignee)
+    )
+    resolved_day = func.date(tickets.c.resolved_at)
+    resolved = (
+        select(
+            tickets.c.company_id,
+            resolved_day.label("day"),
+            tickets.c.status,
+            tickets.c.priority,
+            assignee.label("assignee_id"),
+            literal(0).label("created"),
+            func.count(tickets.c.id).label("resolved"),
+            func.sum(_minutes_between(db, tickets.c.created_at, tickets.c.resolved_at)).label("resolution_minutes"),
+            func.sum(tickets.c.time_spent_minutes).label("time_spent_minutes"),
+        )
+        .where(*scope, tickets.c.resolved_at.is_not(None))
+        .group_by(tickets.c.company_id, resolved_day, tickets.c.status, tickets.c.priority, assignee)
+    )
+    combined = union_all(created, resolved).subquery()
+    key = [combined.c.company_id, combined.c.day, combined.c.status, combined.c.priority, combined.c.assignee_id]
+    merged = select(*key, *(func.sum(combined.c[m]).label(m) for m in _MEASURES)).group_by(*key)
+
+    db.execute(delete(table).where(*([table.c.company_id == company_id] if company_id is not None else [])))
+    db.execute(
+        table.insert().from_select(["company_id", "day", "status", "priority", "assignee_id", *_MEASURES], merged)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mantenimiento del rollup ticket_daily_stats")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--company-id", type=int, default=None)
+    args = parser.parse_args()
+
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebuild(db, args.company_id)
+        db.commit()
+    finally:
+        db.close()
+    print(f"[rollup] ticket_daily_stats rebuilt ({'all companies' if args.company_id is None else args.company_id})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, cast, column, func, inspect, literal_column, or_, table, text
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.models.ticket import Ticket
+
+# Índice de búsqueda de tickets: título (peso A), descripción (B) y comentarios públicos (C).
+# - Postgres: tabla ticket_search(ticket_id, document tsvector) con índice GIN.
+# - SQLite: tabla virtual FTS5 ticket_search con rowid = ticket_id (local/tests).
+# - Otros motores: fallback a ILIKE sobre título y descripción.
+SEARCH_TABLE = "ticket_search"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_PG_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS ticket_search (
+        ticket_id INTEGER PRIMARY KEY REFERENCES tickets(id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_ticket_search_document ON ticket_search USING GIN (document)",
+]
+
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS ticket_search
+    USING fts5(title, description, comments, tokenize = 'unicode61 remove_diacritics 2')
+    """,
+]
+
+_PG_INDEX = """
+    INSERT INTO ticket_search (ticket_id, document)
+    SELECT t.id,
+           setweight(to_tsvector(CAST(:cfg AS regconfig), coalesce(t.title, '')), 'A')
+           || setweight(to_tsvector(CAST(:cfg AS regconfig), coalesce(t.description, '')), 'B')
+           || setweight(to_tsvector(CAST(:cfg AS regconfig), coalesce(
+                  (SELECT string_agg(c.body, ' ') FROM comments c WHERE c.ticket_id = t.id AND c.is_public),
+                  '')), 'C')
+    FROM tickets t
+    {where}
+    ON CONFLICT (ticket_id) DO UPDATE SET document = EXCLUDED.document
+"""
+
+_SQLITE_INDEX = """
+    INSERT INTO ticket_search (rowid, title, description, comments)
+    SELECT t.id,
+           t.title,
+           coalesce(t.description, ''),
+           coalesce((SELECT group_concat(c.body, ' ') FROM comments c WHERE c.ticket_id = t.id AND c.is_public), '')
+    FROM tickets t
+    {where}
+"""
+
+
+def _dialect(bind: Session | Connection | Engine) -> str:
+    if isinstance(bind, Session):
+        bind = bind.get_bind()
+    return bind.dialect.name
+
+
+def ensure_search_schema(engine: Engine) -> None:
+    """
+    Crea el índice de búsqueda si no existe (desarrollo; en prod lo crea Alembic).
+    Si se acaba de crear, lo rellena con los tickets existentes.
+    """
+    dialect = _dialect(engine)
+    if dialect == "postgresql":
+        ddl = _PG_DDL
+    elif dialect == "sqlite":
+        ddl = _SQLITE_DDL
+    else:
+        return
+
+    with engine.begin() as conn:
+        existed = inspect(conn).has_table(SEARCH_TABLE)
+        for stmt in ddl:
+            conn.execute(text(stmt))
+        if not existed:
+            _index(conn, None)
+
+
+def _index(conn: Session | Connection, ticket_ids: Optional[list[int]]) -> None:
+    dialect = _dialect(conn)
+    if dialect not in {"postgresql", "sqlite"}:
+        return
+    where = "WHERE t.id IN :ids" if ticket_ids is not None else ""
+    params: dict = {}
+    if ticket_ids is not None:
+        params["ids"] = ticket_ids
+
+    if dialect == "postgresql":
+        stmt = text(_PG_INDEX.format(where=where))
+        params["cfg"] = settings.SEARCH_LANGUAGE
+    else:
+        # FTS5 no admite UPSERT: borrar y reinsertar
+        if ticket_ids is None:
+            conn.execute(text("DELETE FROM ticket_search"))
+        else:
+            conn.execute(
+                text("DELETE FROM ticket_search WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True)),
+                {"ids": ticket_ids},
+            )
+        stmt = text(_SQLITE_INDEX.format(where=where))
+
+    if ticket_ids is not None:
+        stmt = stmt.bindparams(bindparam("ids", expanding=True))
+    conn.execute(stmt, params)
+
+
+def index_tickets(db: Session, ticket_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Recalcula el documento de búsqueda de los tickets indicados (todos si ticket_ids es None)
+    a partir del estado actual en BD. Se ejecuta en la transacción de la sesión.
+    """
+    ids = None if ticket_ids is None else sorted(set(ticket_ids))
+    if ids == []:
+        return
+    db.flush()
+    _index(db, ids)
+
+
+def remove_tickets(db: Session, ticket_ids: Iterable[int]) -> None:
+    ids = sorted(set(ticket_ids))
+    if not ids:
+        return
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        # ON DELETE CASCADE ya lo cubre, pero así no dependemos del orden del flush
+        stmt = text("DELETE FROM ticket_search WHERE ticket_id IN :ids")
+    elif dialect == "sqlite":
+        stmt = text("DELETE FROM ticket_search WHERE rowid IN :ids")
+    else:
+        return
+    db.execute(stmt.bindparams(bindparam("ids", expanding=True)), {"ids": ids})
+
+
+def _terms(q: str) -> list[str]:
+    return _TOKEN_RE.findall(q.lower())
+
+
+def apply_search(qs: Query, db: Session, q: str) -> Query:
+    """
+    Filtra qs por los términos de q (AND, con coincidencia por prefijo) y ordena por relevancia.
+    """
+    terms = _terms(q)
+    if not terms:
+        return qs
+
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        ts = table(SEARCH_TABLE, column("ticket_id"), column("document"))
+        tsquery = func.to_tsquery(cast(settings.SEARCH_LANGUAGE, REGCONFIG), " & ".join(f"{t}:*" for t in terms))
+        return (
+            qs.join(ts, ts.c.ticket_id == Ticket.id)
+            .filter(ts.c.document.op("@@")(tsquery))
+            .order_by(func.ts_rank_cd(ts.c.document, tsquery).desc())
+        )
+
+    if dialect == "sqlite":
+        fts = table(SEARCH_TABLE, column("rowid"))
+        match = " ".join(f'"{t}"*' for t in terms)
+        return (
+            qs.join(fts, fts.c.rowid == Ticket.id)
+            .filter(literal_column(SEARCH_TABLE).op("MATCH")(match))
+            # bm25: menor es mejor; pesos título > descripción > comentarios
+            .order_by(literal_column(f"bm25({SEARCH_TABLE}, 10.0, 4.0, 1.0)").asc())
+        )
+
+    for t in terms:
+        like = f"%{t}%"
+        qs = qs.filter(or_(Ticket.title.ilike(like), Ticket.description.ilike(like)))
+    return qs
@@ -0,0 +1,313 @@
+"""
+SLA de tickets: vencimientos precalculados y escáner de incumplimientos.
+
+Al crear un ticket (o cambiar su prioridad) se guardan first_response_due_at y resolve_due_at
+según la política de su empresa/prioridad. El escáner marca sla_state (at_risk/breached) con dos
+UPDATE que sólo recorren los índices parciales de tickets abiertos; se ejecuta en un hilo por
+worker (SLA_SCAN_INTERVAL_SECONDS) o desde cron:
+
+    python -m app.services.sla scan
+    python -m app.services.sla backfill
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import DateTime, and_, bindparam, case, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.sla import SlaPolicy
+from app.models.ticket import Ticket
+
+logger = logging.getLogger(__name__)
+
+# Minutos (primera respuesta, resolución) si la empresa no define política para la prioridad
+DEFAULT_POLICIES: dict[str, tuple[int, int]] = {
+    "urgent": (30, 4 * 60),
+    "high": (2 * 60, 24 * 60),
+    "normal": (8 * 60, 3 * 24 * 60),
+    "low": (24 * 60, 7 * 24 * 60),
+}
+BACKFILL_BATCH = 1000
+# Clave de pg_try_advisory_xact_lock: un solo worker ejecuta cada pasada del escáner
+SCAN_LOCK_KEY = 0x534C4153  # "SLAS"
+
+_scanner: threading.Thread | None = None
+_stop = threading.Event()
+
+
+def policies_for(db: Session, company_ids: Iterable[int]) -> dict[tuple[int, str], tuple[int, int]]:
+    """Políticas propias de esas empresas en una consulta: (company_id, priority) -> minutos."""
+    ids = set(company_ids)
+    if not ids:
+        return {}
+    # Core (no ORM): también se usa desde la migración de backfill
+    c = SlaPolicy.__table__.c
+    rows = db.execute(
+        select(c.company_id, c.priority, c.first_response_minutes, c.resolve_minutes).where(c.company_id.in_(ids))
+    ).all()
+    return {(r.company_id, r.priority): (r.first_response_minutes, r.resolve_minutes) for r in rows}
+
+
+def policy_minutes(policies: dict[tuple[int, str], tuple[int, int]], company_id: int, priority: str) -> tuple[int, int]:
+    return policies.get((company_id, priority)) or DEFAULT_POLICIES.get(priority) or DEFAULT_POLICIES["normal"]
+
+
+def due_dates(
+    policies: dict[tuple[int, str], tuple[int, int]], company_id: int, priority: str, created_at: Optional[datetime]
+) -> dict[str, datetime]:
+    first_response, resolve = policy_minutes(policies, company_id, priority)
+    start = created_at or datetime.utcnow()
+    return {
+        "first_response_due_at": start + timedelta(minutes=first_response),
+        "resolve_due_at": start + timedelta(minutes=resolve),
+    }
+
+
+def open_state(
+    first_response_due: Optional[datetime], resolve_due: datetime, responded_at: Optional[datetime], now: datetime
+) -> str:
+    """Estado de un ticket abierto con esos vencimientos (mismos criterios que scan())."""
+    horizon = now + timedelta(minutes=settings.SLA_AT_RISK_MINUTES)
+
+    def _due_before(limit: datetime) -> bool:
+        if resolve_due <= limit:
+            return True
+        return responded_at is None and first_response_due is not None and first_response_due <= limit
+
+    if _due_before(now):
+        return "breached"
+    return "at_risk" if _due_before(horizon) else "ok"
+
+
+def stamp(db: Session, t: Ticket) -> None:
+    """
+    (Re)calcula los vencimientos de un ticket ORM a partir de created_at y su prioridad y, si está
+    abierto, su sla_state con los nuevos plazos.
+    """
+    for key, value in due_dates(policies_for(db, [t.company_id]), t.company_id, t.priority, t.created_at).items():
+        setattr(t, key, value)
+    if t.status != "closed":
+        t.sla_state = open_state(t.first_response_due_at, t.resolve_due_at, t.first_responded_at, datetime.utcnow())
+
+
+def restamp(db: Session, rows: Iterable[Any], priority: Optional[str] = None) -> None:
+    """
+    Recalcula vencimientos de varios tickets (filas con id, company_id, priority, created_at)
+    con un único UPDATE ejecutado por lotes. priority sustituye a la de las filas si se indica.
+    El sla_state de los abiertos se recalcula con los nuevos plazos (puede volver a ok).
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    policies = policies_for(db, {r.company_id for r in rows})
+    tickets = Ticket.__table__
+    c = tickets.c
+    now = datetime.utcnow()
+    horizon = now + timedelta(minutes=settings.SLA_AT_RISK_MINUTES)
+    first = bindparam("b_first", type_=DateTime)
+    resolve = bindparam("b_resolve", type_=DateTime)
+
+    def _due_before(limit: datetime):
+        # En el SET las columnas conservan su valor anterior: se compara con los nuevos plazos
+        return or_(resolve <= limit, and_(c.first_responded_at.is_(None), first <= limit))
+
+    stmt = (
+        update(tickets)
+        .where(c.id == bindparam("b_id"))
+        .values(
+            first_response_due_at=first,
+            resolve_due_at=resolve,
+            sla_state=case(
+                (c.status == "closed", c.sla_state),
+                (_due_before(now), "breached"),
+                (_due_before(horizon), "at_risk"),
+                else_="ok",
+            ),
+            updated_at=c.updated_at,
+        )
+    )
+    params = []
+    for r in rows:
+        due = due_dates(policies, r.company_id, priority or r.priority, r.created_at)
+        params.append({"b_id": r.id, "b_first": due["first_response_due_at"], "b_resolve": due["resolve_due_at"]})
+    db.execute(stmt, params)
+
+
+def resolved_state(t: Ticket) -> str:
+    """Estado final al resolver: met si se cumplieron primera respuesta y resolución."""
+    if t.resolve_due_at is None:
+        return "met"
+    responded = t.first_responded_at or t.resolved_at
+    if t.resolved_at > t.resolve_due_at or (t.first_response_due_at and responded > t.first_response_due_at):
+        return "breached"
+    return "met"
+
+
+def resolved_state_sql(now: datetime):
+    """Equivalente SQL de resolved_state para UPDATE por conjunto (resolved_at = now)."""
+    responded = func.coalesce(Ticket.first_responded_at, now)
+    return case(
+        (or_(Ticket.resolve_due_at < now, responded > Ticket.first_response_due_at), "breached"),
+        else_="met",
+    )
+
+
+def scan(db: Session, now: Optional[datetime] = None) -> dict[str, int]:
+    """Marca tickets abiertos en riesgo o incumplidos. Idempotente; el llamante hace commit."""
+    now = now or datetime.utcnow()
+    horizon = now + timedelta(minutes=settings.SLA_AT_RISK_MINUTES)
+    tickets = Ticket.__table__
+    c = tickets.c
+
+    def _due_before(limit: datetime):
+        # Mismos predicados que los índices parciales ix_tickets_sla_*_open
+        return or_(
+            and_(c.status != "closed", c.resolve_due_at <= limit),
+            and_(c.status != "closed", c.first_responded_at.is_(None), c.first_response_due_at <= limit),
+        )
+
+    # updated_at explícito en todos los UPDATE de este módulo: son cambios de mantenimiento, no ediciones
+    # (si no, el onupdate del modelo alteraría el orden por actualización). Los ETag de tickets incluyen
+    # sla_state y los vencimientos, así que los clientes ven igualmente el cambio
+    breached = db.execute(
+        update(tickets)
+        .where(_due_before(now), c.sla_state != "breached")
+        .values(sla_state="breached", updated_at=c.updated_at)
+    ).rowcount
+    at_risk = db.execute(
+        update(tickets)
+        .where(_due_before(horizon), c.sla_state == "ok")
+        .values(sla_state="at_risk", updated_at=c.updated_at)
+    ).rowcount
+    return {"breached": breached or 0, "at_risk": at_risk or 0}
+
+
+def attainment(db: Session, company_id: Optional[int], since: datetime, now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Fracción de tickets con SLA cumplido: resueltos desde `since` dentro de plazo frente a
+    resueltos + abiertos ya vencidos. None si no hay tickets que medir.
+    """
+    now = now or datetime.utcnow()
+    scope = [Ticket.company_id == company_id] if company_id is not None else []
+    resolved, met = db.execute(
+        select(
+            func.count(Ticket.id),
+            func.count(Ticket.id).filter(Ticket.resolved_at <= Ticket.resolve_due_at),
+        ).where(*scope, Ticket.resolved_at >= since, Ticket.resolve_due_at.is_not(None))
+    ).one()
+    overdue = db.execute(
+        select(func.count(Ticket.id)).where(*scope, Ticket.status != "closed", Ticket.resolve_due_at <= now)
+    ).scalar_one()
+    total = resolved + overdue
+    return round(met / total, 4) if total else None
+
+
+def backfill(db: Session, batch: int = BACKFILL_BATCH) -> int:
+    """Calcula vencimientos (y estado final de los cerrados) de tickets sin resolve_due_at."""
+    tickets = Ticket.__table__
+    c = tickets.c
+    stmt = (
+        update(tickets)
+        .where(c.id == bindparam("b_id"))
+        .values(
+            first_response_due_at=bindparam("b_first"),
+            resolve_due_at=bindparam("b_resolve"),
+            sla_state=bindparam("b_state"),
+            updated_at=c.updated_at,
+        )
+    )
+    last_id = 0
+    done = 0
+    while True:
+        rows = db.execute(
+            select(c.id, c.company_id, c.priority, c.status, c.created_at, c.resolved_at)
+            .where(c.id > last_id, c.resolve_due_at.is_(None))
+            .order_by(c.id)
+            .limit(batch)
+        ).all()
+        if not rows:
+            return done
+        policies = policies_for(db, {r.company_id for r in rows})
+        params = []
+        for r in rows:
+            due = due_dates(policies, r.company_id, r.priority, r.created_at)
+            state = "ok"
+            if r.status == "closed" and r.resolved_at is not None:
+                state = "met" if r.resolved_at <= due["resolve_due_at"] else "breached"
+            params.append(
+                {"b_id": r.id, "b_first": due["first_response_due_at"], "b_resolve": due["resolve_due_at"], "b_state": state}
+            )
+        db.execute(stmt, params)
+        db.commit()
+        last_id = rows[-1].id
+        done += len(rows)
+
+
+def _acquire_scan_lock(db: Session) -> bool:
+    """En Postgres, lock consultivo hasta el fin de la transacción; False si otro worker ya escanea."""
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    return bool(db.execute(select(func.pg_try_advisory_xact_lock(SCAN_LOCK_KEY))).scalar())
+
+
+def _scan_loop(session_factory: Callable[[], Session], interval: float) -> None:
+    while not _stop.wait(interval):
+        db = session_factory()
+        try:
+            # Cada worker de la API arranca su hilo: el resto se salta la pasada si uno ya la hace
+            if not _acquire_scan_lock(db):
+                continue
+            counts = scan(db)
+            db.commit()
+            if any(counts.values()):
+                logger.info("sla scan flagged %s", counts)
+        except Exception:
+            db.rollback()
+            logger.exception("sla scan failed")
+        finally:
+            db.close()
+
+
+def start_scanner(session_factory: Callable[[], Session], interval: float) -> None:
+    """Arranca (una vez por proceso) el hilo del escáner. interval <= 0 lo desactiva."""
+    global _scanner
+    if interval <= 0 or _scanner is not None:
+        return
+    _stop.clear()
+    _scanner = threading.Thread(target=_scan_loop, args=(session_factory, interval), name="sla-scanner", daemon=True)
+    _scanner.start()
+
+
+def stop_scanner() -> None:
+    global _scanner
+    _stop.set()
+    _scanner = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SLA de tickets")
+    parser.add_argument("command", choices=["scan", "backfill"])
+    args = parser.parse_args()
+
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if args.command == "scan":
+            result = scan(db)
+            db.commit()
+        else:
+            result = {"backfilled": backfill(db)}
+    finally:
+        db.close()
+    print(f"[sla] {result}")
+
+
+if __name__ == "__main__":
+    main()
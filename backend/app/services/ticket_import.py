@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, BinaryIO, Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.schemas.ticket import TicketCreate, TicketImportError, TicketImportResult
+from app.services.classifier import classify
+from app.services import sla
+from app.services.rollup import apply_changes, snapshot
+from app.services.search import index_tickets
+
+# Filas por INSERT multi-fila (... RETURNING id) y por commit
+IMPORT_CHUNK = 1000
+
+Row = tuple[int, Any]  # (número de fila, dict o error de parseo)
+
+
+def rows_from_json(items: list[Any]) -> Iterator[Row]:
+    for i, item in enumerate(items, start=1):
+        yield i, item
+
+
+def rows_from_ndjson(fileobj: BinaryIO) -> Iterator[Row]:
+    for i, line in enumerate(io.TextIOWrapper(fileobj, encoding="utf-8-sig"), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield i, json.loads(line)
+        except ValueError as e:
+            yield i, e
+
+
+def rows_from_csv(fileobj: BinaryIO) -> Iterator[Row]:
+    reader = csv.DictReader(io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline=""))
+    # Fila 1 = cabecera
+    for i, record in enumerate(reader, start=2):
+        # Celdas vacías -> valor por defecto del schema
+        yield i, {k: v for k, v in record.items() if k and v not in (None, "")}
+
+
+def _error_detail(err: Exception) -> str:
+    if isinstance(err, ValidationError):
+        return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in err.errors())
+    return str(err)
+
+
+def import_tickets(db: Session, rows: Iterable[Row], requester_id: int, company_id: int) -> TicketImportResult:
+    """
+    Valida cada fila con TicketCreate e inserta las válidas por bloques de IMPORT_CHUNK
+    con un único INSERT multi-fila por bloque. Las filas inválidas se reportan y no detienen la carga.
+    """
+    errors: list[TicketImportError] = []
+    created = 0
+    policies = sla.policies_for(db, [company_id])
+    chunk: list[tuple[int, dict[str, Any]]] = []
+
+    def flush() -> None:
+        nonlocal created
+        if not chunk:
+            return
+        # Un assignee inexistente haría fallar el bloque entero por la FK: se valida antes en una consulta
+        assignees = {values["assignee_id"] for _, values in chunk if values["assignee_id"] is not None}
+        known = set(db.scalars(select(User.id).where(User.id.in_(assignees)))) if assignees else set()
+        params = []
+        for row_no, values in chunk:
+            if values["assignee_id"] is not None and values["assignee_id"] not in known:
+                errors.append(TicketImportError(row=row_no, detail="assignee_id: User not found"))
+            else:
+                params.append(values)
+        chunk.clear()
+        if not params:
+            return
+        ids = db.scalars(insert(Ticket).returning(Ticket.id), params).all()
+        index_tickets(db, ids)
+        apply_changes(db, ((None, snapshot(values)) for values in params))
+        db.commit()
+        created += len(ids)
+
+    for row_no, raw in rows:
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            data = TicketCreate.model_validate(raw)
+        except (ValidationError, ValueError) as e:
+            errors.append(TicketImportError(row=row_no, detail=_error_detail(e)))
+            continue
+
+        now = datetime.utcnow()
+        values = {
+            "title": data.title,
+            "description": data.description,
+            "status": data.status or "open",
+            "priority": data.priority,
+            "category": classify(data.title, data.description),
+            "requester_id": requester_id,
+            "assignee_id": data.assignee_id,
+            "company_id": company_id,
+            "time_spent_minutes": 0,
+            "created_at": now,
+            "updated_at": now,
+            "sla_state": "ok",
+            **sla.due_dates(policies, company_id, data.priority, now),
+        }
+        chunk.append((row_no, values))
+        if len(chunk) >= IMPORT_CHUNK:
+            flush()
+    flush()
+
+    errors.sort(key=lambda e: e.row)
+    return TicketImportResult(created=created, failed=len(errors), errors=errors)
@@ -0,0 +1,72 @@
+"""
+Coste por petición de la autenticación (get_current_user) con y sin la caché de JWT verificados.
+
+    python scripts/bench_auth.py [--requests 20000]
+
+Usa una BD SQLite temporal con un usuario; la caché de principales se calienta antes de medir,
+así que la diferencia es sólo la verificación de firma (python-jose) frente a la búsqueda en la LRU.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_auth.db')}")
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de get_current_user")
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.core.deps import get_current_user
+    from app.core.principal_cache import principal_cache
+    from app.core.security import create_access_token
+    from app.core.token_cache import token_cache
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.company import Company
+    from app.models.user import User
+    import app.models.ticket  # noqa: F401  relaciones de User/Company
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    company = Company(name="Bench")
+    db.add(company)
+    db.flush()
+    user = User(email="bench@serviceflow.local", hashed_password="x", role="tech", company_id=company.id)
+    db.add(user)
+    db.commit()
+
+    token = create_access_token(
+        {"sub": str(user.id), "role": "tech", "company_id": company.id}, settings.JWT_SECRET, settings.JWT_EXPIRE_MIN
+    )
+    authorization = f"Bearer {token}"
+    get_current_user(authorization, db)  # calienta la caché de principales
+
+    def run(label: str, cache_size: int) -> float:
+        token_cache.clear()
+        token_cache.maxsize = cache_size
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            get_current_user(authorization, db)
+        per_request = (time.perf_counter() - start) / args.requests * 1e6
+        print(f"[bench] {label:<18} {per_request:8.1f} us/request")
+        return per_request
+
+    assert principal_cache.get(user.id) is not None
+    before = run("sin token cache", 0)
+    after = run("con token cache", settings.TOKEN_CACHE_SIZE)
+    print(f"[bench] speedup x{before / after:.1f} ({args.requests} peticiones con el mismo token)")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
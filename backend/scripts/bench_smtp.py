@@ -0,0 +1,128 @@
+"""
+Coste por mensaje del envío SMTP con y sin el pool de sesiones (SmtpPool).
+
+    python scripts/bench_smtp.py [--messages 200] [--port 8025]
+
+Levanta un servidor aiosmtpd local con STARTTLS (certificado autofirmado generado al vuelo) y mide:
+una conexión + STARTTLS por mensaje (comportamiento anterior), _send_many_smtp mensaje a mensaje
+con el pool y un lote completo en una sola llamada. Al final reinicia el servidor para comprobar
+que una sesión rota del pool se descarta y el lote se reintenta con una nueva.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import os
+import smtplib
+import ssl
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_smtp.db')}")
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+
+
+def _tls_context(workdir: str) -> ssl.SSLContext:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = os.path.join(workdir, "cert.pem"), os.path.join(workdir, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption()
+            )
+        )
+    ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ctx.load_cert_chain(cert_path, key_path)
+    return ctx
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark del pool SMTP")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    from aiosmtpd.controller import Controller
+
+    from app.core.config import settings
+    from app.services import email
+
+    class Counter:
+        delivered = 0
+
+        async def handle_DATA(self, server, session, envelope):
+            Counter.delivered += 1
+            return "250 OK"
+
+    tls = _tls_context(tempfile.mkdtemp())
+
+    def start() -> Controller:
+        controller = Controller(Counter(), hostname="127.0.0.1", port=args.port, tls_context=tls, require_starttls=False)
+        controller.start()
+        return controller
+
+    n = args.messages
+    cfg = {"smtp_host": "127.0.0.1", "smtp_port": args.port, "smtp_user": None, "smtp_pass": None, "from_email": "bench@serviceflow.local"}
+    message = ("to@serviceflow.local", "bench", "body")
+    controller = start()
+    try:
+        start_t = time.perf_counter()
+        for _ in range(n):
+            client = smtplib.SMTP("127.0.0.1", args.port, timeout=settings.SMTP_TIMEOUT_SECONDS)
+            client.starttls()
+            client.send_message(email._build_message(cfg["from_email"], *message))
+            client.quit()
+        baseline = (time.perf_counter() - start_t) / n * 1000
+        print(f"[bench] conexión por mensaje {baseline:8.2f} ms/msg")
+
+        start_t = time.perf_counter()
+        for _ in range(n):
+            assert email._send_many_smtp(cfg, [message]) == [True]
+        pooled = (time.perf_counter() - start_t) / n * 1000
+        print(f"[bench] pool, 1 por llamada  {pooled:8.2f} ms/msg")
+
+        start_t = time.perf_counter()
+        assert all(email._send_many_smtp(cfg, [message] * n))
+        batched = (time.perf_counter() - start_t) / n * 1000
+        print(f"[bench] pool, lote de {n:<5}  {batched:8.2f} ms/msg")
+        print(f"[bench] speedup x{baseline / pooled:.1f} (pool) x{baseline / batched:.1f} (lote); entregados={Counter.delivered}")
+
+        # El servidor se reinicia: la sesión del pool queda rota y debe reintentarse con otra
+        controller.stop()
+        controller = start()
+        results = email._send_many_smtp(cfg, [message] * 3)
+        print(f"[bench] tras reiniciar el servidor: {results}")
+        assert results == [True] * 3
+    finally:
+        controller.stop()
+        with email._pools_lock:
+            pools = list(email._pools.values())
+            email._pools.clear()
+        for pool in pools:
+            pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+
+# La configuración se lee al importar app.core.config: valores de prueba antes de cualquier import de app
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'serviceflow-test.db')}")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "serviceflow-test-uploads"))
+os.environ.setdefault("SLA_SCAN_INTERVAL_SECONDS", "0")  # los tests lanzan el escáner a mano
+
+import pytest
+from sqlalchemy import text
+
+# Cuentas demo que crea el arranque de la API (app.main.on_startup)
+ACCOUNTS = {
+    "superadmin": ("superadmin@serviceflow.local", "admin123"),
+    "admin": ("admin@acme.local", "admin123"),
+    "tech": ("tech@acme.local", "tech123"),
+    "user": ("user@acme.local", "user123"),
+}
+
+
+def reset_database(engine) -> None:
+    """Deja la BD de DATABASE_URL vacía (fichero nuevo en SQLite; tablas borradas en Postgres)."""
+    engine.dispose()
+    url = engine.url
+    if url.get_backend_name() == "sqlite":
+        if url.database and os.path.exists(url.database):
+            os.remove(url.database)
+        return
+    from app.db.base import Base
+    import app.main  # noqa: F401  registra todos los modelos en Base.metadata
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS ticket_search, alembic_version CASCADE"))
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(scope="module")
+def client():
+    """API con la BD recién creada y sembrada por el arranque; cachés en proceso vacías."""
+    from fastapi.testclient import TestClient
+
+    from app.core import rate_limit
+    from app.core.config_cache import app_config_cache
+    from app.core.principal_cache import principal_cache
+    from app.core.stats_cache import ticket_stats_cache
+    from app.core.token_cache import token_cache
+    from app.db.session import engine
+    from app.main import app
+
+    reset_database(engine)
+    principal_cache.invalidate()
+    token_cache.clear()
+    ticket_stats_cache.invalidate()
+    app_config_cache.invalidate()
+    rate_limit.login_throttle.backend = rate_limit.MemoryBackend()
+    with TestClient(app) as c:
+        yield c
+    engine.dispose()
+
+
+def login(client, email: str, password: str) -> dict:
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+@pytest.fixture(scope="module")
+def auth(client) -> dict:
+    """Cabeceras Authorization por rol de las cuentas demo."""
+    return {role: login(client, email, password) for role, (email, password) in ACCOUNTS.items()}
+
+
+@pytest.fixture
+def db(client):
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.close()
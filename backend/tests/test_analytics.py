@@ -0,0 +1,98 @@
+"""
+GET /stats/resolution: percentiles por cubeta y grupo calculados con NumPy, frente a un cálculo
+directo, y rangos start/end con zona horaria normalizados a UTC naive.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from app.db.session import SessionLocal
+from app.models.ticket import Ticket
+
+RESOLUTION = "/api/v1/stats/resolution"
+REQUESTER_ID, TECH_ID = 6, 4  # user@acme.local y tech@acme.local en el seed
+MONDAY = datetime(2020, 1, 6)
+
+# (horas desde el lunes hasta la resolución, minutos de resolución, prioridad, time_spent_minutes)
+ROWS = [
+    (0.5, 30, "high", 10),
+    (2, 90, "high", 20),
+    (5, 240, "high", 0),
+    (30, 600, "low", 45),
+    (-0.5, 60, "low", 5),  # domingo anterior: fuera del rango
+    (8 * 24, 120, "high", 15),  # semana siguiente
+]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def tickets(client):
+    rows = []
+    for hours, minutes, priority, spent in ROWS:
+        resolved_at = MONDAY + timedelta(hours=hours)
+        rows.append(
+            {
+                "title": "Histórico",
+                "status": "closed",
+                "priority": priority,
+                "requester_id": REQUESTER_ID,
+                "assignee_id": TECH_ID,
+                "company_id": 1,
+                "created_at": resolved_at - timedelta(minutes=minutes),
+                "updated_at": resolved_at,
+                "resolved_at": resolved_at,
+                "time_spent_minutes": spent,
+                "sla_state": "met",
+            }
+        )
+    with SessionLocal() as db:
+        db.execute(insert(Ticket.__table__), rows)
+        db.commit()
+
+
+def _get(client, headers, **params) -> dict:
+    r = client.get(RESOLUTION, params=params, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_percentiles_by_week_and_priority(client, auth):
+    data = _get(client, auth["admin"], start="2020-01-06T00:00:00", end="2020-01-20T00:00:00")
+    assert data["total"] == 5
+    series = {(s["bucket"], s["group"]): s for s in data["series"]}
+    assert set(series) == {("2020-01-06", "high"), ("2020-01-06", "low"), ("2020-01-13", "high")}
+
+    high = series[("2020-01-06", "high")]
+    assert high["count"] == 3
+    expected = np.percentile([30, 90, 240], [50, 90, 99])
+    assert [high["resolution_minutes"][k] for k in ("p50", "p90", "p99")] == [round(float(v), 2) for v in expected]
+    assert high["resolution_minutes"]["mean"] == 120.0
+    assert high["time_spent_minutes"]["mean"] == 10.0
+    assert sum(data["histogram"]["counts"]) == 5
+
+
+def test_timezone_aware_range(client, auth):
+    # 01:00+01:00 == 00:00 UTC: el ticket del domingo (23:30 UTC) sigue fuera
+    data = _get(client, auth["admin"], start="2020-01-06T01:00:00+01:00", end="2020-01-08T00:00:00Z")
+    assert data["start"] == "2020-01-06T00:00:00"
+    assert data["end"] == "2020-01-08T00:00:00"
+    assert data["total"] == 4
+
+    shifted = _get(client, auth["admin"], start="2020-01-05T23:00:00-01:00", end="2020-01-08T00:00:00Z")
+    assert shifted["total"] == 4
+
+
+def test_group_by_tech_labels(client, auth):
+    data = _get(client, auth["admin"], start="2020-01-06T00:00:00", end="2020-01-20T00:00:00", group_by="tech")
+    assert {s["label"] for s in data["series"]} == {"Tech Acme"}
+
+
+def test_validation_and_permissions(client, auth):
+    r = client.get(RESOLUTION, params={"start": "2020-01-08T00:00:00Z", "end": "2020-01-06T00:00:00Z"}, headers=auth["admin"])
+    assert r.status_code == 422
+    assert client.get(RESOLUTION, headers=auth["user"]).status_code == 403
+    other = _get(client, auth["superadmin"], start="2020-01-06T00:00:00", end="2020-01-20T00:00:00")
+    assert other["total"] == 5
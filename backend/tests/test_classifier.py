@@ -0,0 +1,56 @@
+"""
+Categorización al escribir: el ticket nace con categoría, el backfill rellena las que faltan sin
+tocar updated_at (y el ETag cambia igualmente) y el PATCH no edita título ni descripción.
+"""
+from __future__ import annotations
+
+from sqlalchemy import update
+
+from app.models.ticket import Ticket
+from app.services import classifier
+
+TICKETS = "/api/v1/tickets/"
+
+
+def test_create_classifies(client, auth):
+    r = client.post(TICKETS, json={"title": "La impresora no imprime"}, headers=auth["user"])
+    assert r.status_code == 200, r.text
+    assert r.json()["category"] == "hardware"
+
+
+def test_backfill_changes_etag_without_touching_updated_at(client, auth, db):
+    r = client.post(TICKETS, json={"title": "No puedo entrar en la VPN"}, headers=auth["user"])
+    ticket_id = r.json()["id"]
+    tickets = Ticket.__table__
+    db.execute(
+        update(tickets).where(tickets.c.id == ticket_id).values(category=None, updated_at=tickets.c.updated_at)
+    )
+    db.commit()
+
+    url = f"{TICKETS}{ticket_id}"
+    first = client.get(url, headers=auth["admin"])
+    assert first.json()["category"] is None
+    cached = client.get(url, headers={**auth["admin"], "If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+
+    assert classifier.backfill(db) >= 1
+
+    again = client.get(url, headers={**auth["admin"], "If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 200
+    assert again.json()["category"] == "network"
+    assert again.json()["updated_at"] == first.json()["updated_at"]
+
+
+def test_patch_does_not_edit_text(client, auth):
+    r = client.post(TICKETS, json={"title": "Outlook no sincroniza"}, headers=auth["user"])
+    ticket = r.json()
+
+    r = client.patch(
+        f"{TICKETS}{ticket['id']}",
+        json={"title": "Otro título", "description": "Otra descripción", "category": "software"},
+        headers=auth["tech"],
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["title"] == ticket["title"]
+    assert r.json()["description"] == ticket["description"]
+    assert r.json()["category"] == "software"
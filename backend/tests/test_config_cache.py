@@ -0,0 +1,89 @@
+"""
+Caché de app_config: lecturas sin consultas en régimen estable, invalidación al hacer commit de
+una escritura (no en rollback) y cargas concurrentes con una invalidación que no se guardan.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.core.config_cache import AppConfigCache, app_config_cache, invalidate_app_config
+from app.db.session import engine
+
+EMAIL_CONFIG = "/api/v1/system/email-config"
+
+
+@contextmanager
+def config_queries():
+    statements: list[str] = []
+
+    def before(conn, cursor, statement, *args):
+        if "app_config" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+
+
+def _put(client, auth, **payload) -> dict:
+    r = client.put(EMAIL_CONFIG, json=payload, headers=auth["superadmin"])
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_reads_are_served_from_memory(client, auth):
+    app_config_cache.invalidate()
+    with config_queries() as statements:
+        for _ in range(3):
+            assert client.get(EMAIL_CONFIG, headers=auth["superadmin"]).status_code == 200
+    assert len(statements) == 1
+
+
+def test_writes_are_visible_immediately(client, auth):
+    client.get(EMAIL_CONFIG, headers=auth["superadmin"])
+    assert _put(client, auth, provider="console", smtp_host="smtp.uno.example.com")["smtp_host"] == "smtp.uno.example.com"
+
+    # Upsert de claves existentes y secretos enmascarados
+    _put(client, auth, provider="smtp", smtp_host="smtp.dos.example.com", smtp_pass="secreto")
+    config = client.get(EMAIL_CONFIG, headers=auth["admin"]).json()
+    assert (config["provider"], config["smtp_host"], config["has_smtp_pass"]) == ("smtp", "smtp.dos.example.com", True)
+    assert "smtp_pass" not in config
+
+
+def test_only_superadmin_writes(client, auth):
+    r = client.put(EMAIL_CONFIG, json={"provider": "disabled"}, headers=auth["admin"])
+    assert r.status_code == 403
+
+
+def test_rollback_keeps_cache(db):
+    app_config_cache.get(db)
+    version = app_config_cache.version
+    invalidate_app_config(db)
+    db.rollback()
+    assert app_config_cache.version == version
+
+    invalidate_app_config(db)
+    db.commit()
+    assert app_config_cache.version == version + 1
+
+
+def test_stale_load_is_not_stored(db):
+    cache = AppConfigCache(300)
+
+    def before(conn, cursor, statement, *args):
+        if "app_config" in statement:
+            cache.invalidate()  # escritura en otro worker durante la carga
+
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        cache.get(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+    assert cache._data is None
+
+    cache.get(db)
+    assert cache._data is not None
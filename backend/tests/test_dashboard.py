@@ -0,0 +1,80 @@
+"""
+GET /dashboard/overview: los agregados sobre el rollup coinciden con los recuentos directos sobre
+tickets, por empresa y globales, y siguen a las altas y cambios de estado.
+"""
+from __future__ import annotations
+
+from collections import Counter
+
+from sqlalchemy import select
+
+from app.api.v1.endpoints.dashboard import TREND_WEEKS
+from app.models.ticket import Ticket
+from app.models.user import User
+
+OVERVIEW = "/api/v1/dashboard/overview"
+TICKETS = "/api/v1/tickets/"
+TECH_ID = 4  # tech@acme.local en el seed
+
+
+def _expected(db, company_id: int | None) -> dict:
+    scope = [Ticket.company_id == company_id] if company_id is not None else []
+    rows = db.execute(select(Ticket.status, Ticket.priority, Ticket.assignee_id).where(*scope)).all()
+    names = dict(db.execute(select(User.id, User.full_name)).all())
+    performance = Counter(names[r.assignee_id] for r in rows if r.status == "closed" and r.assignee_id)
+    return {
+        "by_status": dict(Counter(r.status for r in rows)),
+        "by_priority": dict(Counter(r.priority for r in rows)),
+        "tech_performance": dict(performance),
+        "total": len(rows),
+    }
+
+
+def _overview(client, headers) -> dict:
+    r = client.get(OVERVIEW, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _check(client, headers, db, company_id: int | None) -> dict:
+    data = _overview(client, headers)
+    expected = _expected(db, company_id)
+    assert data["by_status"] == expected["by_status"]
+    assert data["by_priority"] == expected["by_priority"]
+    assert data["tech_performance"] == expected["tech_performance"]
+    kpis = data["kpis"]
+    assert kpis["total"] == expected["total"]
+    assert kpis["open"] == expected["by_status"].get("open", 0)
+    assert kpis["closed"] == expected["by_status"].get("closed", 0)
+    return data
+
+
+def test_matches_ticket_counts(client, auth, db):
+    for priority in ("low", "high", "high"):
+        r = client.post(TICKETS, json={"title": f"Dashboard {priority}", "priority": priority}, headers=auth["user"])
+        assert r.status_code == 200, r.text
+    r = client.post(TICKETS, json={"title": "Dashboard cerrado", "assignee_id": TECH_ID}, headers=auth["user"])
+    ticket_id = r.json()["id"]
+    assert client.patch(f"{TICKETS}{ticket_id}", json={"status": "closed"}, headers=auth["tech"]).status_code == 200
+
+    acme = _check(client, auth["admin"], db, company_id=1)
+    assert acme["tech_performance"]["Tech Acme"] >= 1
+    everyone = _check(client, auth["superadmin"], db, company_id=None)
+    assert everyone["kpis"]["total"] >= acme["kpis"]["total"]
+
+
+def test_follows_status_changes(client, auth, db):
+    before = _overview(client, auth["admin"])["kpis"]
+    r = client.post(TICKETS, json={"title": "Dashboard en curso"}, headers=auth["user"])
+    ticket_id = r.json()["id"]
+    assert _overview(client, auth["admin"])["kpis"]["open"] == before["open"] + 1
+
+    assert client.patch(f"{TICKETS}{ticket_id}", json={"status": "in_progress"}, headers=auth["tech"]).status_code == 200
+    after = _check(client, auth["admin"], db, company_id=1)["kpis"]
+    assert (after["open"], after["in_progress"]) == (before["open"], before["in_progress"] + 1)
+
+
+def test_trend_shape(client, auth):
+    trend = _overview(client, auth["admin"])["resolution_trend"]
+    assert len(trend) == TREND_WEEKS
+    assert all(point["avg_hours"] >= 0 for point in trend)
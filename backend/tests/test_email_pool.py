@@ -0,0 +1,124 @@
+"""
+Pool de sesiones SMTP: reutilización entre envíos, descarte de sesiones ociosas o caídas,
+cierre de los pools de una configuración anterior y reintento de un lote cortado a medias.
+"""
+from __future__ import annotations
+
+import smtplib
+
+import pytest
+
+from app.core.config import settings
+from app.services import email
+
+CFG = {"provider": "smtp", "smtp_host": "smtp.example.com", "smtp_port": 587, "smtp_user": "u", "smtp_pass": "p"}
+MESSAGES = [(f"dest{i}@example.com", "Asunto", "Cuerpo") for i in range(3)]
+
+
+class FakeSMTP:
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.logins = 0
+        self.sent: list[str] = []
+        self.quit_called = False
+        self.noop_code = 250
+        self.fail_after: int | None = None
+        self.refuse: set[str] = set()
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        self.logins += 1
+
+    def noop(self):
+        return (self.noop_code, b"ok")
+
+    def send_message(self, msg):
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            raise smtplib.SMTPServerDisconnected("connection lost")
+        if msg["To"] in self.refuse:
+            raise smtplib.SMTPRecipientsRefused({msg["To"]: (550, b"no such user")})
+        self.sent.append(msg["To"])
+
+    def quit(self):
+        self.quit_called = True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    created: list[FakeSMTP] = []
+
+    def fake_client(host, port):
+        client = FakeSMTP(host, port)
+        created.append(client)
+        return client, True
+
+    monkeypatch.setattr(email, "_smtp_client", fake_client)
+    monkeypatch.setattr(email, "_pools", {})
+    yield created
+    for pool in email._pools.values():
+        pool.close()
+
+
+def test_sessions_are_reused(clients):
+    assert email._send_many_smtp(CFG, MESSAGES) == [True] * 3
+    assert email._send_many_smtp(CFG, MESSAGES[:1]) == [True]
+    (client,) = clients
+    assert client.logins == 1
+    assert len(client.sent) == 4
+
+
+def test_config_change_closes_old_pool(clients):
+    email._send_many_smtp(CFG, MESSAGES[:1])
+    old_pool = email._smtp_pool(CFG)
+    email._send_many_smtp({**CFG, "smtp_pass": "nueva"}, MESSAGES[:1])
+    assert len(clients) == 2
+    assert clients[0].quit_called
+    assert list(email._pools) == [("smtp.example.com", 587, "u", "nueva")]
+    assert old_pool._closed
+
+
+def test_idle_sessions_are_evicted(clients, monkeypatch):
+    email._send_many_smtp(CFG, MESSAGES[:1])
+    now = email.time.monotonic()
+    monkeypatch.setattr(email.time, "monotonic", lambda: now + settings.SMTP_POOL_IDLE_SECONDS + 1)
+    email._send_many_smtp(CFG, MESSAGES[:1])
+    assert len(clients) == 2
+    assert clients[0].quit_called and not clients[1].quit_called
+
+
+def test_failed_healthcheck_reconnects(clients, monkeypatch):
+    email._send_many_smtp(CFG, MESSAGES[:1])
+    clients[0].noop_code = 421
+    now = email.time.monotonic()
+    monkeypatch.setattr(email.time, "monotonic", lambda: now + settings.SMTP_POOL_HEALTHCHECK_SECONDS + 1)
+    email._send_many_smtp(CFG, MESSAGES[:1])
+    assert len(clients) == 2
+    assert clients[0].quit_called
+
+
+def test_disconnect_mid_batch_retries_remaining(clients):
+    email._send_many_smtp(CFG, MESSAGES[:1])
+    clients[0].fail_after = 2  # ya lleva uno enviado: corta tras el segundo
+    assert email._send_many_smtp(CFG, MESSAGES) == [True] * 3
+    assert clients[0].sent == ["dest0@example.com", "dest0@example.com"]
+    assert clients[1].sent == ["dest1@example.com", "dest2@example.com"]
+
+
+def test_rejected_recipient_keeps_session(clients):
+    email._send_many_smtp(CFG, MESSAGES[:1])
+    clients[0].refuse = {"dest1@example.com"}
+    assert email._send_many_smtp(CFG, MESSAGES) == [True, False, True]
+    assert len(clients) == 1 and not clients[0].quit_called
+
+
+def test_pool_closed_while_in_use(clients):
+    pool = email._smtp_pool(CFG)
+    with pool.session() as client:
+        pool.close()
+    assert client.quit_called
+    assert not pool._idle
@@ -0,0 +1,88 @@
+"""
+GET condicionales (ETag / If-None-Match / 304) en tickets, usuarios y empresas.
+"""
+from __future__ import annotations
+
+TICKETS = "/api/v1/tickets/"
+
+
+def _get(client, url: str, headers: dict, etag: str | None = None, **params):
+    return client.get(url, params=params, headers={**headers, **({"If-None-Match": etag} if etag else {})})
+
+
+def test_ticket_list_roundtrip(client, auth):
+    headers = auth["admin"]
+    first = _get(client, TICKETS, headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    cached = _get(client, TICKETS, headers, etag)
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+    # Comparación débil: el cliente puede devolverlo sin W/ o dentro de una lista
+    assert _get(client, TICKETS, headers, etag.removeprefix("W/")).status_code == 304
+    assert _get(client, TICKETS, headers, f'"otro", {etag}').status_code == 304
+
+    ticket_id = first.json()[0]["id"]
+    r = client.patch(f"{TICKETS}{ticket_id}", json={"priority": "urgent"}, headers=auth["tech"])
+    assert r.status_code == 200, r.text
+    changed = _get(client, TICKETS, headers, etag)
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_ticket_list_etag_depends_on_query_and_user(client, auth):
+    base = _get(client, TICKETS, auth["admin"]).headers["ETag"]
+    assert _get(client, TICKETS, auth["admin"], base, status="open").status_code == 200
+    assert _get(client, TICKETS, auth["admin"], base, fields="id,title").status_code == 200
+    assert _get(client, TICKETS, auth["tech"], base).status_code == 200
+
+
+def test_new_ticket_changes_list_etag(client, auth):
+    etag = _get(client, TICKETS, auth["admin"]).headers["ETag"]
+    r = client.post(TICKETS, json={"title": "Nuevo ticket"}, headers=auth["user"])
+    assert r.status_code == 200, r.text
+    listed = _get(client, TICKETS, auth["admin"], etag)
+    assert listed.status_code == 200
+    assert listed.json()[0]["id"] == r.json()["id"]
+
+
+def test_ticket_detail_roundtrip(client, auth):
+    ticket_id = _get(client, TICKETS, auth["admin"]).json()[0]["id"]
+    url = f"{TICKETS}{ticket_id}"
+    first = _get(client, url, auth["admin"])
+    assert first.status_code == 200
+    assert _get(client, url, auth["admin"], first.headers["ETag"]).status_code == 304
+
+    r = client.patch(url, json={"status": "in_progress"}, headers=auth["tech"])
+    assert r.status_code == 200, r.text
+    again = _get(client, url, auth["admin"], first.headers["ETag"])
+    assert again.status_code == 200
+    assert again.json()["status"] == "in_progress"
+
+
+def test_ticket_detail_checks_scope_before_304(client, auth):
+    r = client.post(TICKETS, json={"title": "Ticket de Acme"}, headers=auth["user"])
+    url = f"{TICKETS}{r.json()['id']}"
+    etag = _get(client, url, auth["admin"]).headers["ETag"]
+    globex_user = client.post("/api/v1/auth/login", json={"email": "user@globex.local", "password": "user123"})
+    headers = {"Authorization": f"Bearer {globex_user.json()['access_token']}"}
+    assert _get(client, url, headers, etag).status_code in {403, 404}
+
+
+def test_users_and_companies_lists(client, auth):
+    sa = auth["superadmin"]
+    users = _get(client, "/api/v1/users/", sa)
+    companies = _get(client, "/api/v1/companies/", sa)
+    assert _get(client, "/api/v1/users/", sa, users.headers["ETag"]).status_code == 304
+    assert _get(client, "/api/v1/companies/", sa, companies.headers["ETag"]).status_code == 304
+
+    r = client.patch("/api/v1/users/4", json={"full_name": "Tech Acme (renombrado)"}, headers=sa)
+    assert r.status_code == 200, r.text
+    assert _get(client, "/api/v1/users/", sa, users.headers["ETag"]).status_code == 200
+
+    r = client.patch("/api/v1/companies/2", json={"name": "Globex Corporation"}, headers=sa)
+    assert r.status_code == 200, r.text
+    assert _get(client, "/api/v1/companies/", sa, companies.headers["ETag"]).status_code == 200
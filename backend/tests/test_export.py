@@ -0,0 +1,67 @@
+"""
+GET /tickets/export: CSV y NDJSON en streaming con los mismos filtros, orden y scope que el listado.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+
+import pytest
+
+from app.services import export
+
+TICKETS = "/api/v1/tickets/"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def tickets(client, auth):
+    for i in range(7):
+        r = client.post(
+            TICKETS,
+            json={"title": f"Export {i}", "description": "línea 1\nlínea, \"2\"", "priority": "high" if i % 2 else "low"},
+            headers=auth["user"],
+        )
+        assert r.status_code == 200, r.text
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    # Varios chunks por respuesta con pocos tickets
+    monkeypatch.setattr(export, "EXPORT_BATCH", 3)
+
+
+def _listed(client, auth, **params) -> list[int]:
+    return [t["id"] for t in client.get(TICKETS, params={"limit": 200, **params}, headers=auth["admin"]).json()]
+
+
+def test_csv_matches_listing(client, auth):
+    r = client.get(TICKETS + "export", params={"format": "csv"}, headers=auth["admin"])
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("text/csv")
+    assert "attachment" in r.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert list(rows[0]) == export.EXPORT_FIELDS
+    assert [int(row["id"]) for row in rows] == _listed(client, auth)
+    exported = next(row for row in rows if row["title"] == "Export 0")
+    assert exported["description"] == "línea 1\nlínea, \"2\""
+
+
+def test_ndjson_applies_filters(client, auth):
+    r = client.get(TICKETS + "export", params={"format": "ndjson", "priority": "high"}, headers=auth["admin"])
+    assert r.status_code == 200, r.text
+    items = [json.loads(line) for line in r.text.splitlines()]
+    assert items and all(item["priority"] == "high" for item in items)
+    assert [item["id"] for item in items] == _listed(client, auth, priority="high")
+    assert set(items[0]) == set(export.EXPORT_FIELDS)
+
+
+def test_export_respects_scope(client, auth):
+    r = client.get(TICKETS + "export", params={"format": "ndjson"}, headers=auth["user"])
+    items = [json.loads(line) for line in r.text.splitlines()]
+    assert items and {item["company_id"] for item in items} == {1}
+
+
+def test_unknown_format(client, auth):
+    assert client.get(TICKETS + "export", params={"format": "xml"}, headers=auth["admin"]).status_code == 422
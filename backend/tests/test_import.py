@@ -0,0 +1,86 @@
+"""
+Importación masiva de tickets (JSON, CSV y NDJSON): inserción por bloques, errores por fila sin
+detener la carga y tickets importados completos (categoría, SLA, búsqueda y rollup).
+"""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select
+
+from app.models.stats import TicketDailyStats
+from app.services import ticket_import
+from app.services.rollup import rebuild
+
+TICKETS = "/api/v1/tickets/"
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(ticket_import, "IMPORT_CHUNK", 2)
+
+
+def _rollup(db) -> list[tuple]:
+    t = TicketDailyStats.__table__
+    return [tuple(r) for r in db.execute(select(t).order_by(*t.primary_key.columns)).all()]
+
+
+def test_json_import_reports_errors_per_row(client, auth, db):
+    payload = [
+        {"title": "Importado wifi planta 1"},
+        {"description": "sin título"},
+        {"title": "Importado impresora", "priority": "high", "assignee_id": 4},
+        {"title": "Asignado a nadie", "assignee_id": 999999},
+        {"title": "Importado último"},
+    ]
+    r = client.post(TICKETS + "import", json=payload, headers=auth["admin"])
+    assert r.status_code == 200, r.text
+    result = r.json()
+    assert (result["created"], result["failed"]) == (3, 2)
+    assert [e["row"] for e in result["errors"]] == [2, 4]
+    assert "title" in result["errors"][0]["detail"]
+    assert "assignee_id" in result["errors"][1]["detail"]
+
+    found = client.get(TICKETS, params={"q": "importado impresora"}, headers=auth["admin"]).json()
+    assert len(found) == 1
+    ticket = client.get(f"{TICKETS}{found[0]['id']}", headers=auth["admin"]).json()
+    assert ticket["category"] == "hardware"
+    assert ticket["assignee_id"] == 4
+    assert ticket["sla_state"] == "ok" and ticket["resolve_due_at"] is not None
+
+    incremental = _rollup(db)
+    rebuild(db)
+    assert _rollup(db) == incremental
+    db.rollback()
+
+
+def test_csv_file_import(client, auth):
+    content = "title,description,priority\nCSV uno,,low\nCSV dos,Detalle,urgent\n,Sin título,\nCSV tres,,\n"
+    r = client.post(
+        TICKETS + "import/file",
+        files={"file": ("tickets.csv", content.encode(), "text/csv")},
+        headers=auth["admin"],
+    )
+    assert r.status_code == 200, r.text
+    assert (r.json()["created"], r.json()["failed"]) == (3, 1)
+    assert r.json()["errors"][0]["row"] == 4  # la fila 1 es la cabecera
+
+    listed = {t["title"]: t for t in client.get(TICKETS, params={"limit": 200}, headers=auth["admin"]).json()}
+    assert listed["CSV dos"]["priority"] == "urgent"
+    assert listed["CSV tres"]["priority"] == "normal"
+
+
+def test_ndjson_file_import(client, auth):
+    content = '{"title": "NDJSON uno"}\n\n{no es json}\n{"title": "NDJSON dos"}\n'
+    r = client.post(
+        TICKETS + "import/file",
+        files={"file": ("tickets.ndjson", content.encode(), "application/x-ndjson")},
+        headers=auth["admin"],
+    )
+    assert r.status_code == 200, r.text
+    assert (r.json()["created"], r.json()["failed"]) == (2, 1)
+    assert r.json()["errors"][0]["row"] == 3
+
+
+def test_import_requires_staff(client, auth):
+    r = client.post(TICKETS + "import", json=[{"title": "x"}], headers=auth["user"])
+    assert r.status_code == 403
@@ -0,0 +1,124 @@
+"""
+Throttling del login: token buckets (memoria y BD) que se rellenan con el tiempo y rechazan los
+intentos de más con 429 antes de consultar la BD o ejecutar bcrypt.
+"""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.endpoints import auth as auth_endpoint
+from app.core import rate_limit
+from app.core.rate_limit import BucketPolicy, DatabaseBackend, LoginThrottle, MemoryBackend
+from app.models.rate_limit import RateLimitBucket
+
+POLICY = BucketPolicy(capacity=3, refill_per_sec=1.0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def bucket_engine():
+    eng = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    RateLimitBucket.__table__.create(eng)
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture(params=["memory", "database"])
+def backend(request, bucket_engine):
+    return MemoryBackend() if request.param == "memory" else DatabaseBackend(bucket_engine)
+
+
+def test_burst_then_refill(backend, clock):
+    assert [backend.take("k", POLICY) for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = backend.take("k", POLICY)
+    assert 0 < wait <= 2.0
+    assert backend.take("otra", POLICY) == 0.0  # buckets independientes por clave
+
+    # Reintentar justo tras la espera indicada (Retry-After) se permite
+    clock.now += wait
+    assert backend.take("k", POLICY) == 0.0
+    assert backend.take("k", POLICY) > 0
+
+    # Tras mucho tiempo el bucket sólo se rellena hasta su capacidad
+    clock.now += 3600
+    assert [backend.take("k", POLICY) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert backend.take("k", POLICY) > 0
+
+
+def test_rejections_do_not_accumulate_debt(backend, clock):
+    for _ in range(3):
+        backend.take("k", POLICY)
+    waits = [backend.take("k", POLICY) for _ in range(50)]
+    assert max(waits) <= 2.0  # como mucho un token de deuda (tokens >= -1)
+    clock.now += 2.0
+    assert backend.take("k", POLICY) == 0.0
+
+
+def test_database_backend_prunes_refilled_buckets(bucket_engine, clock):
+    backend = DatabaseBackend(bucket_engine)
+    backend.take("vieja", POLICY)
+    clock.now += backend.PRUNE_INTERVAL_SECONDS + 60
+    backend.take("nueva", POLICY)  # dispara la poda: "vieja" lleva más que el horizonte sin uso
+
+    with bucket_engine.connect() as conn:
+        keys = set(conn.execute(select(RateLimitBucket.__table__.c.key)).scalars())
+    assert keys == {"nueva"}
+
+
+def test_throttle_per_ip_and_account(clock):
+    throttle = LoginThrottle(MemoryBackend(), per_ip=BucketPolicy(4, 1.0), per_account=BucketPolicy(2, 1.0))
+    assert throttle.check("1.1.1.1", "a@example.com") == 0
+    assert throttle.check("1.1.1.1", "A@Example.com ") == 0  # misma cuenta normalizada
+    assert throttle.check("1.1.1.1", "a@example.com") > 0
+    assert throttle.check("1.1.1.1", "b@example.com") == 0
+    assert throttle.check("1.1.1.1", "c@example.com") > 0  # la IP ya gastó su ráfaga
+    assert throttle.check("2.2.2.2", "c@example.com") == 0
+    assert throttle.metrics() == {
+        "backend": "MemoryBackend",
+        "allowed": 4,
+        "rejected_ip": 1,
+        "rejected_account": 1,
+    }
+
+
+def test_login_lockout_skips_bcrypt(client, auth, monkeypatch):
+    monkeypatch.setattr(rate_limit.login_throttle, "backend", MemoryBackend())
+    calls = []
+    verify = auth_endpoint.verify_and_update_password
+
+    async def counting_verify(plain, hashed):
+        calls.append(plain)
+        return await verify(plain, hashed)
+
+    monkeypatch.setattr(auth_endpoint, "verify_and_update_password", counting_verify)
+    credentials = {"email": "tech.global@acme.local", "password": "incorrecta"}
+    burst = rate_limit.login_throttle.per_account.capacity
+
+    for _ in range(int(burst)):
+        assert client.post("/api/v1/auth/login", json=credentials).status_code == 401
+    r = client.post("/api/v1/auth/login", json={**credentials, "password": "tech123"})
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) >= 1
+    assert len(calls) == burst  # el intento rechazado no llegó a bcrypt
+
+    metrics = client.get("/api/v1/system/login-throttle", headers=auth["admin"]).json()
+    assert metrics["rejected_account"] >= 1
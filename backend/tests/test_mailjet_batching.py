@@ -0,0 +1,82 @@
+"""
+Envío por lotes a Mailjet contra un servidor local que imita la Send API v3.1: los mensajes viajan
+en llamadas de hasta MAILJET_BATCH por la misma conexión keep-alive y, cuando Mailjet responde
+400 con el estado de cada mensaje, sólo se marcan como fallidos los rechazados.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.config import settings
+from app.services import email
+
+CFG = {"mailjet_key": "key", "mailjet_secret": "secret", "from_email": "from@serviceflow.local"}
+
+
+class MockMailjet(BaseHTTPRequestHandler):
+    """Rechaza los destinatarios que contienen "bad"; responde 400 si algún mensaje falla."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.calls.append((self.client_address, [m["To"][0]["Email"] for m in payload["Messages"]]))
+        statuses = [
+            {"Status": "error", "Errors": [{"ErrorMessage": "invalid recipient"}]}
+            if "bad" in m["To"][0]["Email"]
+            else {"Status": "success"}
+            for m in payload["Messages"]
+        ]
+        data = json.dumps({"Messages": statuses}).encode()
+        self.send_response(400 if any(s["Status"] == "error" for s in statuses) else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mailjet(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockMailjet)
+    server.calls = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(settings, "MAILJET_API_URL", f"http://127.0.0.1:{server.server_port}/v3.1/send")
+    monkeypatch.setattr(email, "_mailjet_session", None)
+    yield server
+    if email._mailjet_session is not None:
+        email._mailjet_session.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_batches_of_50_over_one_connection(mailjet):
+    messages = [(f"user{i}@example.com", "asunto", "cuerpo") for i in range(120)]
+
+    assert email._send_many_mailjet(CFG, messages) == [True] * 120
+    assert [len(to) for _, to in mailjet.calls] == [50, 50, 20]
+    assert [to for _, batch in mailjet.calls for to in batch] == [m[0] for m in messages]
+    assert len({client for client, _ in mailjet.calls}) == 1
+
+
+def test_partial_failure_maps_per_message(mailjet):
+    messages = [(f"bad{i}@example.com" if i % 37 == 0 else f"user{i}@example.com", "asunto", "cuerpo") for i in range(120)]
+
+    results = email._send_many_mailjet(CFG, messages)
+
+    assert [i for i, ok in enumerate(results) if not ok] == [0, 37, 74, 111]
+    assert len(mailjet.calls) == 3
+
+
+def test_unreachable_api_fails_whole_batch(mailjet):
+    mailjet.shutdown()
+    mailjet.server_close()
+
+    assert email._send_many_mailjet(CFG, [("user@example.com", "asunto", "cuerpo")] * 3) == [False] * 3
@@ -0,0 +1,116 @@
+"""
+Notificaciones de comentarios: se agrupan por (destinatario, ticket) durante NOTIFY_COALESCE_SECONDS
+y flush_due funde cada grupo en un único email del outbox; los usuarios con resumen horario/diario
+reciben un solo email por periodo con todos sus tickets.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.models.notification import PendingNotification
+from app.models.outbox import EmailOutbox
+from app.services import notifications
+
+TICKETS = "/api/v1/tickets/"
+REQUESTER_ID = 6  # user@acme.local en el seed
+PENDING, OUTBOX = PendingNotification.__table__, EmailOutbox.__table__
+
+
+@pytest.fixture
+def db(db):
+    db.execute(delete(PENDING))
+    db.execute(delete(OUTBOX))
+    db.commit()
+    return db
+
+
+def _ticket(client, auth, title: str) -> int:
+    r = client.post(TICKETS, json={"title": title}, headers=auth["user"])
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+
+def _comment(client, auth, ticket_id: int, body: str, is_public: bool = True) -> None:
+    r = client.post(f"{TICKETS}{ticket_id}/comments", json={"body": body, "is_public": is_public}, headers=auth["tech"])
+    assert r.status_code == 200, r.text
+
+
+def _emails(db) -> list:
+    return db.execute(select(OUTBOX.c.to_email, OUTBOX.c.subject, OUTBOX.c.body).order_by(OUTBOX.c.id)).all()
+
+
+def _pending(db) -> list:
+    return db.execute(select(PENDING.c.group_key, PENDING.c.deliver_after)).all()
+
+
+def test_chatty_ticket_sends_one_email(client, auth, db):
+    ticket_id = _ticket(client, auth, "Caída del servidor de ficheros")
+    for i in range(5):
+        _comment(client, auth, ticket_id, f"Actualización {i}")
+    _comment(client, auth, ticket_id, "Nota interna", is_public=False)
+
+    pending = _pending(db)
+    assert len(pending) == 5
+    assert {p.group_key for p in pending} == {f"user@acme.local|{ticket_id}"}
+    assert _emails(db) == []
+
+    first_due = min(p.deliver_after for p in pending)
+    assert notifications.flush_due(db, now=first_due - timedelta(seconds=1)) == 0
+    assert notifications.flush_due(db, now=first_due) == 1
+
+    (email,) = _emails(db)
+    assert email.to_email == "user@acme.local"
+    assert email.subject == f"Nueva actividad en tu ticket #{ticket_id}"
+    assert "Hay 5 comentarios nuevos" in email.body
+    assert all(f"Actualización {i}" in email.body for i in range(5))
+    assert "Nota interna" not in email.body
+    assert _pending(db) == []
+
+
+def test_daily_digest_merges_tickets(client, auth, db):
+    r = client.patch(f"/api/v1/users/{REQUESTER_ID}", json={"email_digest": "daily"}, headers=auth["user"])
+    assert r.status_code == 200, r.text
+    try:
+        first, second = _ticket(client, auth, "Teclado roto"), _ticket(client, auth, "Ratón roto")
+        _comment(client, auth, first, "Pedido teclado nuevo")
+        _comment(client, auth, second, "Pedido ratón nuevo")
+        _comment(client, auth, first, "Teclado entregado")
+
+        pending = _pending(db)
+        assert {p.group_key for p in pending} == {"user@acme.local|daily"}
+        due = pending[0].deliver_after
+        assert (due.hour, due.minute) == (settings.NOTIFY_DAILY_DIGEST_HOUR, 0)
+
+        assert notifications.flush_due(db, now=due - timedelta(minutes=1)) == 0
+        assert notifications.flush_due(db, now=due) == 1
+        (email,) = _emails(db)
+        assert email.subject == "Resumen de actividad: 3 comentarios en 2 tickets"
+        assert email.body.index(f"Ticket #{first}") < email.body.index(f"Ticket #{second}")
+    finally:
+        client.patch(f"/api/v1/users/{REQUESTER_ID}", json={"email_digest": "immediate"}, headers=auth["user"])
+
+
+def test_invalid_digest_mode(client, auth):
+    r = client.patch(f"/api/v1/users/{REQUESTER_ID}", json={"email_digest": "weekly"}, headers=auth["user"])
+    assert r.status_code == 422
+
+
+def test_no_window_enqueues_directly(client, auth, db, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFY_COALESCE_SECONDS", 0)
+    ticket_id = _ticket(client, auth, "Sin agrupar")
+    _comment(client, auth, ticket_id, "Respuesta inmediata")
+    assert _pending(db) == []
+    assert [e.subject for e in _emails(db)] == [f"Nueva actividad en tu ticket #{ticket_id}"]
+
+
+def test_deliver_after():
+    now = datetime(2026, 10, 18, 10, 15, 30)
+    assert notifications.deliver_after("immediate", now) == now + timedelta(seconds=settings.NOTIFY_COALESCE_SECONDS)
+    assert notifications.deliver_after("hourly", now) == datetime(2026, 10, 18, 11, 0)
+    hour = settings.NOTIFY_DAILY_DIGEST_HOUR
+    assert notifications.deliver_after("daily", datetime(2026, 10, 18, hour - 1, 59)) == datetime(2026, 10, 18, hour)
+    assert notifications.deliver_after("daily", datetime(2026, 10, 18, hour, 0)) == datetime(2026, 10, 19, hour)
@@ -0,0 +1,141 @@
+"""
+Outbox de emails: reclamación por lotes con lease, reintentos con backoff exponencial y paso a
+'failed' al agotar los intentos.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.core.config import settings
+from app.models.outbox import EmailOutbox
+from app.services import outbox
+
+T = EmailOutbox.__table__
+
+
+@pytest.fixture
+def db(db):
+    db.execute(delete(T))
+    db.commit()
+    return db
+
+
+def _enqueue(db, n: int, start: datetime | None = None) -> list[int]:
+    rows = [outbox.enqueue_email(db, f"dest{i}@example.com", f"Asunto {i}", "Cuerpo") for i in range(n)]
+    db.flush()
+    if start is not None:
+        # Vencimientos escalonados: el orden de reclamación es determinista
+        for i, row in enumerate(rows):
+            row.next_attempt_at = start + timedelta(seconds=i)
+    db.commit()
+    return [r.id for r in rows]
+
+
+def _state(db) -> dict[int, tuple]:
+    db.expire_all()
+    return {r.id: r for r in db.execute(select(T)).all()}
+
+
+def test_enqueue_follows_caller_transaction(db):
+    outbox.enqueue_email(db, "a@example.com", "s", "b")
+    db.rollback()
+    assert _state(db) == {}
+    _enqueue(db, 1)
+    assert [r.status for r in _state(db).values()] == ["pending"]
+
+
+def test_claim_leases_rows(db):
+    start = datetime.utcnow() - timedelta(minutes=1)
+    ids = _enqueue(db, 3, start)
+    now = datetime.utcnow()
+
+    claimed = outbox.claim_batch(db, 2, now=now)
+    assert [r.id for r in claimed] == ids[:2]
+    state = _state(db)
+    for row_id in ids[:2]:
+        assert state[row_id].status == "sending"
+        assert state[row_id].attempts == 1
+        assert state[row_id].next_attempt_at == now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+    assert state[ids[2]].status == "pending"
+
+    # Otro worker no vuelve a reclamar los que tienen lease vigente
+    assert [r.id for r in outbox.claim_batch(db, 10, now=now)] == ids[2:]
+    assert outbox.claim_batch(db, 10, now=now) == []
+
+    # Si el worker muere, al vencer el lease se recuperan
+    later = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS + 1)
+    reclaimed = outbox.claim_batch(db, 10, now=later)
+    assert sorted(r.id for r in reclaimed) == ids
+    assert {r.attempts for r in _state(db).values()} == {2}
+
+
+def test_process_records_sent_and_retries(db):
+    ids = _enqueue(db, 3, datetime.utcnow() - timedelta(minutes=1))
+    batches = []
+
+    def send(messages, session):
+        batches.append([to for to, _, _ in messages])
+        return [True, False, True]
+
+    before = datetime.utcnow()
+    assert outbox.process_batch(db, send=send) == 3
+    assert len(batches) == 1  # un único envío para todo el lote
+
+    state = _state(db)
+    assert [state[i].status for i in ids] == ["sent", "pending", "sent"]
+    assert state[ids[0]].sent_at is not None
+    retry = state[ids[1]]
+    assert retry.attempts == 1
+    assert retry.last_error
+    base = settings.EMAIL_OUTBOX_BACKOFF_SECONDS
+    assert before + timedelta(seconds=base * 0.5) <= retry.next_attempt_at
+    assert retry.next_attempt_at <= datetime.utcnow() + timedelta(seconds=base)
+
+    # Aún no vence: el siguiente lote no lo reintenta
+    assert outbox.process_batch(db, send=send) == 0
+
+
+def test_exhausted_attempts_fail(db, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 2)
+    (row_id,) = _enqueue(db, 1, datetime.utcnow() - timedelta(minutes=1))
+
+    def boom(messages, session):
+        raise ConnectionError("smtp down")
+
+    for _ in range(2):
+        assert outbox.process_batch(db, send=boom) == 1
+        db.execute(update(T).where(T.c.id == row_id).values(next_attempt_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.commit()
+    row = _state(db)[row_id]
+    assert row.status == "failed"
+    assert row.attempts == 2
+    assert "smtp down" in row.last_error
+    assert outbox.process_batch(db, send=boom) == 0
+
+
+def test_late_result_does_not_override_new_owner(db):
+    (row_id,) = _enqueue(db, 1, datetime.utcnow() - timedelta(minutes=1))
+    outbox.claim_batch(db, 1)
+    # Otro worker lo recuperó tras vencer el lease y ya lo envió
+    db.execute(update(T).where(T.c.id == row_id).values(status="sent", sent_at=datetime.utcnow()))
+    db.commit()
+
+    outbox._record_results(db, [], [(row_id, 1, "timeout")])
+    assert _state(db)[row_id].status == "sent"
+
+
+def test_backoff_grows_and_is_capped():
+    base, cap = settings.EMAIL_OUTBOX_BACKOFF_SECONDS, settings.EMAIL_OUTBOX_BACKOFF_MAX_SECONDS
+    for attempts in (1, 2, 3):
+        delay = outbox.backoff_seconds(attempts)
+        assert base * 2 ** (attempts - 1) * 0.5 <= delay <= base * 2 ** (attempts - 1)
+    assert outbox.backoff_seconds(50) <= cap
+
+
+def test_default_batch_size_read_at_call_time(db, monkeypatch):
+    _enqueue(db, 3, datetime.utcnow() - timedelta(minutes=1))
+    monkeypatch.setattr(settings, "EMAIL_OUTBOX_BATCH", 2)
+    assert outbox.process_batch(db, send=lambda messages, session: [True] * len(messages)) == 2
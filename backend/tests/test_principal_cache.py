@@ -0,0 +1,105 @@
+"""
+Caché de identidad (principal_cache) y de JWT verificados (token_cache) en get_current_user:
+sin consultas a la BD en régimen estable e invalidación al editar o borrar el usuario.
+"""
+from __future__ import annotations
+
+import itertools
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.core.principal_cache import PrincipalCache, invalidate_principal, principal_cache
+from app.core.token_cache import token_cache
+from app.db.session import engine
+from app.models.user import User
+from conftest import login
+
+ME = "/api/v1/auth/me"
+_members = itertools.count()
+
+
+@contextmanager
+def count_queries():
+    statements: list[str] = []
+
+    def before(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+
+
+@pytest.fixture
+def member(client, auth):
+    """Técnico nuevo con su propia sesión iniciada."""
+    email = f"tech-cache-{next(_members)}@example.com"
+    r = client.post(
+        "/api/v1/users/",
+        json={"email": email, "password": "secreto123", "role": "tech", "company_id": 1},
+        headers=auth["superadmin"],
+    )
+    assert r.status_code == 200, r.text
+    return r.json()["id"], login(client, email, "secreto123")
+
+
+def test_steady_state_needs_no_queries(client, member):
+    user_id, headers = member
+    assert client.get(ME, headers=headers).status_code == 200
+    assert principal_cache.get(user_id) is not None
+    assert token_cache.get(headers["Authorization"].split(" ", 1)[1]) is not None
+
+    with count_queries() as statements:
+        for _ in range(5):
+            assert client.get(ME, headers=headers).status_code == 200
+    assert statements == []
+
+
+def test_update_user_invalidates(client, auth, member):
+    user_id, headers = member
+    client.get(ME, headers=headers)
+
+    r = client.patch(f"/api/v1/users/{user_id}", json={"full_name": "Nombre nuevo"}, headers=auth["superadmin"])
+    assert r.status_code == 200, r.text
+    assert principal_cache.get(user_id) is None
+    assert client.get(ME, headers=headers).json()["full_name"] == "Nombre nuevo"
+
+    r = client.patch(f"/api/v1/users/{user_id}", json={"is_active": False}, headers=auth["superadmin"])
+    assert r.status_code == 200, r.text
+    assert client.get(ME, headers=headers).status_code == 401
+
+
+def test_delete_user_invalidates(client, auth, member):
+    user_id, headers = member
+    assert client.get(ME, headers=headers).status_code == 200
+
+    r = client.delete(f"/api/v1/users/{user_id}", headers=auth["superadmin"])
+    assert r.status_code == 200, r.text
+    assert principal_cache.get(user_id) is None
+    assert client.get(ME, headers=headers).status_code == 401
+
+
+def test_rollback_keeps_entry(client, member, db):
+    user_id, headers = member
+    client.get(ME, headers=headers)
+    assert principal_cache.get(user_id) is not None
+
+    invalidate_principal(db, user_id)
+    assert principal_cache.get(user_id) is not None  # hasta el commit no se invalida
+    db.rollback()
+    assert principal_cache.get(user_id) is not None
+
+
+def test_stale_load_is_not_stored():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    user = User(id=1, email="a@example.com", role="user", company_id=1, is_active=True)
+    version = cache.version  # lectura de la BD empieza aquí...
+    cache.invalidate(1)  # ...y otra petición confirma un cambio antes de guardarla
+    cache.put(user, version)
+    assert cache.get(1) is None
+    cache.put(user, cache.version)
+    assert cache.get(1).email == "a@example.com"
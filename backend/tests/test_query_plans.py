@@ -0,0 +1,159 @@
+"""
+Regresión de planes: aplica las migraciones sobre la BD de DATABASE_URL, siembra datos y comprueba
+con EXPLAIN que las consultas calientes de tickets.py, stats.py y dashboard.py usan sus índices en
+lugar de recorrer la tabla entera (SQLite por defecto; Postgres si DATABASE_URL apunta a uno).
+"""
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, insert, text
+
+from app.core.config import settings
+from conftest import reset_database
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+TICKETS = 5000
+COMPANIES = 5
+
+# (consulta, parámetros, índices aceptables)
+HOT_QUERIES = {
+    "list_by_company": (
+        "SELECT id FROM tickets WHERE company_id = :company ORDER BY created_at DESC, id DESC LIMIT 50",
+        {"company": 1},
+        {"ix_tickets_company_created_id"},
+    ),
+    "list_by_status": (
+        "SELECT id FROM tickets WHERE company_id = :company AND status = :status ORDER BY created_at DESC LIMIT 50",
+        {"company": 1, "status": "open"},
+        {"ix_tickets_company_status_created"},
+    ),
+    "list_by_priority": (
+        "SELECT id FROM tickets WHERE company_id = :company AND priority = :priority ORDER BY created_at DESC LIMIT 50",
+        {"company": 1, "priority": "high"},
+        {"ix_tickets_company_priority_created"},
+    ),
+    "list_by_assignee": (
+        "SELECT id FROM tickets WHERE company_id = :company AND assignee_id = :assignee ORDER BY created_at DESC LIMIT 50",
+        {"company": 1, "assignee": 3},
+        {"ix_tickets_company_assignee_created"},
+    ),
+    "unassigned_urgent": (
+        "SELECT count(id) FROM tickets WHERE company_id = :company AND priority = 'urgent' "
+        "AND assignee_id IS NULL AND status <> 'closed'",
+        {"company": 1},
+        {"ix_tickets_unassigned_open", "ix_tickets_company_assignee_created"},
+    ),
+    "active_worklog": (
+        "SELECT id FROM worklogs WHERE user_id = :user AND ticket_id = :ticket AND ended_at IS NULL",
+        {"user": 3, "ticket": 10},
+        {"ix_worklogs_active_user_ticket"},
+    ),
+    "ticket_comments": (
+        "SELECT id FROM comments WHERE ticket_id = :ticket ORDER BY created_at DESC",
+        {"ticket": 10},
+        {"ix_comments_ticket_created"},
+    ),
+    "tech_directory": (
+        "SELECT id FROM users WHERE company_id = :company AND role = 'tech'",
+        {"company": 1},
+        {"ix_users_company_role"},
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def engine():
+    from app.db.session import engine as app_engine
+
+    url = settings.DATABASE_URL
+    reset_database(app_engine)
+    cfg = Config(str(BACKEND / "alembic.ini"))
+    cfg.set_main_option("script_location", str(BACKEND / "alembic"))
+    command.upgrade(cfg, "head")
+
+    from app.models.company import Company
+    from app.models.ticket import Comment, Ticket, Worklog
+    from app.models.user import User
+
+    eng = create_engine(url)
+    rnd = random.Random(7)
+    now = datetime.utcnow()
+    with eng.begin() as conn:
+        conn.execute(insert(Company.__table__), [{"id": c, "name": f"Company {c}"} for c in range(1, COMPANIES + 1)])
+        conn.execute(
+            insert(User.__table__),
+            [
+                {
+                    "id": u,
+                    "email": f"u{u}@test.local",
+                    "hashed_password": "x",
+                    "role": rnd.choice(["user", "user", "tech", "admin"]),
+                    "company_id": u % COMPANIES + 1,
+                    "is_active": u % 10 != 0,
+                }
+                for u in range(1, 201)
+            ],
+        )
+        conn.execute(
+            insert(Ticket.__table__),
+            [
+                {
+                    "id": t,
+                    "title": f"Ticket {t}",
+                    "status": rnd.choice(["open", "in_progress", "closed", "closed"]),
+                    "priority": rnd.choice(["low", "normal", "high", "urgent"]),
+                    "requester_id": rnd.randint(1, 200),
+                    "assignee_id": rnd.choice([None, rnd.randint(1, 200)]),
+                    "company_id": t % COMPANIES + 1,
+                    "created_at": now - timedelta(minutes=t),
+                    "updated_at": now,
+                }
+                for t in range(1, TICKETS + 1)
+            ],
+        )
+        conn.execute(
+            insert(Comment.__table__),
+            [{"ticket_id": rnd.randint(1, TICKETS), "user_id": rnd.randint(1, 200), "body": "x"} for _ in range(5000)],
+        )
+        conn.execute(
+            insert(Worklog.__table__),
+            [
+                {
+                    "ticket_id": rnd.randint(1, TICKETS),
+                    "user_id": rnd.randint(1, 200),
+                    "ended_at": None if i % 20 == 0 else now,
+                }
+                for i in range(5000)
+            ],
+        )
+        conn.execute(text("ANALYZE"))
+    yield eng
+    eng.dispose()
+
+
+def _plan(conn, sql: str, params: dict) -> str:
+    if conn.dialect.name == "sqlite":
+        return "\n".join(r[-1] for r in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params))
+    # Con pocas filas Postgres puede preferir un Seq Scan legítimo: se penaliza para ver si hay índice usable
+    conn.execute(text("SET LOCAL enable_seqscan = off"))
+    return "\n".join(r[0] for r in conn.execute(text(f"EXPLAIN {sql}"), params))
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(engine, name):
+    sql, params, indexes = HOT_QUERIES[name]
+    with engine.begin() as conn:
+        plan = _plan(conn, sql, params)
+    assert any(ix in plan for ix in indexes), f"{name} no usa {indexes}:\n{plan}"
+    # SQLite: "SCAN <tabla>" sin índice; Postgres: "Seq Scan"
+    assert "Seq Scan" not in plan, plan
+    assert not any(
+        line.strip().startswith("SCAN") and "USING" not in line for line in plan.splitlines()
+    ), f"{name} recorre la tabla:\n{plan}"
@@ -0,0 +1,81 @@
+"""
+Rollup ticket_daily_stats: los deltas aplicados por cada escritura de tickets deben dejar la tabla
+igual que un rebuild() desde cero, sin filas a cero, y una empresa sin tickets debe poder borrarse.
+"""
+from __future__ import annotations
+
+from sqlalchemy import select
+
+from app.models.stats import TicketDailyStats
+from app.services.rollup import rebuild
+
+TICKETS = "/api/v1/tickets/"
+
+
+def _rollup(db, company_id: int | None = None) -> list[tuple]:
+    t = TicketDailyStats.__table__
+    q = select(t).order_by(*t.primary_key.columns)
+    if company_id is not None:
+        q = q.where(t.c.company_id == company_id)
+    return [
+        (r.company_id, str(r.day), r.status, r.priority, r.assignee_id, r.created, r.resolved,
+         round(r.resolution_minutes, 3), r.time_spent_minutes)
+        for r in db.execute(q).all()
+    ]
+
+
+def _create(client, headers, **payload) -> int:
+    r = client.post(TICKETS, json={"title": "Ticket de rollup", **payload}, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+
+def test_deltas_match_rebuild(client, auth, db):
+    ids = [_create(client, auth["user"], priority=p) for p in ("low", "normal", "high", "urgent", "normal")]
+
+    r = client.patch(f"{TICKETS}{ids[0]}", json={"status": "in_progress", "priority": "high"}, headers=auth["tech"])
+    assert r.status_code == 200, r.text
+    r = client.patch(f"{TICKETS}{ids[1]}", json={"assignee_id": 4}, headers=auth["admin"])
+    assert r.status_code == 200, r.text
+    r = client.post(
+        f"{TICKETS}{ids[2]}/resolve",
+        json={"resolution_summary": "Cambiado el cable", "time_spent_hhmm": "01:30"},
+        headers=auth["tech"],
+    )
+    assert r.status_code == 200, r.text
+    r = client.post(TICKETS + "bulk", json={"ids": ids[3:], "update": {"status": "in_progress"}}, headers=auth["admin"])
+    assert r.status_code == 200, r.text
+    r = client.delete(f"{TICKETS}{ids[4]}", headers=auth["admin"])
+    assert r.status_code == 200, r.text
+
+    incremental = _rollup(db)
+    assert incremental and all(row[5] or row[6] for row in incremental)  # sin filas a cero
+
+    rebuild(db)
+    assert _rollup(db) == incremental
+    db.rollback()
+
+
+def test_delete_tickets_then_company(client, auth, db):
+    sa = auth["superadmin"]
+    r = client.post("/api/v1/companies/", json={"name": "Initech"}, headers=sa)
+    assert r.status_code == 200, r.text
+    company_id = r.json()["id"]
+    scoped = {**sa, "X-Company-Id": str(company_id)}
+
+    ids = [_create(client, scoped, priority="high") for _ in range(2)]
+    r = client.post(
+        f"{TICKETS}{ids[0]}/resolve",
+        json={"resolution_summary": "Reiniciado", "time_spent_hhmm": "00:10"},
+        headers=scoped,
+    )
+    assert r.status_code == 200, r.text
+    assert _rollup(db, company_id)
+
+    for ticket_id in ids:
+        assert client.delete(f"{TICKETS}{ticket_id}", headers=scoped).status_code == 200
+    assert _rollup(db, company_id) == []
+
+    r = client.delete(f"/api/v1/companies/{company_id}", headers=sa)
+    assert r.status_code == 200, r.text
+    assert _rollup(db, company_id) == []
@@ -0,0 +1,64 @@
+"""
+Búsqueda de texto completo en GET /tickets?q=: prefijos, sin acentos, AND entre términos,
+comentarios públicos indexados y orden por relevancia (título antes que descripción).
+"""
+from __future__ import annotations
+
+from conftest import login
+
+TICKETS = "/api/v1/tickets/"
+
+
+def _create(client, auth, title: str, description: str | None = None) -> int:
+    r = client.post(TICKETS, json={"title": title, "description": description}, headers=auth["user"])
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+
+def _search(client, auth, q: str, role: str = "admin") -> list[int]:
+    r = client.get(TICKETS, params={"q": q, "limit": 200}, headers=auth[role])
+    assert r.status_code == 200, r.text
+    return [t["id"] for t in r.json()]
+
+
+def test_prefix_and_accent_insensitive(client, auth):
+    ticket_id = _create(client, auth, "Impresión borrosa en recepción")
+    assert ticket_id in _search(client, auth, "impresion")
+    assert ticket_id in _search(client, auth, "IMPRE")
+    assert ticket_id in _search(client, auth, "recepcion borr")
+
+
+def test_terms_are_anded(client, auth):
+    both = _create(client, auth, "Plotter cian atascado")
+    one = _create(client, auth, "Plotter magenta atascado")
+    found = _search(client, auth, "plotter cian")
+    assert both in found and one not in found
+
+
+def test_public_comments_are_indexed(client, auth):
+    ticket_id = _create(client, auth, "Consulta general")
+    for body, is_public in (("El proveedor zafiro confirma", True), ("Nota interna esmeralda", False)):
+        r = client.post(
+            f"{TICKETS}{ticket_id}/comments", json={"body": body, "is_public": is_public}, headers=auth["tech"]
+        )
+        assert r.status_code == 200, r.text
+    assert ticket_id in _search(client, auth, "zafiro")
+    assert ticket_id not in _search(client, auth, "esmeralda")
+
+
+def test_title_ranks_above_description(client, auth):
+    in_description = _create(client, auth, "Incidencia", "Falla el cortafuegos de la sede")
+    in_title = _create(client, auth, "Cortafuegos caído")
+    found = _search(client, auth, "cortafuegos")
+    assert found.index(in_title) < found.index(in_description)
+
+
+def test_deleted_and_out_of_scope_tickets(client, auth):
+    ticket_id = _create(client, auth, "Licencia turquesa caducada")
+    assert ticket_id in _search(client, auth, "turquesa")
+    assert _search(client, auth, "turquesa", role="user") == [ticket_id]
+    globex = login(client, "user@globex.local", "user123")
+    assert client.get(TICKETS, params={"q": "turquesa"}, headers=globex).json() == []
+
+    assert client.delete(f"{TICKETS}{ticket_id}", headers=auth["admin"]).status_code == 200
+    assert _search(client, auth, "turquesa") == []
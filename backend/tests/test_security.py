@@ -0,0 +1,65 @@
+"""
+Hashes de contraseña: todas las operaciones bcrypt pasan por el pool acotado _hash_executor, también
+las síncronas de alta/edición de usuarios.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core import security
+from app.core.config import settings
+
+
+class _RecordingHash:
+    def __init__(self):
+        self.threads: set[str] = set()
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, plain: str) -> str:
+        with self._lock:
+            self.threads.add(threading.current_thread().name)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        return f"hashed:{plain}"
+
+
+def test_hashing_concurrency_is_bounded(monkeypatch):
+    recorder = _RecordingHash()
+    monkeypatch.setattr(security.pwd_context, "hash", recorder)
+
+    with ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS * 4) as callers:
+        hashes = list(callers.map(security.get_password_hash, [f"pw{i}" for i in range(40)]))
+
+    assert hashes == [f"hashed:pw{i}" for i in range(40)]
+    assert recorder.peak <= settings.PASSWORD_HASH_WORKERS
+    assert all(name.startswith("pwd-hash") for name in recorder.threads)
+
+
+def test_user_endpoints_hash_on_executor(client, auth, monkeypatch):
+    recorder = _RecordingHash()
+    monkeypatch.setattr(security.pwd_context, "hash", recorder)
+
+    r = client.post(
+        "/api/v1/users/",
+        json={"email": "nuevo.tech@example.com", "password": "secreto123", "role": "tech", "company_id": 1},
+        headers=auth["admin"],
+    )
+    assert r.status_code == 200, r.text
+    r = client.patch(f"/api/v1/users/{r.json()['id']}", json={"password": "otro-secreto"}, headers=auth["admin"])
+    assert r.status_code == 200, r.text
+
+    assert len(recorder.threads) >= 1
+    assert all(name.startswith("pwd-hash") for name in recorder.threads)
+
+
+def test_verify_roundtrip():
+    hashed = security.get_password_hash("s3creto")
+    assert security.verify_password("s3creto", hashed)
+    assert not security.verify_password("otro", hashed)
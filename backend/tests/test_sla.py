@@ -0,0 +1,66 @@
+"""
+SLA: el escáner y el recálculo por cambio de política reescriben sla_state y vencimientos sin tocar
+updated_at; los ETag de GET /tickets y GET /tickets/{id} deben cambiar igualmente.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from app.models.ticket import Ticket
+from app.services import sla
+
+TICKETS = "/api/v1/tickets/"
+
+
+def _create_ticket(client, auth, priority: str = "normal") -> dict:
+    r = client.post(TICKETS, json={"title": "VPN no conecta", "priority": priority}, headers=auth["user"])
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _get(client, url: str, headers: dict, etag: str | None = None):
+    return client.get(url, headers={**headers, **({"If-None-Match": etag} if etag else {})})
+
+
+def test_scan_changes_list_and_detail_etags(client, auth, db):
+    ticket = _create_ticket(client, auth)
+    detail_url = f"{TICKETS}{ticket['id']}"
+    headers = auth["admin"]
+
+    listed = _get(client, TICKETS, headers)
+    detail = _get(client, detail_url, headers)
+    assert _get(client, TICKETS, headers, listed.headers["ETag"]).status_code == 304
+    assert _get(client, detail_url, headers, detail.headers["ETag"]).status_code == 304
+
+    updated_at = db.get(Ticket, ticket["id"]).updated_at
+    counts = sla.scan(db, now=datetime.utcnow() + timedelta(days=30))
+    db.commit()
+    assert counts["breached"] >= 1
+    db.expire_all()
+    assert db.get(Ticket, ticket["id"]).updated_at == updated_at
+
+    listed_again = _get(client, TICKETS, headers, listed.headers["ETag"])
+    assert listed_again.status_code == 200
+    assert {t["id"]: t["sla_state"] for t in listed_again.json()}[ticket["id"]] == "breached"
+
+    detail_again = _get(client, detail_url, headers, detail.headers["ETag"])
+    assert detail_again.status_code == 200
+    assert detail_again.json()["sla_state"] == "breached"
+
+
+def test_policy_change_restamps_and_changes_etag(client, auth, db):
+    ticket = _create_ticket(client, auth, priority="low")
+    detail_url = f"{TICKETS}{ticket['id']}"
+    headers = auth["admin"]
+    detail = _get(client, detail_url, headers)
+
+    r = client.put(
+        "/api/v1/sla/policies/low", json={"first_response_minutes": 5, "resolve_minutes": 10}, headers=headers
+    )
+    assert r.status_code == 200, r.text
+
+    detail_again = _get(client, detail_url, headers, detail.headers["ETag"])
+    assert detail_again.status_code == 200
+    body = detail_again.json()
+    assert body["resolve_due_at"] != detail.json()["resolve_due_at"]
+    assert body["updated_at"] == detail.json()["updated_at"]
@@ -0,0 +1,111 @@
+"""
+Caché single-flight de /stats/tickets: un único cálculo para peticiones simultáneas, errores no
+cacheados, invalidación por empresa y escrituras de tickets visibles en la siguiente lectura.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from app.api.v1.endpoints import stats
+from app.core import stats_cache
+from app.core.stats_cache import SingleFlightCache, ticket_stats_cache
+
+STATS = "/api/v1/stats/tickets"
+TICKETS = "/api/v1/tickets/"
+
+
+def test_concurrent_misses_compute_once():
+    cache = SingleFlightCache(10, 60)
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {"n": len(calls)}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert results == [{"n": 1}] * 8
+    assert cache.get_or_compute("k", compute) == {"n": 1}
+
+
+def test_errors_are_not_cached():
+    cache = SingleFlightCache(10, 60)
+
+    def boom():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", boom)
+    assert cache.get_or_compute("k", lambda: 1) == 1
+
+
+def test_invalidation_during_compute_discards_result():
+    cache = SingleFlightCache(10, 60)
+
+    def compute():
+        cache.invalidate()
+        return "viejo"
+
+    assert cache.get_or_compute("k", compute) == "viejo"
+    assert cache.get_or_compute("k", lambda: "nuevo") == "nuevo"
+
+
+def test_ttl_and_disabled_cache(monkeypatch):
+    cache = SingleFlightCache(10, 60)
+    cache.get_or_compute("k", lambda: 1)
+    now = time.monotonic()
+    monkeypatch.setattr(stats_cache.time, "monotonic", lambda: now + 61)
+    assert cache.get_or_compute("k", lambda: 2) == 2
+
+    disabled = SingleFlightCache(10, 0)
+    disabled.get_or_compute("k", lambda: 1)
+    assert disabled.get_or_compute("k", lambda: 2) == 2
+
+
+def test_company_invalidation_keeps_other_companies():
+    ticket_stats_cache.invalidate()
+    for key in ((1, "week"), (2, "week"), (None, "week")):
+        ticket_stats_cache.get_or_compute(key, lambda: "viejo")
+    stats_cache._on_notify("1")
+    assert ticket_stats_cache.get_or_compute((1, "week"), lambda: "nuevo") == "nuevo"
+    assert ticket_stats_cache.get_or_compute((None, "week"), lambda: "nuevo") == "nuevo"
+    assert ticket_stats_cache.get_or_compute((2, "week"), lambda: "nuevo") == "viejo"
+    ticket_stats_cache.invalidate()
+
+
+def test_endpoint_shares_scope_and_sees_writes(client, auth, monkeypatch):
+    ticket_stats_cache.invalidate()
+    calls = []
+    compute = stats._compute_ticket_stats
+
+    def counting(*args):
+        calls.append(args)
+        return compute(*args)
+
+    monkeypatch.setattr(stats, "_compute_ticket_stats", counting)
+    first = client.get(STATS, headers=auth["admin"]).json()
+    assert client.get(STATS, headers=auth["tech"]).json() == first
+    assert len(calls) == 1
+
+    r = client.post(TICKETS, json={"title": "Servidor caído", "priority": "urgent"}, headers=auth["user"])
+    assert r.status_code == 200, r.text
+    after = client.get(STATS, headers=auth["admin"]).json()
+    assert after["urgent_unassigned"] == first["urgent_unassigned"] + 1
+    assert len(calls) == 2
+
+
+def test_requires_staff(client, auth):
+    assert client.get(STATS, headers=auth["user"]).status_code == 403
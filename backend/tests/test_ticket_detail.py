@@ -0,0 +1,91 @@
+"""
+GET /tickets/{id}/detail: mismo contenido que los endpoints individuales (comentarios, adjuntos,
+worklogs) con sus reglas de visibilidad, en un número de consultas que no crece con las relaciones.
+"""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import event
+
+from app.db.session import engine
+from conftest import login
+
+TICKETS = "/api/v1/tickets/"
+TECH_ID = 4  # tech@acme.local en el seed
+
+
+def _ticket(client, auth, comments: int) -> int:
+    r = client.post(TICKETS, json={"title": "Portátil lento", "assignee_id": TECH_ID}, headers=auth["user"])
+    assert r.status_code == 200, r.text
+    ticket_id = r.json()["id"]
+    for i in range(comments):
+        r = client.post(
+            f"{TICKETS}{ticket_id}/comments", json={"body": f"Comentario {i}", "is_public": i % 2 == 0}, headers=auth["tech"]
+        )
+        assert r.status_code == 200, r.text
+    return ticket_id
+
+
+@pytest.fixture(scope="module")
+def ticket_id(client, auth) -> int:
+    ticket_id = _ticket(client, auth, comments=3)
+    r = client.post(
+        f"{TICKETS}{ticket_id}/attachments",
+        files={"file": ("log.txt", b"traza", "text/plain")},
+        headers=auth["user"],
+    )
+    assert r.status_code == 200, r.text
+    for role in ("tech", "admin"):
+        assert client.post(f"{TICKETS}{ticket_id}/worklogs/start", headers=auth[role]).status_code == 200
+        assert client.post(f"{TICKETS}{ticket_id}/worklogs/stop", headers=auth[role]).status_code == 200
+    return ticket_id
+
+
+def _get(client, headers, path: str, **params):
+    r = client.get(path, params=params, headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+@pytest.mark.parametrize("role", ["user", "tech"])
+def test_detail_matches_individual_endpoints(client, auth, ticket_id, role):
+    headers = auth[role]
+    detail = _get(client, headers, f"{TICKETS}{ticket_id}/detail")
+    ticket = _get(client, headers, f"{TICKETS}{ticket_id}")
+
+    assert {k: detail[k] for k in ticket} == ticket
+    assert detail["requester"]["email"] == "user@acme.local"
+    assert detail["assignee"]["id"] == TECH_ID
+    assert detail["comments"] == _get(client, headers, f"{TICKETS}{ticket_id}/comments")
+    assert [a["id"] for a in detail["attachments"]] == [
+        a["id"] for a in _get(client, headers, f"{TICKETS}{ticket_id}/attachments")
+    ]
+    assert detail["worklogs"] == _get(client, headers, f"{TICKETS}{ticket_id}/worklogs")
+
+
+def test_worklogs_of_everyone(client, auth, ticket_id):
+    detail = _get(client, auth["admin"], f"{TICKETS}{ticket_id}/detail", mine_only=False)
+    assert len(detail["worklogs"]) == 2
+    assert len(_get(client, auth["admin"], f"{TICKETS}{ticket_id}/detail")["worklogs"]) == 1
+
+
+def test_query_count_is_constant(client, auth):
+    def queries(ticket_id: int) -> int:
+        statements: list[str] = []
+
+        def before(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before)
+        try:
+            _get(client, auth["admin"], f"{TICKETS}{ticket_id}/detail")
+        finally:
+            event.remove(engine, "before_cursor_execute", before)
+        return len(statements)
+
+    assert queries(_ticket(client, auth, comments=1)) == queries(_ticket(client, auth, comments=8))
+
+
+def test_other_company(client, ticket_id):
+    globex = login(client, "user@globex.local", "user123")
+    assert client.get(f"{TICKETS}{ticket_id}/detail", headers=globex).status_code == 404
@@ -0,0 +1,58 @@
+"""
+expand=requester,assignee en GET /tickets y GET /tickets/{id}: resúmenes de usuario embebidos y
+ETag que cambia cuando cambia un usuario expandido.
+"""
+from __future__ import annotations
+
+TICKETS = "/api/v1/tickets/"
+TECH_ID = 4  # tech@acme.local en el seed
+
+
+def _ticket(client, auth) -> dict:
+    r = client.post(TICKETS, json={"title": "Monitor parpadea", "assignee_id": TECH_ID}, headers=auth["user"])
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_list_and_detail_embed_users(client, auth):
+    ticket = _ticket(client, auth)
+
+    listed = client.get(TICKETS, params={"expand": "requester,assignee"}, headers=auth["admin"])
+    assert listed.status_code == 200, listed.text
+    item = {t["id"]: t for t in listed.json()}[ticket["id"]]
+    assert item["requester"]["email"] == "user@acme.local"
+    assert item["assignee"] == {"id": TECH_ID, "email": "tech@acme.local", "full_name": "Tech Acme"}
+
+    detail = client.get(f"{TICKETS}{ticket['id']}", params={"expand": "assignee"}, headers=auth["admin"])
+    assert detail.json()["assignee"]["id"] == TECH_ID
+    assert "requester" not in detail.json()
+
+    plain = client.get(f"{TICKETS}{ticket['id']}", headers=auth["admin"]).json()
+    assert "assignee" not in plain and plain["assignee_id"] == TECH_ID
+
+
+def test_unknown_expand(client, auth):
+    r = client.get(TICKETS, params={"expand": "company"}, headers=auth["admin"])
+    assert r.status_code == 422
+
+
+def test_renaming_expanded_user_changes_etag(client, auth):
+    ticket = _ticket(client, auth)
+    detail_url = f"{TICKETS}{ticket['id']}"
+    params = {"expand": "assignee"}
+    listed = client.get(TICKETS, params=params, headers=auth["admin"])
+    detail = client.get(detail_url, params=params, headers=auth["admin"])
+    plain = client.get(detail_url, headers=auth["admin"])
+
+    r = client.patch(f"/api/v1/users/{TECH_ID}", json={"full_name": "Técnico Acme"}, headers=auth["superadmin"])
+    assert r.status_code == 200, r.text
+
+    listed_again = client.get(TICKETS, params=params, headers={**auth["admin"], "If-None-Match": listed.headers["ETag"]})
+    assert listed_again.status_code == 200
+    assert {t["id"]: t for t in listed_again.json()}[ticket["id"]]["assignee"]["full_name"] == "Técnico Acme"
+    detail_again = client.get(detail_url, params=params, headers={**auth["admin"], "If-None-Match": detail.headers["ETag"]})
+    assert detail_again.status_code == 200
+    assert detail_again.json()["assignee"]["full_name"] == "Técnico Acme"
+    # Sin expand el usuario no forma parte de la respuesta: sigue siendo 304
+    plain_again = client.get(detail_url, headers={**auth["admin"], "If-None-Match": plain.headers["ETag"]})
+    assert plain_again.status_code == 304
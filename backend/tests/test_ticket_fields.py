@@ -0,0 +1,66 @@
+"""
+fields= en GET /tickets: proyección a nivel SQL, sin los TEXT pesados por defecto; el detalle
+sigue devolviendo el ticket completo.
+"""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import event
+
+from app.db.session import engine
+from app.schemas.ticket import TICKET_LIST_DEFAULT_FIELDS
+
+TICKETS = "/api/v1/tickets/"
+
+
+@pytest.fixture(scope="module")
+def ticket_id(client, auth) -> int:
+    r = client.post(TICKETS, json={"title": "Pantalla azul", "description": "Texto largo " * 50}, headers=auth["user"])
+    assert r.status_code == 200, r.text
+    return r.json()["id"]
+
+
+def _listed(client, auth, ticket_id: int, **params) -> dict:
+    r = client.get(TICKETS, params={"limit": 200, **params}, headers=auth["admin"])
+    assert r.status_code == 200, r.text
+    return {t["id"]: t for t in r.json()}[ticket_id]
+
+
+def test_default_projection_skips_text_columns(client, auth, ticket_id):
+    statements: list[str] = []
+
+    def before(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        item = _listed(client, auth, ticket_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+
+    assert set(item) == set(TICKET_LIST_DEFAULT_FIELDS)
+    listing = [s for s in statements if "FROM tickets" in s]
+    assert listing and not any("tickets.description" in s for s in listing)
+
+
+def test_requested_fields_only(client, auth, ticket_id):
+    assert _listed(client, auth, ticket_id, fields="title,status") == {
+        "id": ticket_id,
+        "title": "Pantalla azul",
+        "status": "open",
+    }
+    item = _listed(client, auth, ticket_id, fields="description")
+    assert set(item) == {"id", "description"}
+    assert item["description"].startswith("Texto largo")
+
+
+def test_unknown_field(client, auth):
+    r = client.get(TICKETS, params={"fields": "title,password"}, headers=auth["admin"])
+    assert r.status_code == 422
+    assert "password" in r.json()["detail"]
+
+
+def test_detail_keeps_text_columns(client, auth, ticket_id):
+    ticket = client.get(f"{TICKETS}{ticket_id}", headers=auth["admin"]).json()
+    assert ticket["description"].startswith("Texto largo")
+    assert "resolution_summary" in ticket
@@ -0,0 +1,50 @@
+"""
+GET /tickets: paginación por cursor (cabecera X-Next-Cursor) y su incompatibilidad con q.
+"""
+from __future__ import annotations
+
+import pytest
+
+TICKETS = "/api/v1/tickets/"
+
+
+@pytest.fixture(scope="module")
+def ticket_ids(client, auth) -> list[int]:
+    ids = []
+    for i in range(7):
+        r = client.post(TICKETS, json={"title": f"Impresora planta {i}"}, headers=auth["user"])
+        assert r.status_code == 200, r.text
+        ids.append(r.json()["id"])
+    return ids
+
+
+def test_cursor_walks_every_page_once(client, auth, ticket_ids):
+    everything = [t["id"] for t in client.get(TICKETS, params={"limit": 200}, headers=auth["admin"]).json()]
+    assert set(ticket_ids) <= set(everything)
+
+    seen, params = [], {"limit": 3}
+    while True:
+        r = client.get(TICKETS, params=params, headers=auth["admin"])
+        assert r.status_code == 200, r.text
+        seen.extend(t["id"] for t in r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params = {"limit": 3, "cursor": cursor}
+    assert seen == everything
+
+
+def test_search_pages_by_offset_only(client, auth, ticket_ids):
+    r = client.get(TICKETS, params={"q": "impresora", "limit": 2}, headers=auth["admin"])
+    assert r.status_code == 200, r.text
+    assert len(r.json()) == 2
+    assert "X-Next-Cursor" not in r.headers
+
+    cursor = client.get(TICKETS, params={"limit": 2}, headers=auth["admin"]).headers["X-Next-Cursor"]
+    r = client.get(TICKETS, params={"q": "impresora", "cursor": cursor}, headers=auth["admin"])
+    assert r.status_code == 422
+
+
+def test_invalid_cursor(client, auth):
+    r = client.get(TICKETS, params={"cursor": "no-es-un-cursor"}, headers=auth["admin"])
+    assert r.status_code == 400
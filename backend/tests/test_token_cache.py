@@ -0,0 +1,69 @@
+"""
+VerifiedTokenCache: la firma de cada JWT se verifica una sola vez, las entradas caducan con el exp
+del token y los tokens inválidos o caducados nunca se cachean.
+"""
+from __future__ import annotations
+
+import time
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.token_cache import VerifiedTokenCache, token_cache
+
+ME = "/api/v1/auth/me"
+
+
+def _counting_verify(payloads: dict[str, dict]):
+    calls: list[str] = []
+
+    def verify(token: str) -> dict:
+        calls.append(token)
+        return payloads[token]
+
+    return verify, calls
+
+
+def test_verifies_once_per_token():
+    cache = VerifiedTokenCache(10)
+    exp = time.time() + 60
+    verify, calls = _counting_verify({"a": {"sub": "1", "exp": exp}, "b": {"sub": "2", "exp": exp}})
+    for _ in range(3):
+        assert cache.decode("a", verify)["sub"] == "1"
+    assert cache.decode("b", verify)["sub"] == "2"
+    assert calls == ["a", "b"]
+
+    # Copias: mutar el resultado no altera la entrada
+    cache.decode("a", verify)["sub"] = "99"
+    assert cache.decode("a", verify)["sub"] == "1"
+
+
+def test_entry_expires_with_token():
+    cache = VerifiedTokenCache(10)
+    cache.put("t", {"sub": "1", "exp": time.time() - 1})
+    assert cache.get("t") is None
+    cache.put("no-exp", {"sub": "1"})
+    assert cache.get("no-exp") is None
+
+
+def test_lru_eviction_and_disabled_cache():
+    cache = VerifiedTokenCache(2)
+    exp = time.time() + 60
+    for token in ("a", "b"):
+        cache.put(token, {"exp": exp})
+    cache.get("a")
+    cache.put("c", {"exp": exp})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+    disabled = VerifiedTokenCache(0)
+    disabled.put("a", {"exp": exp})
+    assert disabled.get("a") is None
+
+
+def test_invalid_and_expired_tokens_rejected(client):
+    forged = create_access_token({"sub": "1", "role": "superadmin"}, "otro-secreto", 5)
+    expired = create_access_token({"sub": "1", "role": "superadmin"}, settings.JWT_SECRET, -1)
+    for token in (forged, expired):
+        r = client.get(ME, headers={"Authorization": f"Bearer {token}"})
+        assert r.status_code == 401
+        assert token_cache.get(token) is None
@@ -16,6 +16,7 @@ type Ticket = {
   resolved_at?: string | null;
   resolution_summary?: string | null;
   time_spent_minutes?: number | null;
+  attachments: Attachment[];
 };
 
 type Attachment = {
@@ -31,20 +32,15 @@ export default function TicketDetailPage() {
   const q = useQuery({
     queryKey: ["ticket", id],
     queryFn: async () => {
-      const { data } = await api.get<Ticket>(`/tickets/${id}`);
+      // Detalle agregado: ticket + adjuntos en una sola llamada
+      const { data } = await api.get<Ticket>(`/tickets/${id}/detail`);
       return data;
     }
   });
 
   const queryClient = useQueryClient();
 
-  const attachments = useQuery({
-    queryKey: ["attachments", id],
-    queryFn: async () => {
-      const { data } = await api.get<Attachment[]>(`/tickets/${id}/attachments`);
-      return data;
-    }
-  });
+  const attachments = { isLoading: q.isLoading, data: q.data?.attachments };
 
   // Upload de adjunto (creador puede subir evidencia; aquí permitimos 1 a la vez)
   const fileInput = useRef<HTMLInputElement | null>(null);
@@ -62,7 +58,7 @@ export default function TicketDetailPage() {
         headers: { "Content-Type": "multipart/form-data" }
       });
       fileInput.current!.value = "";
-      await queryClient.invalidateQueries({ queryKey: ["attachments", id] });
+      await queryClient.invalidateQueries({ queryKey: ["ticket", id] });
     } finally {
       setUploading(false);
     }